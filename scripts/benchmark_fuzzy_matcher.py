@@ -0,0 +1,55 @@
+"""
+Times FuzzyMatcher lookups in a catalog of 100,000 identifiers, and reports
+the queries that are slower than BUDGET. Timings depend on the machine (and
+its load), so this is run by hand rather than by the unit tests:
+
+    python scripts/benchmark_fuzzy_matcher.py
+"""
+
+import random
+import sys
+from functools import partial
+from timeit import repeat
+
+from textual_textarea.fuzzy_matcher import FuzzyMatcher
+
+# the slowest a lookup should be, in seconds
+BUDGET = 0.005
+CATALOG_SIZE = 100_000
+QUERIES = ["s", "uda", "ordtot", "getUser", "custba", "ct", "stid", "xyz"]
+
+WORDS = [
+    *("get", "set", "user", "id", "name", "order", "total", "amount"),
+    *("date", "created", "status", "customer", "product", "item", "count"),
+    *("price", "http", "server", "data", "value", "account", "balance"),
+]
+
+
+def identifier(rng: random.Random) -> str:
+    parts = rng.choices(WORDS, k=rng.randint(1, 4))
+    style = rng.random()
+    if style < 0.5:
+        value = "_".join(parts)
+    elif style < 0.8:
+        value = parts[0] + "".join(part.title() for part in parts[1:])
+    else:
+        value = "".join(part.title() for part in parts)
+    return value + str(rng.randint(0, 99)) if rng.random() < 0.3 else value
+
+
+def main() -> int:
+    rng = random.Random(0)
+    matcher = FuzzyMatcher([identifier(rng) for _ in range(CATALOG_SIZE)])
+    slow = 0
+    for query in QUERIES:
+        elapsed = min(repeat(partial(matcher, query), number=1, repeat=20))
+        over = elapsed >= BUDGET
+        slow += over
+        print(
+            f"{query!r:>10} {elapsed * 1000:6.2f} ms{' (over budget)' if over else ''}"
+        )
+    return 1 if slow else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,8 @@
+from textual_textarea.fuzzy_matcher import FuzzyMatcher
 from textual_textarea.messages import (
     TextAreaClipboardError,
+    TextAreaFindAllComplete,
+    TextAreaFindAllResult,
     TextAreaSaved,
     TextAreaThemeError,
 )
@@ -9,7 +12,10 @@ from textual_textarea.text_editor import TextEditor
 __all__ = [
     "TextEditor",
     "PathInput",
+    "FuzzyMatcher",
     "TextAreaClipboardError",
     "TextAreaThemeError",
     "TextAreaSaved",
+    "TextAreaFindAllResult",
+    "TextAreaFindAllComplete",
 ]
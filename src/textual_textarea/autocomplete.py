@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import Callable
+from inspect import isawaitable
+from typing import Any, Callable, Sequence
 
 from rich.console import RenderableType
 from rich.style import Style
@@ -15,7 +16,15 @@ from textual.widget import Widget
 from textual.widgets import OptionList
 from textual.widgets._option_list import OptionListContent
 from textual.widgets.option_list import Option
+from textual.worker import get_current_worker
 
+from textual_textarea.completion_cache import (
+    AsyncCompleter,
+    Completer,
+    CompletionCache,
+    CompletionItems,
+    is_async_completer,
+)
 from textual_textarea.messages import TextAreaHideCompletionList
 
 
@@ -64,7 +73,35 @@ class CompletionList(OptionList, can_focus=False, inherit_bindings=False):
             self.items = items
             self.prefix = prefix
 
+    class CompletionsExtended(Message, bubble=False):
+        """
+        Posted with each batch of items after the first from a streaming
+        completer, to be appended to the list.
+        """
+
+        def __init__(
+            self,
+            prefix: str,
+            items: list[tuple[str, str]] | list[tuple[tuple[str, str], str]],
+        ) -> None:
+            super().__init__()
+            self.items = items
+            self.prefix = prefix
+
     INNER_CONTENT_WIDTH = 37  # should be 3 less than width for scroll bar.
+    # the number of completer results kept while the list is open, so that
+    # extending the prefix can filter a cached result.
+    COMPLETION_CACHE_SIZE = 64
+    # completers may return an iterator (or async iterator) of items; the
+    # first STREAM_FIRST_BATCH_SIZE items are shown as soon as they arrive,
+    # and the rest are appended in batches of STREAM_BATCH_SIZE.
+    STREAM_FIRST_BATCH_SIZE = 20
+    STREAM_BATCH_SIZE = 500
+    # at most this many options are created at a time; more are created as
+    # the highlight (or scroll position) nears the last one.
+    MAX_RENDERED_OPTIONS = 100
+    # the number of rendered prompts kept, keyed by (label, type).
+    PROMPT_CACHE_SIZE = 4_096
     is_open: Reactive[bool] = reactive(False)
     cursor_offset: tuple[int, int] = (0, 0)
     additional_x_offset: int = 0
@@ -78,6 +115,27 @@ class CompletionList(OptionList, can_focus=False, inherit_bindings=False):
         disabled: bool = False,
     ):
         super().__init__(*content, name=name, id=id, classes=classes, disabled=disabled)
+        self.completion_cache = CompletionCache(maxsize=self.COMPLETION_CACHE_SIZE)
+        # the prefix of the items in the list, and the number of characters
+        # truncated from the start of their prompts.
+        self._prefix = ""
+        self._truncate_amount = 0
+        # every item for the prefix, and those that have options
+        self._items: list[tuple[Any, str]] = []
+        self._rendered_items: list[tuple[Any, str]] = []
+        # removing options scrolls the list, which mustn't render more options
+        # while they are being updated.
+        self._updating_options = False
+        # each rendered prompt, and its width in cells
+        self._prompt_cache: dict[tuple[str, str | None], tuple[Text, int]] = {}
+
+    @property
+    def completion_count(self) -> int:
+        """
+        The number of completions for the current prefix, including those that
+        don't have options yet.
+        """
+        return len(self._items)
 
     def set_offset(self, x_offset: int, y_offset: int) -> None:
         """The CSS Offset of this widget from its parent."""
@@ -126,21 +184,13 @@ class CompletionList(OptionList, can_focus=False, inherit_bindings=False):
     @on(CompletionsReady)
     def populate_and_position_list(self, event: CompletionsReady) -> None:
         event.stop()
-        self.clear_options()
-        type_label_style_full = self.get_component_rich_style(
-            "completion-list--type-label"
-        )
-        type_label_fg_style = Style(color=type_label_style_full.color)
-        prompts = [
-            Text.assemble(item[0][0], " ", (item[0][1], type_label_fg_style))
-            if isinstance(item[0], tuple)
-            else Text.from_markup(item[0])
-            for item in event.items
-        ]
+        self._items = list(event.items)
+        items = self._items[: self.MAX_RENDERED_OPTIONS]
+        prompts = self._get_prompts(items)
 
         # if the completions' prompts are wider than the widget,
         # we have to trunctate them
-        max_length = max(map(lambda x: x.cell_len, prompts))
+        max_length = max(cell_len for _, cell_len in prompts)
         truncate_amount = max(
             0,
             min(
@@ -148,18 +198,11 @@ class CompletionList(OptionList, can_focus=False, inherit_bindings=False):
                 len(event.prefix) - 2,
             ),
         )
-        if truncate_amount > 0:
-            additional_x_offset = truncate_amount - 1
-            items = [
-                Completion(prompt=f"…{prompt[truncate_amount:]}", value=item[1])
-                for prompt, item in zip(prompts, event.items)
-            ]
-        else:
-            additional_x_offset = 0
-            items = [
-                Completion(prompt=prompt, value=item[1])
-                for prompt, item in zip(prompts, event.items)
-            ]
+        additional_x_offset = truncate_amount - 1 if truncate_amount > 0 else 0
+        # if the truncation changes, every prompt does
+        reset = truncate_amount != self._truncate_amount
+        self._prefix = event.prefix
+        self._truncate_amount = truncate_amount
 
         # set x offset if not already open.
         if not self.is_open:
@@ -185,15 +228,146 @@ class CompletionList(OptionList, can_focus=False, inherit_bindings=False):
                 self.y_offset,
             )
 
-        self.add_options(new_options=items)
+        self._update_options(items, prompts, reset=reset)
         self.action_first()
         self.additional_x_offset = additional_x_offset
         self.is_open = True
 
+    @on(CompletionsExtended)
+    def extend_list(self, event: CompletionsExtended) -> None:
+        event.stop()
+        if not self.is_open or event.prefix != self._prefix:
+            return
+        self._items.extend(event.items)
+        if self.option_count < self.MAX_RENDERED_OPTIONS:
+            self._render_more(self.MAX_RENDERED_OPTIONS - self.option_count)
+
+    def _update_options(
+        self,
+        items: list[tuple[Any, str]],
+        prompts: list[tuple[Text, int]],
+        reset: bool = False,
+    ) -> None:
+        """
+        Update the options to show items, changing only the options whose items
+        differ from the ones they show now (or all of them, if reset).
+        """
+        self._updating_options = True
+        try:
+            self._replace_options(items, prompts, reset)
+        finally:
+            self._updating_options = False
+        self._rendered_items = items
+
+    def _replace_options(
+        self,
+        items: list[tuple[Any, str]],
+        prompts: list[tuple[Text, int]],
+        reset: bool,
+    ) -> None:
+        if reset:
+            self.clear_options()
+            self._rendered_items = []
+        old_items = self._rendered_items
+        for index, (old, new, (prompt, _)) in enumerate(zip(old_items, items, prompts)):
+            if old != new:
+                option = self.get_option_at_index(index)
+                assert isinstance(option, Completion)
+                option.value = new[1]
+                self.replace_option_prompt_at_index(
+                    index, self._truncate(prompt, self._truncate_amount)
+                )
+        for index in range(len(old_items) - 1, len(items) - 1, -1):
+            self.remove_option_at_index(index)
+        if len(items) > len(old_items):
+            self.add_options(
+                self._get_completions(
+                    prompts[len(old_items) :],
+                    items[len(old_items) :],
+                    self._truncate_amount,
+                )
+            )
+
+    def _render_more(self, count: int | None = None) -> None:
+        """
+        Create options for the next count (by default, MAX_RENDERED_OPTIONS)
+        items, if there are any.
+        """
+        start = len(self._rendered_items)
+        items = self._items[start : start + (count or self.MAX_RENDERED_OPTIONS)]
+        if not items:
+            return
+        prompts = self._get_prompts(items)
+        self.add_options(self._get_completions(prompts, items, self._truncate_amount))
+        self._rendered_items = self._rendered_items + items
+
+    def _render_more_if_near_end(self) -> None:
+        if self._updating_options or len(self._rendered_items) >= len(self._items):
+            return
+        highlighted = self.highlighted or 0
+        near_end = self.scroll_y + self.size.height >= self.virtual_size.height - 1
+        if near_end or highlighted >= self.option_count - self.size.height - 1:
+            self._render_more()
+
+    def _get_prompts(self, items: list[tuple[Any, str]]) -> list[tuple[Text, int]]:
+        cache = self._prompt_cache
+        type_label_fg_style: Style | None = None
+        prompts = []
+        for label, _ in items:
+            key = (label[0], label[1]) if isinstance(label, tuple) else (label, None)
+            cached = cache.get(key)
+            if cached is None:
+                if key[1] is not None:
+                    if type_label_fg_style is None:
+                        type_label_fg_style = Style(
+                            color=self.get_component_rich_style(
+                                "completion-list--type-label"
+                            ).color
+                        )
+                    prompt = Text.assemble(key[0], " ", (key[1], type_label_fg_style))
+                else:
+                    prompt = Text.from_markup(key[0])
+                if len(cache) >= self.PROMPT_CACHE_SIZE:
+                    cache.clear()
+                cached = cache[key] = (prompt, prompt.cell_len)
+            prompts.append(cached)
+        return prompts
+
+    @classmethod
+    def _get_completions(
+        cls,
+        prompts: list[tuple[Text, int]],
+        items: list[tuple[Any, str]],
+        truncate_amount: int,
+    ) -> list[Completion]:
+        return [
+            Completion(prompt=cls._truncate(prompt, truncate_amount), value=item[1])
+            for (prompt, _), item in zip(prompts, items)
+        ]
+
+    @staticmethod
+    def _truncate(prompt: Text, truncate_amount: int) -> RenderableType:
+        if truncate_amount > 0:
+            return f"…{prompt[truncate_amount:]}"
+        return prompt
+
+    def notify_style_update(self) -> None:
+        # the type labels' color may have changed.
+        self._prompt_cache.clear()
+        super().notify_style_update()
+
+    def watch_scroll_y(self, old_value: float, new_value: float) -> None:
+        super().watch_scroll_y(old_value, new_value)
+        self._render_more_if_near_end()
+
     def watch_is_open(self, is_open: bool) -> None:
         if not is_open:
             self.remove_class("open")
             self.additional_x_offset = 0
+            # completers may return different results the next time the list
+            # is opened, e.g., after the document is edited.
+            self.completion_cache.clear()
+            self._items = []
             return
 
         self.add_class("open")
@@ -220,16 +394,74 @@ class CompletionList(OptionList, can_focus=False, inherit_bindings=False):
         else:
             self.set_offset(self.x_offset, y_offset)
 
-    @work(thread=True, exclusive=True, group="completers")
     def show_completions(
         self,
         prefix: str,
-        completer: Callable[
-            [str], list[tuple[str, str]] | list[tuple[tuple[str, str], str]]
-        ]
-        | None,
+        completer: Callable[[str], Any] | None,
     ) -> None:
-        matches = completer(prefix) if completer is not None else []
+        """
+        Call completer with prefix, and show the completions (or hide the list
+        if there are none). Synchronous completers are called in a thread
+        worker, and coroutine functions are awaited in an async worker; either
+        way, a newer call cancels the last one.
+        """
+        if completer is not None and is_async_completer(completer):
+            self._complete_async(prefix, completer)
+        else:
+            self._complete_in_thread(prefix, completer)
+
+    @work(thread=True, exclusive=True, group="completers")
+    def _complete_in_thread(self, prefix: str, completer: Completer | None) -> None:
+        worker = get_current_worker()
+        matches: CompletionItems | None = None
+        streamed = False
+        if completer is not None:
+            matches = self.completion_cache.get(completer, prefix)
+            if matches is None:
+                result = completer(prefix)
+                if isinstance(result, Sequence):
+                    matches = _as_list(result)
+                else:
+                    # a streaming completer; batches are shown as they arrive.
+                    batcher = _Batcher(self, prefix)
+                    for item in result:
+                        if worker.is_cancelled:
+                            return
+                        batcher.add(item)
+                    matches = batcher.finish()
+                    streamed = batcher.posted
+                self.completion_cache.put(completer, prefix, matches)
+        if worker.is_cancelled or streamed:
+            # a newer prefix is being completed, or the items were already
+            # posted; leave the list as it is.
+            return
+        self._post_completions(prefix, matches)
+
+    @work(exclusive=True, group="completers")
+    async def _complete_async(self, prefix: str, completer: AsyncCompleter) -> None:
+        matches = self.completion_cache.get(completer, prefix)
+        streamed = False
+        if matches is None:
+            result: Any = completer(prefix)
+            if isawaitable(result):
+                result = await result
+            if isinstance(result, Sequence):
+                matches = _as_list(result)
+            else:
+                batcher = _Batcher(self, prefix)
+                if hasattr(result, "__aiter__"):
+                    async for item in result:
+                        batcher.add(item)
+                else:
+                    for item in result:
+                        batcher.add(item)
+                matches = batcher.finish()
+                streamed = batcher.posted
+            self.completion_cache.put(completer, prefix, matches)
+        if not streamed:
+            self._post_completions(prefix, matches)
+
+    def _post_completions(self, prefix: str, matches: CompletionItems | None) -> None:
         if matches:
             self.post_message(self.CompletionsReady(prefix=prefix, items=matches))
         else:
@@ -242,10 +474,12 @@ class CompletionList(OptionList, can_focus=False, inherit_bindings=False):
             self.action_cursor_up()
         elif event.key == "down":
             self.action_cursor_down()
+            self._render_more_if_near_end()
         elif event.key == "pageup":
             self.action_page_up()  # type: ignore[no-untyped-call]
         elif event.key == "pagedown":
             self.action_page_down()  # type: ignore[no-untyped-call]
+            self._render_more_if_near_end()
 
     @property
     def _parent_container_size(self) -> Size:
@@ -285,3 +519,56 @@ class CompletionList(OptionList, can_focus=False, inherit_bindings=False):
             raise ValueError("Doesn't fit.")
 
         return y
+
+
+class _Batcher:
+    """
+    Collects the items from a streaming completer, and posts them to a
+    CompletionList in batches: the first batch as soon as it is full, so the
+    list opens early, and the rest as they fill.
+    """
+
+    def __init__(self, completion_list: CompletionList, prefix: str) -> None:
+        self.completion_list = completion_list
+        self.prefix = prefix
+        self.items: CompletionItems = []
+        self._posted = 0
+
+    def add(self, item: Any) -> None:
+        self.items.append(item)
+        batch_size = (
+            self.completion_list.STREAM_BATCH_SIZE
+            if self._posted
+            else self.completion_list.STREAM_FIRST_BATCH_SIZE
+        )
+        if len(self.items) - self._posted >= batch_size:
+            self._post()
+
+    @property
+    def posted(self) -> bool:
+        """True if any items have been posted to the list."""
+        return self._posted > 0
+
+    def finish(self) -> CompletionItems:
+        """
+        Posts the last batch, if any have been posted, and returns every item.
+        If none have been posted, the caller should post them.
+        """
+        if self.posted:
+            self._post()
+        return self.items
+
+    def _post(self) -> None:
+        batch = self.items[self._posted :]
+        if not batch:
+            return
+        if self._posted:
+            message: Message = CompletionList.CompletionsExtended(self.prefix, batch)
+        else:
+            message = CompletionList.CompletionsReady(self.prefix, batch)
+        self.completion_list.post_message(message)
+        self._posted = len(self.items)
+
+
+def _as_list(items: Sequence[Any]) -> CompletionItems:
+    return items if isinstance(items, list) else list(items)
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from inspect import isasyncgenfunction, iscoroutinefunction
+from threading import Lock
+from typing import Any, Awaitable, Callable, List, Literal, Tuple, Union, cast
+
+CompletionItems = Union[List[Tuple[str, str]], List[Tuple[Tuple[str, str], str]]]
+Completer = Callable[[str], CompletionItems]
+AsyncCompleter = Callable[[str], Awaitable[CompletionItems]]
+
+
+class PartialCompletions(List[Tuple[str, str]]):
+    """
+    Completions that a completer returned before it found all of them (e.g.,
+    because it ran out of time). They aren't cached, so the completer is
+    called again for the next prefix.
+    """
+
+
+# how a cached result can be narrowed to a longer prefix: by the values that
+# start with the prefix, exactly or ignoring case.
+NarrowMode = Literal["exact", "casefold"]
+
+
+class CompletionCache:
+    """
+    The results of the most recent calls to completers, keyed by completer
+    and prefix.
+
+    If a completer is asked to complete a prefix that extends a cached prefix
+    (for example, because the user typed another character), the cached
+    result is filtered, instead of calling the completer again. A result can
+    be filtered only if the value of each of its items starts with its prefix
+    (exactly or ignoring case), since then the completer is a prefix match,
+    and the items that match the longer prefix are the cached items whose
+    values start with it. Completers that aren't prefix matches (e.g., a
+    FuzzyMatcher, or path_completer, which lists a directory's children once
+    the prefix names it) opt out of narrowing by setting a `narrowable`
+    attribute to False. Completers that leave out the value that equals the
+    prefix (e.g., TextEditor.complete_document_word) set an `excludes_prefix`
+    attribute to True, so that value is dropped from a narrowed result, too.
+    """
+
+    def __init__(self, maxsize: int = 64) -> None:
+        self.maxsize = maxsize
+        self._results: OrderedDict[
+            tuple[Completer | AsyncCompleter, str],
+            tuple[CompletionItems, NarrowMode | None],
+        ] = OrderedDict()
+        # completers run in thread workers, which may overlap.
+        self._lock = Lock()
+
+    def get(
+        self, completer: Completer | AsyncCompleter, prefix: str
+    ) -> CompletionItems | None:
+        """
+        Returns the completions of prefix by completer, from the cache, or None
+        if they aren't cached and can't be narrowed from a cached result.
+        """
+        with self._lock:
+            # the result for prefix itself, or else for its longest cached
+            # prefix, if that result can be narrowed.
+            for end in range(len(prefix), -1, -1):
+                key = (completer, prefix[:end])
+                cached = self._results.get(key)
+                if cached is None:
+                    continue
+                self._results.move_to_end(key)
+                items, mode = cached
+                if end == len(prefix):
+                    return items
+                if mode is None:
+                    return None
+                break
+            else:
+                return None
+        narrowed = _narrow(items, prefix, mode)
+        if getattr(completer, "excludes_prefix", False):
+            narrowed = cast(
+                CompletionItems, [item for item in narrowed if item[1] != prefix]
+            )
+        self.put(completer, prefix, narrowed)
+        return narrowed
+
+    def put(
+        self, completer: Completer | AsyncCompleter, prefix: str, items: CompletionItems
+    ) -> None:
+        """
+        Caches the completions of prefix by completer (unless they are
+        PartialCompletions).
+        """
+        if isinstance(items, PartialCompletions):
+            return
+        mode = (
+            _narrow_mode(items, prefix)
+            if getattr(completer, "narrowable", True)
+            else None
+        )
+        with self._lock:
+            self._results[(completer, prefix)] = (items, mode)
+            self._results.move_to_end((completer, prefix))
+            while len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+
+
+def is_async_completer(completer: Callable[[str], Any]) -> bool:
+    """
+    True if completer is a coroutine function or an async generator
+    function (or a callable object whose __call__ is one), which must be run
+    on the event loop.
+    """
+    return any(
+        iscoroutinefunction(f) or isasyncgenfunction(f)
+        for f in (completer, type(completer).__call__)
+    )
+
+
+def _narrow_mode(items: CompletionItems, prefix: str) -> NarrowMode | None:
+    """
+    Returns how items, the completions of prefix, can be narrowed to a longer
+    prefix, or None if they can't be.
+    """
+    if all(value.startswith(prefix) for _, value in items):
+        return "exact"
+    folded = prefix.casefold()
+    if all(value.casefold().startswith(folded) for _, value in items):
+        return "casefold"
+    return None
+
+
+def _narrow(items: CompletionItems, prefix: str, mode: NarrowMode) -> CompletionItems:
+    if mode == "exact":
+        return cast(
+            CompletionItems, [item for item in items if item[1].startswith(prefix)]
+        )
+    folded = prefix.casefold()
+    return cast(
+        CompletionItems,
+        [item for item in items if item[1].casefold().startswith(folded)],
+    )
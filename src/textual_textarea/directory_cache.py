@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import os
+from collections import OrderedDict
+from threading import Lock, Thread
+from time import monotonic, time_ns
+from typing import Iterator, NamedTuple
+
+# directory mtimes may have a coarse resolution (up to 2s, on FAT), so a
+# directory that changes soon after it is listed may keep the mtime of the
+# listing. Listings taken this soon after their directory's mtime are
+# re-validated by listing the directory again.
+RACY_MTIME_NS = 2_000_000_000
+# a background scan publishes the entries it has listed this often
+SCAN_BATCH_SIZE = 1_000
+
+
+class DirectoryListing(NamedTuple):
+    mtime_ns: int
+    listed_ns: int
+    names: tuple[str, ...]
+    # the names, normalized for the platform's case sensitivity
+    normcased: tuple[str, ...]
+    # the names of the entries that are directories (or links to them)
+    dirs: frozenset[str]
+    # False if the directory is still being listed, and this has only the
+    # entries listed so far
+    complete: bool = True
+
+    def is_fresh(self, mtime_ns: int) -> bool:
+        return mtime_ns == self.mtime_ns and self.listed_ns - mtime_ns >= RACY_MTIME_NS
+
+    def startswith(self, prefix: str) -> list[str]:
+        """
+        Returns the names that start with prefix (ignoring case, on
+        case-insensitive platforms). Characters that are special to glob
+        (e.g., `[`) are matched literally.
+        """
+        if not prefix:
+            return list(self.names)
+        start = os.path.normcase(prefix)
+        return [
+            name
+            for name, normcased in zip(self.names, self.normcased)
+            if normcased.startswith(start)
+        ]
+
+
+class _Scan:
+    """
+    A listing of a directory that is being finished in a background thread.
+    """
+
+    def __init__(self, mtime_ns: int, listed_ns: int) -> None:
+        self.mtime_ns = mtime_ns
+        self.listed_ns = listed_ns
+        self.names: list[str] = []
+        self.normcased: list[str] = []
+        self.dirs: set[str] = set()
+
+    def add(self, entries: list[os.DirEntry[str]]) -> None:
+        for entry in entries:
+            self.add_entry(entry)
+
+    def add_entry(self, entry: os.DirEntry[str]) -> None:
+        self.names.append(entry.name)
+        self.normcased.append(os.path.normcase(entry.name))
+        try:
+            # may stat the entry
+            if entry.is_dir():
+                self.dirs.add(entry.name)
+        except OSError:
+            pass
+
+    def listing(self, complete: bool) -> DirectoryListing:
+        return DirectoryListing(
+            mtime_ns=self.mtime_ns,
+            listed_ns=self.listed_ns,
+            names=tuple(self.names),
+            normcased=tuple(self.normcased),
+            dirs=frozenset(self.dirs),
+            complete=complete,
+        )
+
+
+class DirectoryCache:
+    """
+    The listings of recently completed directories, keyed by directory.
+
+    A directory is listed with os.scandir, which (on most platforms) reports
+    whether each entry is a directory without another stat. A cached listing
+    is reused until the directory's mtime changes, so completing a path
+    stats its directory, but doesn't list it again; the names are then
+    filtered in memory.
+
+    Listing a huge directory, or one on a slow (e.g., network) drive, stops
+    after time_budget seconds or max_entries entries, and returns the entries
+    listed so far, in a listing that isn't complete. The rest of the
+    directory is listed in a background thread, and the complete listing is
+    cached when it is done; until then, the directory isn't listed again, and
+    each lookup returns the entries that the thread has listed so far.
+
+    Args:
+        maxsize (int): The number of listings to cache.
+        time_budget (float | None): The most time, in seconds, to spend
+            listing a directory before returning. None for no limit.
+        max_entries (int | None): The most entries to list before returning.
+            None for no limit.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 64,
+        time_budget: float | None = 0.05,
+        max_entries: int | None = 10_000,
+    ) -> None:
+        self.maxsize = maxsize
+        self.time_budget = time_budget
+        self.max_entries = max_entries
+        self._listings: OrderedDict[str, DirectoryListing] = OrderedDict()
+        # the directories being listed in the background
+        self._scans: dict[str, _Scan] = {}
+        # completers run in thread workers, which may overlap.
+        self._lock = Lock()
+
+    def listing(self, directory: str) -> DirectoryListing:
+        """
+        Returns the listing of directory, from the cache if it is up to date.
+        The listing isn't complete if the directory couldn't be listed within
+        the budget.
+
+        Raises:
+            OSError: If directory can't be listed.
+        """
+        key = os.path.abspath(directory)
+        mtime_ns = os.stat(key).st_mtime_ns
+        with self._lock:
+            cached = self._listings.get(key)
+            if cached is not None and cached.is_fresh(mtime_ns):
+                self._listings.move_to_end(key)
+                return cached
+            if cached is not None and cached.mtime_ns != mtime_ns:
+                cached = None
+            scan = self._scans.get(key)
+            if scan is not None and scan.mtime_ns == mtime_ns:
+                # while a listing with a racy mtime is re-validated, it is
+                # still the best one there is.
+                return cached or scan.listing(complete=False)
+
+        scan = _Scan(mtime_ns=mtime_ns, listed_ns=time_ns())
+        entries = os.scandir(key)
+        try:
+            over_budget = self._list_within_budget(entries, scan)
+        except BaseException:
+            entries.close()
+            raise
+        if over_budget:
+            with self._lock:
+                self._scans[key] = scan
+                listing = cached or scan.listing(complete=False)
+            Thread(
+                target=self._finish_scan, args=(key, scan, entries), daemon=True
+            ).start()
+            return listing
+
+        entries.close()
+        listing = scan.listing(complete=True)
+        self._put(key, listing)
+        return listing
+
+    def is_dir(self, path: str) -> bool:
+        """
+        Returns True if path is a directory, from the listing of its parent.
+        """
+        parent, name = os.path.split(os.path.abspath(path))
+        if not name:
+            return os.path.isdir(path)
+        try:
+            listing = self.listing(parent)
+        except OSError:
+            return False
+        if name in listing.dirs:
+            return True
+        # the entry may not have been listed yet
+        return not listing.complete and os.path.isdir(path)
+
+    def complete(self, directory: str, prefix: str) -> list[str]:
+        """
+        Returns the names of the entries in directory that start with prefix
+        (see DirectoryListing.startswith).
+
+        Raises:
+            OSError: If directory can't be listed.
+        """
+        return self.listing(directory).startswith(prefix)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._listings.clear()
+
+    def _list_within_budget(
+        self, entries: Iterator[os.DirEntry[str]], scan: _Scan
+    ) -> bool:
+        """
+        Adds the next entries to scan, until entries is exhausted or the
+        budget is spent, and returns whether the budget was spent. Checking
+        whether an entry is a directory may stat it (e.g., on a network
+        drive, or for a symlink), so that is counted against the budget, too.
+        """
+        deadline = None if self.time_budget is None else monotonic() + self.time_budget
+        for entry in entries:
+            scan.add_entry(entry)
+            if len(scan.names) == self.max_entries or (
+                deadline is not None and monotonic() > deadline
+            ):
+                return True
+        return False
+
+    def _finish_scan(
+        self,
+        key: str,
+        scan: _Scan,
+        entries: os._ScandirIterator[str],
+    ) -> None:
+        complete = False
+        try:
+            with entries:
+                batch: list[os.DirEntry[str]] = []
+                for entry in entries:
+                    batch.append(entry)
+                    if len(batch) >= SCAN_BATCH_SIZE:
+                        self._add_to_scan(scan, batch)
+                        batch = []
+                self._add_to_scan(scan, batch)
+            complete = True
+        except OSError:
+            pass
+        finally:
+            with self._lock:
+                if self._scans.get(key) is scan:
+                    del self._scans[key]
+        if complete:
+            self._put(key, scan.listing(complete=True))
+
+    def _add_to_scan(self, scan: _Scan, batch: list[os.DirEntry[str]]) -> None:
+        # entries are checked (is_dir may stat) outside of the lock.
+        staged = _Scan(scan.mtime_ns, scan.listed_ns)
+        staged.add(batch)
+        with self._lock:
+            scan.names.extend(staged.names)
+            scan.normcased.extend(staged.normcased)
+            scan.dirs.update(staged.dirs)
+
+    def _put(self, key: str, listing: DirectoryListing) -> None:
+        with self._lock:
+            self._listings[key] = listing
+            self._listings.move_to_end(key)
+            while len(self._listings) > self.maxsize:
+                self._listings.popitem(last=False)
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+from collections import Counter
+from itertools import chain
+from threading import Lock
+from typing import Iterable, Sequence
+
+from textual_textarea.line_edit import LineEdit, coalesce_line_edits
+from textual_textarea.words import WORD_PROG
+
+# edits that touch more lines than this (e.g., loading a file) reset the
+# index, which is then rebuilt by the next lookup, instead of being applied.
+MAX_PATCHED_LINES = 1_000
+
+
+class _TrieNode:
+    __slots__ = ("children", "words")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _TrieNode] = {}
+        # the words whose casefolded form ends at this node
+        self.words: set[str] = set()
+
+
+class WordTrie:
+    """
+    A prefix trie of words, keyed by their casefolded characters, so that
+    lookups are case-insensitive and take time proportional to the length of
+    the prefix and the size of the result.
+    """
+
+    def __init__(self) -> None:
+        self._root = _TrieNode()
+
+    def add(self, word: str) -> None:
+        node = self._root
+        for char in word.casefold():
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _TrieNode()
+            node = child
+        node.words.add(word)
+
+    def remove(self, word: str) -> None:
+        path = [self._root]
+        folded = word.casefold()
+        for char in folded:
+            child = path[-1].children.get(char)
+            if child is None:
+                return
+            path.append(child)
+        path[-1].words.discard(word)
+        # prune the nodes that no longer lead to a word.
+        for char, node, parent in zip(
+            reversed(folded), reversed(path), reversed(path[:-1])
+        ):
+            if node.words or node.children:
+                break
+            del parent.children[char]
+
+    def startswith(self, prefix: str) -> list[str]:
+        """
+        Returns the words that start with prefix, ignoring case.
+        """
+        node = self._root
+        for char in prefix.casefold():
+            child = node.children.get(char)
+            if child is None:
+                return []
+            node = child
+        words: list[str] = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            words.extend(node.words)
+            stack.extend(node.children.values())
+        return words
+
+
+class DocumentWords:
+    """
+    An index of the words (matches of WORD_PROG) in a document, used to
+    complete words.
+
+    The document is tokenized the first time the index is searched (usually
+    by a completer, in a thread worker), from a copy of its lines taken when
+    the index was created. After that, edits re-tokenize only the lines they
+    touched. Each line's words are kept, with the number of times each word
+    appears in the document, so a word is removed from the trie only when its
+    last occurrence is edited away.
+    """
+
+    def __init__(self, lines: Sequence[str]) -> None:
+        self._lock = Lock()
+        # the document's lines, until it has been tokenized
+        self._snapshot: list[str] | None = list(lines)
+        # the words on each line, once the document has been tokenized
+        self._line_words: list[tuple[str, ...]] = []
+        self._counts: Counter[str] = Counter()
+        self._trie = WordTrie()
+        # edits made while the snapshot is being tokenized, with the text of
+        # the lines they touched, and a count of resets, so that a
+        # tokenization of an out-of-date snapshot is discarded.
+        self._pending: list[tuple[LineEdit, tuple[str, ...]]] | None = None
+        self._generation = 0
+
+    def patch(self, lines: Sequence[str], edits: Iterable[LineEdit]) -> None:
+        """
+        Update the index for edits made to the document.
+
+        Args:
+            lines (Sequence[str]): The lines of the document, after the edits.
+            edits (Iterable[LineEdit]): The edits since the last patch.
+        """
+        coalesced = coalesce_line_edits(list(edits))
+        if not coalesced:
+            return
+        changes = [
+            (edit, tuple(lines[edit.first : edit.new_last + 1])) for edit in coalesced
+        ]
+        with self._lock:
+            line_count = (
+                len(self._snapshot)
+                if self._snapshot is not None
+                else len(self._line_words)
+            )
+            if sum(
+                edit.new_last - edit.first + 1 for edit in coalesced
+            ) > MAX_PATCHED_LINES or line_count + sum(
+                edit.delta for edit in coalesced
+            ) != len(lines):
+                self._reset(lines)
+            elif self._snapshot is not None:
+                for edit, new_lines in changes:
+                    self._snapshot[edit.first : edit.old_last + 1] = new_lines
+                if self._pending is not None:
+                    self._pending.extend(changes)
+            else:
+                for edit, new_lines in changes:
+                    self._apply(edit, new_lines)
+
+    def complete(self, prefix: str) -> list[tuple[str, str]]:
+        """
+        Returns the words in the document that start with prefix (ignoring
+        case), other than prefix itself, sorted, as (prompt, value) pairs for
+        a CompletionList.
+        """
+        self._tokenize_snapshot()
+        with self._lock:
+            words = self._trie.startswith(prefix)
+        return [(word, word) for word in sorted(words) if word != prefix]
+
+    def _tokenize_snapshot(self) -> None:
+        with self._lock:
+            if self._snapshot is None:
+                return
+            lines = self._snapshot.copy()
+            generation = self._generation
+            if self._pending is None:
+                self._pending = []
+            # the pending edits that are already in this copy of the snapshot
+            applied = len(self._pending)
+        # tokenize without holding the lock, so edits aren't blocked.
+        line_words = [tuple(WORD_PROG.findall(line)) for line in lines]
+        counts = Counter(chain.from_iterable(line_words))
+        trie = WordTrie()
+        for word in counts:
+            trie.add(word)
+        with self._lock:
+            if self._snapshot is None or generation != self._generation:
+                return
+            self._line_words, self._counts, self._trie = line_words, counts, trie
+            pending, self._pending, self._snapshot = self._pending or [], None, None
+            for edit, new_lines in pending[applied:]:
+                self._apply(edit, new_lines)
+
+    def _apply(self, edit: LineEdit, new_lines: tuple[str, ...]) -> None:
+        old_words = self._line_words[edit.first : edit.old_last + 1]
+        new_words = [tuple(WORD_PROG.findall(line)) for line in new_lines]
+        self._line_words[edit.first : edit.old_last + 1] = new_words
+        for words in new_words:
+            for word in words:
+                if word not in self._counts:
+                    self._trie.add(word)
+                self._counts[word] += 1
+        for words in old_words:
+            for word in words:
+                self._counts[word] -= 1
+                if self._counts[word] == 0:
+                    del self._counts[word]
+                    self._trie.remove(word)
+
+    def _reset(self, lines: Sequence[str]) -> None:
+        self._snapshot = list(lines)
+        self._line_words = []
+        self._counts = Counter()
+        self._trie = WordTrie()
+        self._pending = None
+        self._generation += 1
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterator, NamedTuple, Sequence
+
+from textual_textarea.find_index import FindIndex, MultilineFindIndex
+
+
+class FindJob(NamedTuple):
+    """
+    An immutable snapshot of the lines of a document, and the (unbuilt) index
+    of a query's matches in those lines.
+    """
+
+    lines: tuple[str, ...]
+    find_index: FindIndex | MultilineFindIndex
+
+
+def build_concurrently(
+    jobs: Sequence[FindJob],
+    max_workers: int,
+    is_cancelled: Callable[[], bool] | None = None,
+) -> Iterator[int]:
+    """
+    Builds the index of each job in a pool of (at most) max_workers threads,
+    and yields the position of each job in jobs as its index is built, in the
+    order that they complete.
+
+    If is_cancelled returns True, the builds in progress are abandoned, the
+    jobs that have not started are cancelled, and nothing more is yielded.
+    """
+    if not jobs:
+        return
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs)))) as pool:
+        futures = {
+            pool.submit(job.find_index.build, job.lines, is_cancelled): i
+            for i, job in enumerate(jobs)
+        }
+        for future in as_completed(futures):
+            if is_cancelled is not None and is_cancelled():
+                pool.shutdown(wait=False, cancel_futures=True)
+                return
+            if future.result():
+                yield futures[future]
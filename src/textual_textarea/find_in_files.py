@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from contextlib import redirect_stderr
+from itertools import islice
+from multiprocessing import resource_tracker
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterator, NamedTuple, Sequence
+
+from textual.widgets.text_area import Document
+
+from textual_textarea.find_index import FindIndex, FindQuery, MultilineFindIndex
+
+if TYPE_CHECKING:
+    from textual_textarea.trigram_index import TrigramIndex
+
+# files containing a null byte in their first BINARY_SNIFF_SIZE bytes are
+# assumed to be binary, and are skipped.
+BINARY_SNIFF_SIZE = 8192
+# the number of files searched by each task sent to the process pool
+FILES_PER_TASK = 32
+# the number of characters of a line kept before and after a match, for
+# previews.
+PREVIEW_CONTEXT = 40
+PREVIEW_WIDTH = 200
+
+
+class FileMatch(NamedTuple):
+    """
+    A match in a file: its row, its start and end columns (the end of the
+    first line, if the match spans lines), and a preview of its line, which
+    starts at preview_column.
+    """
+
+    row: int
+    start: int
+    end: int
+    preview: str
+    preview_column: int
+
+
+class FileResult(NamedTuple):
+    """
+    The matches in the file at path. If is_complete is False, the file has
+    more matches than were collected.
+    """
+
+    path: str
+    matches: tuple[FileMatch, ...]
+    is_complete: bool
+
+
+def iter_files(root: Path, max_depth: int, max_file_size: int) -> Iterator[str]:
+    """
+    Yields the path of each regular file under root that is no larger than
+    max_file_size bytes, and no more than max_depth directories below root (so
+    a max_depth of 0 yields only the files in root). Symlinks to directories
+    are not followed, and unreadable directories are skipped.
+    """
+    stack = [(str(root), 0)]
+    while stack:
+        directory, depth = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if depth < max_depth:
+                                stack.append((entry.path, depth + 1))
+                        elif entry.is_file() and entry.stat().st_size <= max_file_size:
+                            yield entry.path
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+
+def read_text(path: str, max_file_size: int) -> str | None:
+    """
+    Returns the contents of the file at path, or None if the file can't be
+    read, is larger than max_file_size, or is not utf-8 text.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read(max_file_size + 1)
+    except OSError:
+        return None
+    if len(data) > max_file_size or b"\0" in data[:BINARY_SNIFF_SIZE]:
+        return None
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+
+
+def document_lines(text: str) -> list[str]:
+    """
+    Returns the lines of text, split the way a TextArea's document splits
+    them, so that the rows of the matches in a file are the rows of the file
+    when it is opened in the editor.
+    """
+    return Document(text).lines
+
+
+def search_file(
+    path: str, query: FindQuery, max_file_size: int, max_matches: int | None
+) -> FileResult | None:
+    """
+    Returns the matches of query in the file at path, or None if the file
+    can't be read, is larger than max_file_size, or is not utf-8 text.
+    """
+    text = read_text(path, max_file_size)
+    if text is None:
+        return None
+    lines = document_lines(text)
+    index: FindIndex | MultilineFindIndex = (
+        MultilineFindIndex(query, max_matches=max_matches)
+        if query.multiline
+        else FindIndex(query, max_matches=max_matches)
+    )
+    index.build(lines)
+    matches = []
+    for i in range(index.total):
+        (row, start), (end_row, end) = index.match_at(i)
+        line = lines[row]
+        if end_row != row:
+            end = len(line)
+        preview_column = max(0, start - PREVIEW_CONTEXT)
+        preview = line[preview_column : end + PREVIEW_WIDTH]
+        matches.append(FileMatch(row, start, end, preview, preview_column))
+    return FileResult(path, tuple(matches), index.is_complete)
+
+
+def search_files(
+    paths: Sequence[str],
+    query: FindQuery,
+    max_file_size: int,
+    max_matches: int | None,
+) -> list[FileResult]:
+    """
+    Returns the matches of query in each of the files in paths that has any.
+    This is the task run by each process in the pool.
+    """
+    results = []
+    for path in paths:
+        result = search_file(path, query, max_file_size, max_matches)
+        if result is not None and result.matches:
+            results.append(result)
+    return results
+
+
+def find_in_files(
+    root: Path,
+    query: FindQuery,
+    *,
+    max_depth: int,
+    max_file_size: int,
+    max_matches_per_file: int | None,
+    max_workers: int,
+    is_cancelled: Callable[[], bool] | None = None,
+    index: TrigramIndex | None = None,
+) -> Iterator[tuple[int, list[FileResult]]]:
+    """
+    Searches the files under root for query, in a pool of (at most)
+    max_workers processes. As each batch of files is searched, yields the
+    number of files in the batch, and the results for the files that had
+    matches.
+
+    Files are listed as they are needed, and only a few batches are sent to
+    the pool at a time, so the search can start before the directory tree has
+    been walked. If is_cancelled returns True, the batches that have not
+    started are cancelled, and nothing more is yielded.
+
+    If an index is given, it is first brought up to date with the files
+    under root, and only the files it can't rule out are searched.
+    """
+    files = iter_files(root, max_depth=max_depth, max_file_size=max_file_size)
+    if index is not None:
+        paths = list(files)
+        index.update(paths, max_file_size, is_cancelled=is_cancelled)
+        if is_cancelled is not None and is_cancelled():
+            return
+        candidates = index.candidates(query)
+        files = iter(
+            paths if candidates is None else [p for p in paths if p in candidates]
+        )
+    # forking a process with many threads (like a Textual app) is unsafe.
+    context = multiprocessing.get_context("spawn")
+    _ensure_resource_tracker()
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as pool:
+        pending: dict[Future[list[FileResult]], int] = {}
+
+        def submit_batches() -> None:
+            while len(pending) < max_workers * 2:
+                batch = list(islice(files, FILES_PER_TASK))
+                if not batch:
+                    return
+                future = pool.submit(
+                    search_files, batch, query, max_file_size, max_matches_per_file
+                )
+                pending[future] = len(batch)
+
+        submit_batches()
+        while pending:
+            # wake up periodically to check for cancellation.
+            done, _ = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+            if is_cancelled is not None and is_cancelled():
+                pool.shutdown(wait=False, cancel_futures=True)
+                return
+            for future in done:
+                yield pending.pop(future), future.result()
+            submit_batches()
+
+
+def _ensure_resource_tracker() -> None:
+    """
+    Start the process that tracks the resources of spawned processes, if it
+    isn't running. It inherits stderr, so it is started with the real stderr:
+    while an App is running, Textual replaces sys.stderr with an object
+    whose fileno() is invalid.
+    """
+    if sys.platform == "win32":
+        return
+    with redirect_stderr(sys.__stderr__):
+        resource_tracker.ensure_running()
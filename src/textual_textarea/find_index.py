@@ -0,0 +1,1075 @@
+from __future__ import annotations
+
+import re
+import sys
+from bisect import bisect_left
+from functools import lru_cache
+from itertools import compress
+from typing import Any, Callable, Iterable, Iterator, Literal, NamedTuple, Sequence
+
+from textual.widgets.text_area import Location, Selection
+
+from textual_textarea.joined_buffer import BufferChange, JoinedBuffer
+from textual_textarea.line_edit import LineEdit, merge_line_edits
+from textual_textarea.words import splits_word
+
+try:  # Python 3.11+
+    from re import _parser as sre_parse  # type: ignore[attr-defined]
+except ImportError:  # pragma: no cover
+    import sre_parse  # type: ignore[no-redef,unused-ignore]
+
+Span = tuple[int, int]
+NO_MATCHES: tuple[Span, ...] = ()
+# the number of lines scanned between checks for cancellation
+BUILD_CHUNK_SIZE = 4096
+# a column after the end of any line
+LINE_END = sys.maxsize
+# the syntax regions that find can be limited to
+SyntaxKind = Literal["any", "code", "comments", "strings"]
+SYNTAX_KINDS: tuple[SyntaxKind, ...] = ("any", "code", "comments", "strings")
+# keeps only some of the spans found on a row
+SpanFilter = Callable[[int, tuple[Span, ...]], tuple[Span, ...]]
+
+
+@lru_cache(maxsize=128)
+def compile_pattern(pattern: str, flags: int = 0) -> re.Pattern[str] | re.error:
+    """
+    Compile a regular expression, caching the result. Returns (rather than
+    raises) the error for an invalid pattern, so that failures are cached, too.
+    """
+    try:
+        return re.compile(pattern, flags)
+    except re.error as e:
+        return e
+
+
+class FindQuery(NamedTuple):
+    """
+    The text of a find query, and the options that control how it matches.
+
+    If syntax is not "any", only matches in code (outside of comments and
+    strings), comments, or strings are found; this applies only to queries
+    that don't span lines.
+    """
+
+    text: str
+    regex: bool = False
+    case_sensitive: bool = True
+    whole_word: bool = False
+    syntax: SyntaxKind = "any"
+
+    @property
+    def flags(self) -> int:
+        """
+        The flags used to compile the query as a regular expression.
+        """
+        return 0 if self.case_sensitive else re.IGNORECASE
+
+    @property
+    def multiline(self) -> bool:
+        """
+        True if the query can match text that spans lines: that is, if it
+        contains a newline (or, for regex queries, a \\n escape).
+        """
+        return "\n" in self.text or (self.regex and "\\n" in self.text)
+
+    def extends(self, previous: FindQuery) -> bool:
+        """
+        True if every line that matches this query also matches previous (for
+        example, because the user typed another character into the find input),
+        so the lines to search can be narrowed to those that matched previous.
+        """
+        return (
+            not self.regex
+            and not previous.regex
+            and not previous.whole_word
+            and not self.multiline
+            and self.syntax == previous.syntax == "any"
+            and (self.case_sensitive or not previous.case_sensitive)
+            and self.text.startswith(previous.text)
+        )
+
+    @property
+    def error(self) -> str | None:
+        """
+        A description of the problem with the query, if it is an invalid regex.
+        """
+        if not self.regex:
+            return None
+        compiled = compile_pattern(self.text, self.flags)
+        if isinstance(compiled, re.error):
+            return compiled.msg
+        return None
+
+
+class FoldedLines:
+    """
+    A casefolded copy of each line of a document, used for case-insensitive
+    find. Lines are folded lazily, the first time they are searched, and
+    invalidated when they are edited.
+    """
+
+    def __init__(self, line_count: int) -> None:
+        self._lines: list[str | None] = [None] * line_count
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def get(self, row: int, line: str) -> str:
+        """
+        Returns the casefolded version of line, which is row of the document.
+        """
+        folded = self._lines[row] if row < len(self._lines) else None
+        if folded is None:
+            folded = line.casefold()
+            if row < len(self._lines):
+                self._lines[row] = folded
+        return folded
+
+    def patch(self, edits: Iterable[LineEdit]) -> None:
+        """
+        Invalidate the lines touched by edits, and shift the rest.
+        """
+        for edit in edits:
+            self._lines[edit.first : edit.old_last + 1] = [None] * (
+                edit.new_last - edit.first + 1
+            )
+
+    def copy(self) -> FoldedLines:
+        folded_lines = FoldedLines(0)
+        folded_lines._lines = self._lines.copy()
+        return folded_lines
+
+
+class Replacement(NamedTuple):
+    """
+    A single edit that replaces every match of a query: the text between start
+    and end should be replaced by text, which contains the number of
+    replacements given by replaced.
+    """
+
+    start: Location
+    end: Location
+    text: str
+    replaced: int
+
+
+class Scope(NamedTuple):
+    """
+    The region of the document (from start to end) that find is restricted
+    to, e.g., the selection when Find in Selection was enabled.
+    """
+
+    start: Location
+    end: Location
+
+    def clip(self, row: int, spans: Sequence[Span]) -> tuple[Span, ...]:
+        """
+        Returns the spans on row that are entirely within the scope.
+        """
+        (start_row, start_col), (end_row, end_col) = self
+        if row < start_row or row > end_row:
+            return NO_MATCHES
+        elif start_row < row < end_row:
+            return tuple(spans)
+        min_col = start_col if row == start_row else 0
+        max_col = end_col if row == end_row else LINE_END
+        return tuple(
+            span for span in spans if span[0] >= min_col and span[1] <= max_col
+        )
+
+    def patch(self, edits: Iterable[LineEdit]) -> Scope:
+        """
+        Returns the scope after edits: edits above the scope shift it, and
+        edits that overlap it grow or shrink it.
+        """
+        (start_row, start_col), (end_row, end_col) = self
+        for edit in edits:
+            if edit.old_last < start_row:
+                start_row += edit.delta
+                end_row += edit.delta
+                continue
+            elif edit.first > end_row:
+                continue
+            if edit.first < start_row:
+                start_row, start_col = edit.first, 0
+            if edit.old_last < end_row:
+                end_row += edit.delta
+            elif edit.first == edit.old_last == edit.new_last == end_row:
+                # an edit within the last line may have moved the end of the
+                # scope, so it now extends to the end of the line.
+                end_col = LINE_END
+            else:
+                end_row, end_col = edit.new_last, LINE_END
+        return Scope((start_row, start_col), (end_row, end_col))
+
+
+class LineMatcher:
+    """
+    Finds the (start, end) columns of each match of a FindQuery in a line.
+    """
+
+    def __init__(self, query: FindQuery) -> None:
+        self.query = query
+        self._pattern: re.Pattern[str] | None = None
+        if query.regex:
+            compiled = compile_pattern(query.text, query.flags)
+            if isinstance(compiled, re.Pattern):
+                self._pattern = compiled
+        elif not query.case_sensitive:
+            # casefolding can change a line's length (e.g., ß -> ss), in which
+            # case columns in the folded line don't match the original, so we
+            # fall back to a case-insensitive regex.
+            fallback = compile_pattern(re.escape(query.text), re.IGNORECASE)
+            assert isinstance(fallback, re.Pattern)
+            self._pattern = fallback
+        self._needle = query.text if query.case_sensitive else query.text.casefold()
+
+    @property
+    def uses_folded_lines(self) -> bool:
+        """
+        True if the matcher searches casefolded lines.
+        """
+        return not self.query.regex and not self.query.case_sensitive
+
+    def __call__(self, line: str, folded: str | None = None) -> tuple[Span, ...]:
+        """
+        Args:
+            line (str): The line to search.
+            folded (str | None): For case-insensitive literal queries, the
+                casefolded line, if it has already been computed.
+        """
+        query = self.query
+        if query.regex:
+            return self._search_pattern(line)
+        elif not query.case_sensitive:
+            haystack = line.casefold() if folded is None else folded
+            if len(haystack) != len(line):
+                return self._search_pattern(line)
+        else:
+            haystack = line
+        needle = self._needle
+        if not needle or needle not in haystack:
+            return NO_MATCHES
+        n = len(needle)
+        spans = []
+        pos = haystack.find(needle)
+        while pos >= 0:
+            if query.whole_word and self._splits_word(line, pos, pos + n):
+                pos = haystack.find(needle, pos + 1)
+                continue
+            spans.append((pos, pos + n))
+            pos = haystack.find(needle, pos + n)
+        return tuple(spans)
+
+    def expand(self, line: str, span: Span, replacement: str) -> str:
+        """
+        Returns the text that should replace the match at span in line. For
+        regex queries, backreferences (e.g., \\1 or \\g<name>) in replacement
+        are expanded; raises re.error if they are invalid.
+        """
+        if not self.query.regex or self._pattern is None:
+            return replacement
+        match = self._pattern.match(line, span[0])
+        if match is None:
+            return replacement
+        return match.expand(replacement)
+
+    def _search_pattern(self, line: str) -> tuple[Span, ...]:
+        if self._pattern is None:
+            return NO_MATCHES
+        # empty matches can't be selected, so they are skipped.
+        return tuple(
+            m.span()
+            for m in self._pattern.finditer(line)
+            if m.end() > m.start()
+            and not (self.query.whole_word and self._splits_word(line, *m.span()))
+        )
+
+    @staticmethod
+    def _splits_word(line: str, start: int, end: int) -> bool:
+        return splits_word(line, start) or splits_word(line, end)
+
+
+class FindIndex:
+    """
+    An index of every match of a find query, stored per line of the document.
+
+    The index is built once for a query, and then patched for only the lines
+    touched by each edit, so that counting and navigating matches never
+    requires rescanning the document.
+
+    If max_matches is set, scanning stops once that many matches have been
+    found; only the first scanned_rows lines are then indexed.
+
+    Case-insensitive queries search folded_lines, if provided; the caller is
+    responsible for patching folded_lines before patching the index.
+
+    If scope is set, only the lines in the scope are scanned; the scope is
+    updated when the index is patched.
+
+    If span_filter is set, only the matches it keeps are indexed. The
+    unfiltered matches (candidates) are kept, too, so that a new filter (e.g.,
+    for the syntax regions of a new parse) can be applied with refilter,
+    without rescanning the document.
+    """
+
+    def __init__(
+        self,
+        query: FindQuery,
+        max_matches: int | None = None,
+        folded_lines: FoldedLines | None = None,
+        scope: Scope | None = None,
+        span_filter: SpanFilter | None = None,
+    ) -> None:
+        self.query = query
+        self.max_matches = max_matches
+        self.scope = scope
+        self.span_filter = span_filter
+        self.total = 0
+        self.scanned_rows = 0
+        self.matcher = LineMatcher(query)
+        self.folded_lines = folded_lines if self.matcher.uses_folded_lines else None
+        self._lines: list[tuple[Span, ...]] = []
+        self._candidates: list[tuple[Span, ...]] = []
+        self._sorted_matches: list[tuple[int, int, int]] | None = None
+
+    @property
+    def is_complete(self) -> bool:
+        """
+        True if every line of the document has been scanned for the query.
+        """
+        return self.scanned_rows == len(self._lines)
+
+    def build(
+        self,
+        lines: Sequence[str],
+        is_cancelled: Callable[[], bool] | None = None,
+    ) -> bool:
+        """
+        Scan the lines of the document for the query.
+
+        Args:
+            lines (Sequence[str]): The lines of the document.
+            is_cancelled (Callable[[], bool] | None): If provided, polled
+                periodically; the build is abandoned if it returns True.
+
+        Returns:
+            bool: False if the build was cancelled, otherwise True.
+        """
+        match, span_filter = self._match, self.span_filter
+        max_matches = self.max_matches
+        if self.scope is None:
+            first_row, stop_row = 0, len(lines)
+        else:
+            first_row = min(self.scope.start[0], len(lines))
+            stop_row = min(self.scope.end[0] + 1, len(lines))
+        # lines outside the scope are not scanned, but can't match.
+        index: list[tuple[Span, ...]] = [NO_MATCHES] * first_row
+        candidates: list[tuple[Span, ...]] = [NO_MATCHES] * first_row
+        total = 0
+        scanned_rows = len(lines)
+        for chunk_start in range(first_row, stop_row, BUILD_CHUNK_SIZE):
+            if is_cancelled is not None and is_cancelled():
+                return False
+            rows = range(chunk_start, min(chunk_start + BUILD_CHUNK_SIZE, stop_row))
+            chunk = [match(row, lines[row]) for row in rows]
+            if span_filter is not None:
+                candidates.extend(chunk)
+                chunk = [
+                    span_filter(row, spans) if spans else spans
+                    for row, spans in zip(rows, chunk)
+                ]
+            chunk_total = sum(map(len, chunk))
+            if max_matches is not None and total + chunk_total >= max_matches:
+                for spans in chunk:
+                    index.append(spans)
+                    total += len(spans)
+                    if total >= max_matches:
+                        break
+                scanned_rows = len(index)
+                break
+            index.extend(chunk)
+            total += chunk_total
+        self.scanned_rows = scanned_rows
+        index.extend([NO_MATCHES] * (len(lines) - len(index)))
+        self._lines = index
+        if span_filter is not None:
+            # candidates after the scanned rows are found again when needed.
+            del candidates[scanned_rows:]
+            candidates.extend([NO_MATCHES] * (len(lines) - len(candidates)))
+            self._candidates = candidates
+        self._sorted_matches = None
+        self.total = total
+        return True
+
+    def narrow(
+        self,
+        query: FindQuery,
+        lines: Sequence[str],
+        folded_lines: FoldedLines | None = None,
+    ) -> FindIndex:
+        """
+        Returns a new index for query, which must extend this index's query, by
+        scanning only the lines that matched this index's query. This index
+        must be complete and up to date with lines.
+        """
+        assert query.extends(self.query) and self.is_complete
+        index = FindIndex(
+            query,
+            max_matches=self.max_matches,
+            folded_lines=folded_lines,
+            scope=self.scope,
+        )
+        scan = index._scan
+        max_matches = index.max_matches
+        new_lines = [NO_MATCHES] * len(lines)
+        total = 0
+        scanned_rows = len(lines)
+        for row in compress(range(len(lines)), self._lines):
+            spans = scan(row, lines[row])
+            new_lines[row] = spans
+            total += len(spans)
+            if max_matches is not None and total >= max_matches:
+                scanned_rows = row + 1
+                break
+        index._lines = new_lines
+        index.scanned_rows = scanned_rows
+        index.total = total
+        return index
+
+    def patch(self, lines: Sequence[str], edits: Iterable[LineEdit]) -> None:
+        """
+        Update the index after the document has been edited.
+
+        Args:
+            lines (Sequence[str]): The lines of the document, after the edits.
+            edits (Iterable[LineEdit]): The edits made since the index was last
+                built or patched, in the order they were made.
+        """
+        edits = list(edits)
+        if not edits:
+            return
+        self._sorted_matches = None
+        if self.scope is not None:
+            self.scope = self.scope.patch(edits)
+        index, candidates = self._lines, self._candidates
+        for edit in edits:
+            removed = index[edit.first : edit.old_last + 1]
+            self.total -= sum(map(len, removed))
+            index[edit.first : edit.old_last + 1] = [NO_MATCHES] * (
+                edit.new_last - edit.first + 1
+            )
+            if self.span_filter is not None:
+                candidates[edit.first : edit.old_last + 1] = [NO_MATCHES] * (
+                    edit.new_last - edit.first + 1
+                )
+            if edit.old_last < self.scanned_rows:
+                self.scanned_rows += edit.delta
+            elif edit.first < self.scanned_rows:
+                self.scanned_rows = edit.first
+        if len(index) != len(lines):
+            # the edits don't describe this document; start over.
+            self.build(lines)
+            return
+        match, span_filter = self._match, self.span_filter
+        for first, last in merge_line_edits(edits):
+            for row in range(max(first, 0), min(last + 1, self.scanned_rows)):
+                new = match(row, lines[row])
+                if span_filter is not None:
+                    candidates[row] = new
+                    new = span_filter(row, new) if new else new
+                self.total += len(new) - len(index[row])
+                index[row] = new
+        if not self.is_complete:
+            # the edits may have removed matches, or unscanned the rows they
+            # touched.
+            self._resume_scan(lines)
+
+    def refilter(self, span_filter: SpanFilter) -> None:
+        """
+        Replace the index's span_filter, and apply it to the candidate
+        matches on the scanned lines. The index must have been built with a
+        span_filter.
+        """
+        assert self.span_filter is not None
+        self.span_filter = span_filter
+        self._sorted_matches = None
+        index, candidates = self._lines, self._candidates
+        for row in compress(range(self.scanned_rows), candidates):
+            index[row] = span_filter(row, candidates[row])
+        self.total = sum(map(len, index))
+
+    def matches_on_line(self, row: int) -> tuple[Span, ...]:
+        """
+        Returns the (start, end) columns of each match on the given line.
+        """
+        if 0 <= row < len(self._lines):
+            return self._lines[row]
+        return NO_MATCHES
+
+    def next_match(self, location: Location, lines: Sequence[str]) -> Selection | None:
+        """
+        Returns the first match at or after location, wrapping around to the
+        start of the document if necessary. Returns None if there are no matches.
+
+        Lines that have not been indexed are scanned directly, stopping at the
+        first match.
+        """
+        row, col = location
+        matches = self._get_sorted_matches()
+        i = bisect_left(matches, (row, col))
+        if i < len(matches):
+            return self._to_selection(matches[i])
+        for r in range(max(row, self.scanned_rows), len(lines)):
+            for start, end in self._scan(r, lines[r]):
+                if r > row or start >= col:
+                    return Selection(start=(r, start), end=(r, end))
+        if matches:
+            return self._to_selection(matches[0])
+        # wrap around to the lines before the cursor that have not been
+        # indexed (on the cursor's row, any match starts before col).
+        for r in range(self.scanned_rows, min(row + 1, len(lines))):
+            spans = self._scan(r, lines[r])
+            if spans:
+                return Selection(start=(r, spans[0][0]), end=(r, spans[0][1]))
+        return None
+
+    def previous_match(
+        self, location: Location, lines: Sequence[str]
+    ) -> Selection | None:
+        """
+        Returns the last match that starts before location, wrapping around to
+        the end of the document if necessary. Returns None if there are no
+        matches.
+
+        Lines that have not been indexed are scanned directly, stopping at the
+        first match.
+        """
+        row, col = location
+        for r in range(min(row, len(lines) - 1), self.scanned_rows - 1, -1):
+            for start, end in reversed(self._scan(r, lines[r])):
+                if r < row or start < col:
+                    return Selection(start=(r, start), end=(r, end))
+        matches = self._get_sorted_matches()
+        i = bisect_left(matches, (row, col))
+        if i > 0:
+            return self._to_selection(matches[i - 1])
+        # wrap around to the end of the document; any match on the cursor's
+        # row (if it has not been indexed) starts at or after col.
+        for r in range(len(lines) - 1, max(row - 1, self.scanned_rows - 1), -1):
+            spans = self._scan(r, lines[r])
+            if spans:
+                return Selection(start=(r, spans[-1][0]), end=(r, spans[-1][1]))
+        if matches:
+            return self._to_selection(matches[-1])
+        return None
+
+    def replace_all(
+        self, lines: Sequence[str], replacement: str, newline: str = "\n"
+    ) -> Replacement | None:
+        """
+        Computes the single edit that replaces every match in the document,
+        including matches in lines that have not been indexed. Returns None if
+        there are no matches. Raises re.error if replacement contains an
+        invalid backreference.
+        """
+        expand = self.matcher.expand
+        first_row: int | None = None
+        last_row = 0
+        count = 0
+        new_lines: list[str] = []
+        for row, line in enumerate(lines):
+            spans = (
+                self._lines[row] if row < self.scanned_rows else self._scan(row, line)
+            )
+            if not spans:
+                if first_row is not None:
+                    new_lines.append(line)
+                continue
+            if first_row is None:
+                first_row = row
+            parts: list[str] = []
+            pos = 0
+            for start, end in spans:
+                parts.append(line[pos:start])
+                parts.append(expand(line, (start, end), replacement))
+                pos = end
+            parts.append(line[pos:])
+            new_lines.append("".join(parts))
+            last_row = row
+            count += len(spans)
+        if first_row is None:
+            return None
+        # drop the unchanged lines after the last match
+        del new_lines[last_row - first_row + 1 :]
+        return Replacement(
+            start=(first_row, 0),
+            end=(last_row, len(lines[last_row])),
+            text=newline.join(new_lines),
+            replaced=count,
+        )
+
+    def match_number(self, selection: Selection) -> int | None:
+        """
+        Returns the (one-based) ordinal of the match that is exactly selected by
+        selection, or None if the selection is not a match.
+        """
+        start, end = sorted(selection)
+        if start[0] != end[0]:
+            return None
+        match = (start[0], start[1], end[1])
+        matches = self._get_sorted_matches()
+        i = bisect_left(matches, match)
+        if i < len(matches) and matches[i] == match:
+            return i + 1
+        return None
+
+    def match_at(self, i: int) -> Selection:
+        """
+        Returns the i-th (zero-based) indexed match, in document order.
+        """
+        return self._to_selection(self._get_sorted_matches()[i])
+
+    def _resume_scan(self, lines: Sequence[str]) -> None:
+        """
+        Scan the lines after scanned_rows until max_matches have been found
+        (or every line has been scanned), as build would have.
+        """
+        match, span_filter = self._match, self.span_filter
+        max_matches = self.max_matches
+        index, candidates = self._lines, self._candidates
+        stop_row = len(lines)
+        if self.scope is not None:
+            stop_row = min(self.scope.end[0] + 1, stop_row)
+        row = self.scanned_rows
+        while row < stop_row and (max_matches is None or self.total < max_matches):
+            spans = match(row, lines[row])
+            if span_filter is not None:
+                candidates[row] = spans
+                spans = span_filter(row, spans) if spans else spans
+            index[row] = spans
+            self.total += len(spans)
+            row += 1
+        # lines after the scope can't match.
+        self.scanned_rows = len(lines) if row >= stop_row else row
+
+    def _scan(self, row: int, line: str) -> tuple[Span, ...]:
+        spans = self._match(row, line)
+        if self.span_filter is None or not spans:
+            return spans
+        return self.span_filter(row, spans)
+
+    def _match(self, row: int, line: str) -> tuple[Span, ...]:
+        """
+        Returns the matches on row, before they are filtered by span_filter.
+        """
+        scope = self.scope
+        if scope is not None and not scope.start[0] <= row <= scope.end[0]:
+            return NO_MATCHES
+        if self.folded_lines is None:
+            spans = self.matcher(line)
+        else:
+            spans = self.matcher(line, self.folded_lines.get(row, line))
+        return spans if scope is None or not spans else scope.clip(row, spans)
+
+    def _get_sorted_matches(self) -> list[tuple[int, int, int]]:
+        """
+        Returns the (row, start, end) of every indexed match, in document order.
+        The list is built lazily, after the index is built or patched.
+        """
+        if self._sorted_matches is None:
+            self._sorted_matches = [
+                (row, start, end)
+                for row, spans in enumerate(self._lines[: self.scanned_rows])
+                if spans
+                for start, end in spans
+            ]
+        return self._sorted_matches
+
+    @staticmethod
+    def _to_selection(match: tuple[int, int, int]) -> Selection:
+        row, start, end = match
+        return Selection(start=(row, start), end=(row, end))
+
+
+def _match_width(query: FindQuery) -> tuple[int, int] | None:
+    """
+    Returns the least and most characters that a match of query can span,
+    or None if a match can span (or look ahead or behind) any number of
+    characters.
+    """
+    if not query.regex:
+        return len(query.text), len(query.text)
+    try:
+        parsed = sre_parse.parse(query.text, query.flags)
+    except Exception:
+        return None
+    least, most = parsed.getwidth()
+    if most >= sre_parse.MAXREPEAT or _has_lookaround(parsed):
+        return None
+    return least, most
+
+
+def _has_lookaround(items: Iterable[tuple[Any, Any]]) -> bool:
+    """
+    Returns True if a parsed regex has a lookahead or lookbehind, which reads
+    characters outside of the match.
+    """
+    for op, arg in items:
+        if op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            return True
+        for item in arg if isinstance(arg, (tuple, list)) else (arg,):
+            subpatterns = item if isinstance(item, list) else [item]
+            if any(
+                isinstance(subpattern, sre_parse.SubPattern)
+                and _has_lookaround(subpattern)
+                for subpattern in subpatterns
+            ):
+                return True
+    return False
+
+
+class MultilineFindIndex:
+    """
+    An index of every match of a find query that can span lines. The query is
+    searched in a single pass over a JoinedBuffer of the document, and matches
+    are stored as (start, end) offsets into the buffer.
+
+    After an edit, only the text around the edit is scanned again: a match
+    of a pattern with a bounded width only depends on the text within that
+    width of its start, so the matches that start far enough before the edit
+    are kept, and scanning stops once it finds a match that the old scan
+    found after the edit (see _rescan). A pattern that can match (or look
+    ahead or behind) any number of characters is scanned again in full. The
+    caller is responsible for patching the buffer before patching the index.
+
+    If max_matches is set, scanning stops once that many matches have been
+    found. If scope is set, only the text in the scope is scanned; the scope is
+    updated when the index is patched.
+    """
+
+    def __init__(
+        self,
+        query: FindQuery,
+        max_matches: int | None = None,
+        buffer: JoinedBuffer | None = None,
+        scope: Scope | None = None,
+    ) -> None:
+        self.query = query
+        self.max_matches = max_matches
+        self.buffer = buffer
+        self.scope = scope
+        self.total = 0
+        self._matches: list[Span] = []
+        # the offset where scanning stopped, if the index is incomplete (or
+        # has not been built).
+        self._scanned_to: int | None = 0
+        # ^ and $ match at the start and end of each line, like they do when
+        # searching line-by-line.
+        compiled = compile_pattern(
+            query.text if query.regex else re.escape(query.text),
+            query.flags | re.MULTILINE,
+        )
+        self._pattern = compiled if isinstance(compiled, re.Pattern) else None
+        # the most characters that the scan reads from where a match starts
+        # (or might have started), including the character after the match;
+        # None if that isn't bounded.
+        width = _match_width(query)
+        self._reach = None if width is None else width[1] + 1
+        # True if the scan keeps every match it finds, so the scan only skips
+        # the text inside the indexed matches.
+        self._keeps_every_match = (
+            width is not None and width[0] > 0 and not query.whole_word
+        )
+
+    @property
+    def is_complete(self) -> bool:
+        """
+        True if the entire document has been scanned for the query.
+        """
+        return self._scanned_to is None
+
+    def build(
+        self,
+        lines: Sequence[str],
+        is_cancelled: Callable[[], bool] | None = None,
+    ) -> bool:
+        """
+        Scan the document for the query.
+
+        Args:
+            lines (Sequence[str]): The lines of the document.
+            is_cancelled (Callable[[], bool] | None): If provided, polled
+                periodically; the build is abandoned if it returns True.
+
+        Returns:
+            bool: False if the build was cancelled, otherwise True.
+        """
+        buffer = self._get_buffer(lines)
+        max_matches = self.max_matches
+        matches: list[Span] = []
+        scanned_to: int | None = None
+        for span in self._iter_matches(buffer, 0):
+            if max_matches is not None and len(matches) >= max_matches:
+                scanned_to = matches[-1][1]
+                break
+            if (
+                is_cancelled is not None
+                and len(matches) % BUILD_CHUNK_SIZE == 0
+                and is_cancelled()
+            ):
+                return False
+            matches.append(span)
+        self._matches = matches
+        self._scanned_to = scanned_to
+        self.total = len(matches)
+        return True
+
+    def patch(self, lines: Sequence[str], edits: Iterable[LineEdit]) -> None:
+        """
+        Update the index after the document has been edited.
+
+        Args:
+            lines (Sequence[str]): The lines of the document, after the edits.
+            edits (Iterable[LineEdit]): The edits made since the index was last
+                built or patched, in the order they were made.
+        """
+        edits = list(edits)
+        if not edits:
+            return
+        if self.scope is not None:
+            self.scope = self.scope.patch(edits)
+        buffer = self.buffer
+        change = None if buffer is None else buffer.sync(lines)
+        if (
+            buffer is None
+            or change is None
+            or self._reach is None
+            or self.scope is not None
+        ):
+            # the changed text isn't known, or any match may have changed.
+            self.build(lines)
+            return
+        self._rescan(buffer, change)
+
+    def next_match(self, location: Location, lines: Sequence[str]) -> Selection | None:
+        """
+        Returns the first match at or after location, wrapping around to the
+        start of the document if necessary. Returns None if there are no matches.
+        """
+        buffer = self._get_buffer(lines)
+        offset = buffer.offset(location)
+        i = bisect_left(self._matches, (offset,))
+        if i < len(self._matches):
+            return self._to_selection(buffer, self._matches[i])
+        if self._scanned_to is not None:
+            for span in self._iter_matches(buffer, max(offset, self._scanned_to)):
+                return self._to_selection(buffer, span)
+        if self._matches:
+            return self._to_selection(buffer, self._matches[0])
+        return None
+
+    def previous_match(
+        self, location: Location, lines: Sequence[str]
+    ) -> Selection | None:
+        """
+        Returns the last match that starts before location, wrapping around to
+        the end of the document if necessary. Returns None if there are no
+        matches.
+        """
+        buffer = self._get_buffer(lines)
+        offset = buffer.offset(location)
+        if self._scanned_to is not None and offset > self._scanned_to:
+            last = None
+            for span in self._iter_matches(buffer, self._scanned_to):
+                if span[0] >= offset:
+                    break
+                last = span
+            if last is not None:
+                return self._to_selection(buffer, last)
+        i = bisect_left(self._matches, (offset,))
+        if i > 0:
+            return self._to_selection(buffer, self._matches[i - 1])
+        if self._scanned_to is not None:
+            last = None
+            for span in self._iter_matches(buffer, max(offset, self._scanned_to)):
+                last = span
+            if last is not None:
+                return self._to_selection(buffer, last)
+        if self._matches:
+            return self._to_selection(buffer, self._matches[-1])
+        return None
+
+    def match_number(self, selection: Selection) -> int | None:
+        """
+        Returns the (one-based) ordinal of the match that is exactly selected by
+        selection, or None if the selection is not a match.
+        """
+        if self.buffer is None:
+            return None
+        start, end = sorted(selection)
+        match = (self.buffer.offset(start), self.buffer.offset(end))
+        i = bisect_left(self._matches, match)
+        if i < len(self._matches) and self._matches[i] == match:
+            return i + 1
+        return None
+
+    def match_at(self, i: int) -> Selection:
+        """
+        Returns the i-th (zero-based) indexed match, in document order.
+        """
+        assert self.buffer is not None
+        return self._to_selection(self.buffer, self._matches[i])
+
+    def expand(self, selection: Selection, replacement: str) -> str | None:
+        """
+        Returns the text that should replace the match exactly selected by
+        selection, or None if the selection is not a match. For regex queries,
+        backreferences in replacement are expanded; raises re.error if they are
+        invalid.
+        """
+        if self.match_number(selection) is None:
+            return None
+        assert self.buffer is not None
+        return self._expand(
+            self.buffer, self.buffer.offset(min(selection)), replacement
+        )
+
+    def replace_all(
+        self, lines: Sequence[str], replacement: str, newline: str = "\n"
+    ) -> Replacement | None:
+        """
+        Computes the single edit that replaces every match in the document,
+        including matches after the index's max_matches. Returns None if there
+        are no matches. Raises re.error if replacement contains an invalid
+        backreference.
+        """
+        buffer = self._get_buffer(lines)
+        spans = self._matches
+        if self._scanned_to is not None:
+            spans = [*spans, *self._iter_matches(buffer, self._scanned_to)]
+        if not spans:
+            return None
+        text = buffer.text
+        parts: list[str] = []
+        pos = spans[0][0]
+        for start, end in spans:
+            parts.append(text[pos:start])
+            parts.append(self._expand(buffer, start, replacement))
+            pos = end
+        new_text = "".join(parts)
+        if newline != "\n":
+            new_text = new_text.replace("\n", newline)
+        return Replacement(
+            start=buffer.location(spans[0][0]),
+            end=buffer.location(spans[-1][1]),
+            text=new_text,
+            replaced=len(spans),
+        )
+
+    def _rescan(self, buffer: JoinedBuffer, change: BufferChange) -> None:
+        """
+        Update the matches after change, by scanning the buffer from the first
+        match that may have read the changed text, until the scan lines up
+        with the old scan after the change.
+
+        The scan decides whether a match starts at an offset by reading at
+        most _reach characters from there (and the character before it), so
+        the decisions for the offsets well before or after the change are the
+        same as before. The scans line up when both find a match at the same
+        offset after the change, or (if every match is kept) when the new
+        scan resumes after the change at an offset that the old scan searched
+        from, too.
+        """
+        assert self._reach is not None
+        old, old_scanned_to = self._matches, self._scanned_to
+        max_matches = self.max_matches
+        shift = change.new_end - change.old_end
+        cut = change.start - self._reach
+        kept = bisect_left(old, (cut,))
+        matches = old[:kept]
+        pos = max(cut, matches[-1][1] if matches else 0)
+        if old_scanned_to is not None:
+            # the old scan stopped there
+            pos = min(pos, old_scanned_to)
+        # the offsets where the new scan reads the same text as the old one
+        synced = change.new_end + 1
+        tail: list[Span] | None = None
+        scanned_to: int | None = None
+        for span in self._iter_matches(buffer, pos):
+            start, end = span
+            if start >= synced:
+                i = bisect_left(old, (start - shift,))
+                if i < len(old) and old[i][0] == start - shift:
+                    tail = old[i:]
+                    break
+            if max_matches is not None and len(matches) >= max_matches:
+                scanned_to = matches[-1][1]
+                break
+            matches.append(span)
+            if self._keeps_every_match and end >= synced:
+                # the old scan searched from the end of one of its matches to
+                # the start of the next
+                i = bisect_left(old, (end - shift,))
+                if (i == 0 or old[i - 1][1] <= end - shift) and (
+                    i < len(old) or old_scanned_to in (None, end - shift)
+                ):
+                    tail = old[i:]
+                    break
+        if tail is not None:
+            matches.extend([(start + shift, end + shift) for start, end in tail])
+            scanned_to = None if old_scanned_to is None else old_scanned_to + shift
+            if max_matches is not None and len(matches) > max_matches:
+                del matches[max_matches:]
+                scanned_to = matches[-1][1]
+            elif scanned_to is not None:
+                # the change removed matches, so the index has room for more
+                for span in self._iter_matches(buffer, scanned_to):
+                    if max_matches is not None and len(matches) >= max_matches:
+                        scanned_to = matches[-1][1]
+                        break
+                    matches.append(span)
+                else:
+                    scanned_to = None
+        self._matches = matches
+        self._scanned_to = scanned_to
+        self.total = len(matches)
+
+    def _get_buffer(self, lines: Sequence[str]) -> JoinedBuffer:
+        if self.buffer is None:
+            self.buffer = JoinedBuffer(lines)
+        else:
+            self.buffer.sync(lines)
+        return self.buffer
+
+    def _iter_matches(self, buffer: JoinedBuffer, pos: int) -> Iterator[Span]:
+        if self._pattern is None:
+            return
+        text = buffer.text
+        endpos = len(text)
+        if self.scope is not None:
+            pos = max(pos, buffer.offset(self.scope.start))
+            endpos = buffer.offset(self.scope.end)
+        for match in self._pattern.finditer(text, pos, endpos):
+            start, end = match.span()
+            # empty matches can't be selected, so they are skipped.
+            if end == start:
+                continue
+            if self.query.whole_word and (
+                splits_word(text, start) or splits_word(text, end)
+            ):
+                continue
+            yield start, end
+
+    def _expand(self, buffer: JoinedBuffer, start: int, replacement: str) -> str:
+        if not self.query.regex or self._pattern is None:
+            return replacement
+        match = self._pattern.match(buffer.text, start)
+        if match is None:
+            return replacement
+        return match.expand(replacement)
+
+    @staticmethod
+    def _to_selection(buffer: JoinedBuffer, span: Span) -> Selection:
+        return Selection(start=buffer.location(span[0]), end=buffer.location(span[1]))
@@ -1,22 +1,71 @@
 from __future__ import annotations
 
 from textual import on
+from textual.binding import Binding
 from textual.events import Blur, Key
+from textual.message import Message
 from textual.widgets import Input
 
 from textual_textarea.cancellable_input import CancellableInput
+from textual_textarea.find_index import SYNTAX_KINDS, FindQuery, SyntaxKind
 
 
 class FindInput(CancellableInput):
+    BINDINGS = [
+        Binding("alt+r", "toggle_regex", "Toggle Regex", show=False),
+        Binding("alt+c", "toggle_case_sensitive", "Toggle Match Case", show=False),
+        Binding("alt+w", "toggle_whole_word", "Toggle Whole Word", show=False),
+        Binding("alt+s", "toggle_in_selection", "Toggle In Selection", show=False),
+        Binding("alt+t", "cycle_syntax", "Cycle Syntax Filter", show=False),
+        Binding("alt+l", "toggle_results", "Toggle Results", show=False),
+    ]
+
+    class OptionsChanged(Message):
+        """
+        Posted when the user toggles one of the find options, e.g., regex.
+        """
+
+        def __init__(self, query: FindQuery, in_selection: bool = False) -> None:
+            super().__init__()
+            self.query = query
+            self.in_selection = in_selection
+
+    class PreviousMatchRequested(Message):
+        """
+        Posted when the user presses shift+F3 to find the previous match.
+        """
+
+        def __init__(self, query: FindQuery) -> None:
+            super().__init__()
+            self.query = query
+
+    class ResultsToggled(Message):
+        """
+        Posted when the user presses alt+l to show (or hide) the list of
+        every match.
+        """
+
+        def __init__(self, query: FindQuery) -> None:
+            super().__init__()
+            self.query = query
+
     def __init__(
         self,
         value: str = "",
         history: list[str] | None = None,
         classes: str | None = None,
+        regex: bool = False,
+        case_sensitive: bool = True,
+        whole_word: bool = False,
+        in_selection: bool = False,
+        syntax: SyntaxKind = "any",
     ) -> None:
         super().__init__(
             value=value,
-            placeholder="Find; enter for next; ESC to close; ↑↓ for history",
+            placeholder=(
+                "Find; enter for next; shift+F3 for previous; ESC to close; "
+                "↑↓ for history"
+            ),
             password=False,
             type="text",
             id="textarea__find_input",
@@ -24,10 +73,53 @@ class FindInput(CancellableInput):
         )
         self.history: list[str] = [] if history is None else history
         self.history_index: int | None = None
+        self.regex = regex
+        self.case_sensitive = case_sensitive
+        self.whole_word = whole_word
+        self.in_selection = in_selection
+        self.syntax = syntax
+        self._update_border_title()
+
+    @property
+    def find_query(self) -> FindQuery:
+        return FindQuery(
+            self.value,
+            regex=self.regex,
+            case_sensitive=self.case_sensitive,
+            whole_word=self.whole_word,
+            syntax=self.syntax,
+        )
+
+    def action_toggle_regex(self) -> None:
+        self.regex = not self.regex
+        self._options_changed()
+
+    def action_toggle_case_sensitive(self) -> None:
+        self.case_sensitive = not self.case_sensitive
+        self._options_changed()
+
+    def action_toggle_whole_word(self) -> None:
+        self.whole_word = not self.whole_word
+        self._options_changed()
+
+    def action_toggle_in_selection(self) -> None:
+        self.in_selection = not self.in_selection
+        self._options_changed()
+
+    def action_cycle_syntax(self) -> None:
+        """
+        Limit matches to code, then comments, then strings, then anywhere.
+        """
+        i = SYNTAX_KINDS.index(self.syntax)
+        self.syntax = SYNTAX_KINDS[(i + 1) % len(SYNTAX_KINDS)]
+        self._options_changed()
+
+    def action_toggle_results(self) -> None:
+        self.post_message(self.ResultsToggled(self.find_query))
 
     @on(Key)
     def handle_special_keys(self, event: Key) -> None:
-        if event.key not in ("up", "down", "f3"):
+        if event.key not in ("up", "down", "f3", "shift+f3"):
             self.history_index = None
             return
         event.stop()
@@ -38,12 +130,40 @@ class FindInput(CancellableInput):
             self._handle_up()
         elif event.key == "f3":
             self.post_message(Input.Submitted(self, self.value))
+        elif event.key == "shift+f3":
+            self.checkpoint()
+            self.post_message(self.PreviousMatchRequested(self.find_query))
 
     @on(Blur)
     def handle_blur(self) -> None:
         if self.value and (not self.history or self.value != self.history[-1]):
             self.history.append(self.value)
 
+    def set_in_selection(self, in_selection: bool) -> None:
+        """
+        Set the in_selection option without posting OptionsChanged.
+        """
+        self.in_selection = in_selection
+        self._update_border_title()
+
+    def _options_changed(self) -> None:
+        self._update_border_title()
+        self.post_message(self.OptionsChanged(self.find_query, self.in_selection))
+
+    def _update_border_title(self) -> None:
+        options = []
+        if self.regex:
+            options.append("regex")
+        if not self.case_sensitive:
+            options.append("ignore case")
+        if self.whole_word:
+            options.append("whole word")
+        if self.in_selection:
+            options.append("in selection")
+        if self.syntax != "any":
+            options.append(f"{self.syntax} only")
+        self.border_title = ", ".join(options) or None
+
     def _handle_down(self) -> None:
         if self.history_index is None:
             self.checkpoint()
@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import os
+from contextlib import suppress
+from typing import Callable, Sequence
+
+from rich.segment import Segment
+from textual import events
+from textual.binding import Binding
+from textual.cache import LRUCache
+from textual.css.query import NoMatches
+from textual.geometry import Region, Size
+from textual.message import Message
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+from textual.widgets import Input
+from textual.widgets.text_area import Selection
+
+from textual_textarea.find_in_files import FileMatch, FileResult
+from textual_textarea.find_index import FindIndex, MultilineFindIndex
+
+
+class FindResults(ScrollView, can_focus=True):
+    """
+    A list of every indexed match of a find query, with the line number and a
+    preview of the line containing each match.
+
+    Rows are rendered lazily, only when they are scrolled into view, so a
+    query with many matches does not create a widget (or a Text) per match.
+    """
+
+    COMPONENT_CLASSES = {
+        "find-results--line-number",
+        "find-results--match",
+        "find-results--cursor",
+    }
+    DEFAULT_CSS = """
+    FindResults {
+        height: 10;
+        border: round $foreground;
+        background: $background;
+        overflow-x: hidden;
+        & .find-results--line-number {
+            color: $foreground-muted;
+        }
+        & .find-results--match {
+            background: $warning 30%;
+        }
+        & .find-results--cursor {
+            background: $accent 30%;
+        }
+    }
+    """
+    BINDINGS = [
+        Binding("up", "cursor_up", "Previous Result", show=False),
+        Binding("down", "cursor_down", "Next Result", show=False),
+        Binding("pageup", "page_up", "Previous Page", show=False),
+        Binding("pagedown", "page_down", "Next Page", show=False),
+        Binding("home", "first", "First Result", show=False),
+        Binding("end", "last", "Last Result", show=False),
+        Binding("enter", "select", "Go To Result", show=False),
+        Binding("escape", "focus_input", "Focus Input", show=False),
+    ]
+    # the number of characters of a line shown before a match that would
+    # otherwise be cropped.
+    CONTEXT = 12
+
+    class MatchSelected(Message):
+        """
+        Posted when the user selects a result, with enter or a click.
+        """
+
+        def __init__(self, selection: Selection) -> None:
+            super().__init__()
+            self.selection = selection
+
+    def __init__(
+        self,
+        name: str | None = None,
+        id: str | None = None,  # noqa: A002
+        classes: str | None = None,
+    ) -> None:
+        super().__init__(name=name, id=id, classes=classes)
+        self.cursor = 0
+        self._index: FindIndex | MultilineFindIndex | None = None
+        self._get_line: Callable[[int], str] = lambda _: ""
+        self._line_number_width = 1
+        self._strips: LRUCache[tuple[int, int, bool], Strip] = LRUCache(1024)
+
+    @property
+    def result_count(self) -> int:
+        return 0 if self._index is None else self._index.total
+
+    def set_matches(
+        self,
+        index: FindIndex | MultilineFindIndex | None,
+        get_line: Callable[[int], str],
+        line_count: int,
+    ) -> None:
+        """
+        Show the matches in index (or nothing, if it is None); get_line
+        returns the text of a row of the document. Only the rows in view are
+        rendered.
+        """
+        self._index = index
+        self._get_line = get_line
+        self._line_number_width = len(str(line_count))
+        self._strips.clear()
+        count = self.result_count
+        self.cursor = min(self.cursor, max(count - 1, 0))
+        if index is None:
+            self.border_title = None
+        else:
+            complete = index.is_complete
+            self.border_title = f"{count:,}{'' if complete else '+'} results"
+        self.virtual_size = Size(self.scrollable_content_region.width, count)
+        self.refresh()
+
+    def move_cursor(self, cursor: int) -> None:
+        """
+        Highlight the result numbered cursor (zero-based), scrolling it into
+        view.
+        """
+        if not self.result_count:
+            return
+        self.cursor = max(0, min(cursor, self.result_count - 1))
+        self._strips.clear()
+        self.scroll_to_region(
+            Region(0, self.cursor, 1, 1), animate=False, force=True, immediate=True
+        )
+        self.refresh()
+
+    def render_line(self, y: int) -> Strip:
+        i = round(self.scroll_offset.y) + y
+        width = self.scrollable_content_region.width
+        if i >= self.result_count:
+            return Strip.blank(width, self.rich_style)
+        key = (i, width, i == self.cursor)
+        strip = self._strips.get(key)
+        if strip is None:
+            strip = self._render_result(i, width)
+            self._strips[key] = strip
+        return strip
+
+    def on_resize(self, event: events.Resize) -> None:
+        self._strips.clear()
+        self.virtual_size = Size(
+            self.scrollable_content_region.width, self.result_count
+        )
+
+    def on_click(self, event: events.Click) -> None:
+        offset = event.get_content_offset(self)
+        if offset is None:
+            return
+        self.move_cursor(round(self.scroll_offset.y) + offset.y)
+        self.action_select()
+
+    def action_cursor_up(self) -> None:
+        self.move_cursor(self.cursor - 1)
+
+    def action_cursor_down(self) -> None:
+        self.move_cursor(self.cursor + 1)
+
+    def action_page_up(self) -> None:
+        self.move_cursor(self.cursor - self.scrollable_content_region.height)
+
+    def action_page_down(self) -> None:
+        self.move_cursor(self.cursor + self.scrollable_content_region.height)
+
+    def action_first(self) -> None:
+        self.move_cursor(0)
+
+    def action_last(self) -> None:
+        self.move_cursor(self.result_count - 1)
+
+    def action_select(self) -> None:
+        if self._index is not None and self.cursor < self.result_count:
+            self.post_message(self.MatchSelected(self._index.match_at(self.cursor)))
+
+    def action_focus_input(self) -> None:
+        """
+        Focus the (find) input in the footer with the results.
+        """
+        if self.parent is not None:
+            with suppress(NoMatches):
+                self.parent.query(Input).first().focus()
+
+    def _get_preview(self, i: int) -> tuple[str, str, int, int]:
+        """
+        Returns the label of result i (its line number), the text of its
+        line, and the start and end columns of the match in that text.
+        """
+        assert self._index is not None
+        (row, start), (end_row, end) = self._index.match_at(i)
+        line = self._get_line(row)
+        if end_row != row:
+            # the preview of a match that spans lines ends with its first line
+            end = len(line)
+        return f"{row + 1:>{self._line_number_width}}  ", line, start, end
+
+    def _render_result(self, i: int, width: int) -> Strip:
+        number, line, start, end = self._get_preview(i)
+        base_style = self.rich_style
+        if i == self.cursor:
+            base_style += self.get_component_rich_style("find-results--cursor")
+        number_style = base_style + self.get_component_rich_style(
+            "find-results--line-number", partial=True
+        )
+        match_style = base_style + self.get_component_rich_style(
+            "find-results--match", partial=True
+        )
+        # keep the match in view, even if it is far from the start of the line
+        preview_start = max(0, start - self.CONTEXT)
+        if end > width - len(number) and preview_start > 0:
+            before = "…" + line[preview_start + 1 : start]
+        else:
+            before = line[:start]
+        segments = [
+            Segment(number, number_style),
+            Segment(before.expandtabs(1), base_style),
+            Segment(line[start:end].expandtabs(1), match_style),
+            Segment(line[end:].expandtabs(1), base_style),
+        ]
+        return Strip(segments).crop_extend(0, width, base_style)
+
+
+class FileFindResults(FindResults):
+    """
+    A list of the matches found by a search of the files in a directory.
+    Results are added as each batch of files is searched, and, like
+    FindResults, rendered only when they are scrolled into view.
+    """
+
+    class FileMatchSelected(Message):
+        """
+        Posted when the user selects a result, with enter or a click.
+        """
+
+        def __init__(self, path: str, selection: Selection) -> None:
+            super().__init__()
+            self.path = path
+            self.selection = selection
+
+    def __init__(
+        self,
+        root: str,
+        name: str | None = None,
+        id: str | None = None,  # noqa: A002
+        classes: str | None = None,
+    ) -> None:
+        super().__init__(name=name, id=id, classes=classes)
+        self.root = root
+        self._matches: list[tuple[str, FileMatch]] = []
+
+    @property
+    def result_count(self) -> int:
+        return len(self._matches)
+
+    def add_results(self, results: Sequence[FileResult]) -> None:
+        """
+        Append the matches in results to the list.
+        """
+        for result in results:
+            self._matches.extend((result.path, match) for match in result.matches)
+        self.border_title = f"{self.result_count:,} results"
+        self.virtual_size = Size(
+            self.scrollable_content_region.width, self.result_count
+        )
+        self.refresh()
+
+    def action_select(self) -> None:
+        if self.cursor < self.result_count:
+            path, match = self._matches[self.cursor]
+            self.post_message(
+                self.FileMatchSelected(
+                    path, Selection((match.row, match.start), (match.row, match.end))
+                )
+            )
+
+    def _get_preview(self, i: int) -> tuple[str, str, int, int]:
+        path, match = self._matches[i]
+        label = f"{os.path.relpath(path, self.root)}:{match.row + 1}  "
+        preview = match.preview
+        if match.preview_column > 0:
+            preview = "…" + preview[1:]
+        return (
+            label,
+            preview,
+            match.start - match.preview_column,
+            match.end - match.preview_column,
+        )
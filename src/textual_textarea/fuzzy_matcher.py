@@ -0,0 +1,309 @@
+from __future__ import annotations
+
+import re
+from itertools import filterfalse, islice
+from typing import Iterable, Iterator, Tuple, Union, cast
+
+from textual_textarea.completion_cache import CompletionItems
+
+CatalogItem = Union[str, Tuple[str, str], Tuple[Tuple[str, str], str]]
+
+# marks the start of each word in a candidate's searchable form, so that a
+# query can be required to start at one.
+BOUNDARY = "\x00"
+# the (empty) positions where words start: the start of the value, a letter or
+# digit that follows any other character (e.g., `_`, `.`, or `-`), an
+# upper-case letter that follows a lower-case letter or a digit, the last
+# upper-case letter of a run that is followed by a lower-case letter (so
+# `HTTPServer` has the words `HTTP` and `Server`), and a digit that follows a
+# letter.
+WORD_START_PROG = re.compile(
+    r"\A(?=.)"
+    r"|(?<=[\W_])(?=[^\W_])"
+    r"|(?<=[a-z0-9])(?=[A-Z])"
+    r"|(?<=[A-Z])(?=[A-Z][a-z])"
+    r"|(?<=[^\W\d_])(?=\d)",
+    re.DOTALL,
+)
+ACRONYM_PROG = re.compile(f"{BOUNDARY}(.)", re.DOTALL)
+# a candidate's record is its searchable form, followed by ID_MARK and its
+# index in the catalog. The records of the candidates that aren't found by the
+# bitsets are joined by SEPARATOR, and searched.
+SEPARATOR = "\x01"
+ID_MARK = "\x02"
+STOPS = SEPARATOR + ID_MARK
+# the number of candidates that are joined into each of those strings
+SEARCH_CHUNK_SIZE = 1_024
+
+SET_BIT_PROG = re.compile("1")
+
+
+def _bitset(ids: list[int], size: int) -> int:
+    bits = bytearray((size + 7) // 8)
+    for i in ids:
+        bits[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(bits, "little")
+
+
+def _word_offsets(marked: str) -> tuple[int, ...]:
+    """
+    Returns the offsets of the starts of the words in marked, once its
+    boundaries are removed.
+    """
+    return tuple(m.start() - k for k, m in enumerate(re.finditer(BOUNDARY, marked)))
+
+
+def _iter_bits(bitset: int) -> Iterator[int]:
+    """
+    Yields the positions of the bits that are set in bitset, in order. The
+    positions are found (by the regex engine, not in Python) as they are
+    consumed, so a caller that stops early doesn't pay for the rest.
+    """
+    # the binary digits, least-significant first
+    digits = bin(bitset)[:1:-1]
+    return map(re.Match.start, SET_BIT_PROG.finditer(digits))
+
+
+class FuzzyMatcher:
+    """
+    A completer that fuzzy-matches a static catalog of completions, so a host
+    can pass its identifiers (e.g., the tables and columns of a database) to
+    TextEditor once, instead of filtering them in a completer:
+
+        TextEditor(member_completer=FuzzyMatcher(columns))
+
+    A candidate matches a prefix if the prefix's characters appear in its
+    value, in order, ignoring case, and the first of them starts a word (see
+    WORD_START_PROG); e.g., `gun` matches `getUserName` and `get_user_name`,
+    but `etu` matches neither. Matches are ranked in these tiers, and in the
+    catalog's order within each tier:
+
+    1. the value starts with the prefix;
+    2. it starts with the prefix, ignoring case;
+    3. the prefix is a prefix of the first letters of its words (e.g., `gu`
+       for `getUserName`);
+    4. the prefix appears in it, ignoring case, at the start of a word (e.g.,
+       `username` for `getUserName`);
+    5. any other match.
+
+    The catalog is preprocessed when the matcher is created: each value is
+    casefolded and its words are marked, and bitsets (ints, with a bit per
+    candidate) are built of the candidates with a word that starts with each
+    character, of those with each character after the first word that starts
+    with another (e.g., `r` after `o`), of those with a character more than
+    once, of those with each pair of characters at the start of a word, and
+    of those with each character at each of the first PREFIX_DEPTH positions
+    of their value (as it is, and casefolded) or of their words' first
+    letters. A lookup intersects the bitsets of the prefix's characters, so
+    each of the first four tiers is found among a few candidates, without
+    looking at the rest. The last two tiers are found by searching strings of
+    their candidates' records, a chunk of candidates at a time. Every
+    tier stops as soon as the limit is filled, and the later tiers are then
+    skipped.
+
+    Args:
+        catalog (Iterable[CatalogItem]): The completions. Like a completer's
+            results, items may be (prompt, value) pairs, or ((label, type),
+            value) pairs; a string is used as both prompt and value.
+        limit (int | None): The most matches to return. Defaults to 1,000. If
+            None, every match is returned.
+    """
+
+    # the number of leading characters that are indexed by position
+    PREFIX_DEPTH = 4
+    # the results aren't all prefix matches, so the CompletionCache can't
+    # narrow a cached result to a longer prefix by the values that start
+    # with it.
+    narrowable = False
+
+    def __init__(
+        self, catalog: Iterable[CatalogItem], limit: int | None = 1_000
+    ) -> None:
+        self.limit = limit
+        self._items: list[tuple[str | tuple[str, str], str]] = [
+            (item, item) if isinstance(item, str) else item for item in catalog
+        ]
+        self._values = [value for _, value in self._items]
+        all_marked = [
+            WORD_START_PROG.sub(BOUNDARY, value).casefold() for value in self._values
+        ]
+        self._folded = [marked.replace(BOUNDARY, "") for marked in all_marked]
+        self._acronyms = ["".join(ACRONYM_PROG.findall(m)) for m in all_marked]
+        self._records = [f"{marked}{ID_MARK}{i}" for i, marked in enumerate(all_marked)]
+
+        starts_word: dict[str, list[int]] = {}
+        prefixes: list[dict[str, list[int]]] = [{} for _ in range(self.PREFIX_DEPTH)]
+        case_prefixes: list[dict[str, list[int]]] = [
+            {} for _ in range(self.PREFIX_DEPTH)
+        ]
+        acronym_prefixes: list[dict[str, list[int]]] = [
+            {} for _ in range(self.PREFIX_DEPTH)
+        ]
+        word_heads: dict[str, list[int]] = {}
+        follows: dict[str, list[int]] = {}
+        repeats: dict[str, list[int]] = {}
+        for i, (value, folded, acronym, offsets) in enumerate(
+            zip(
+                self._values,
+                self._folded,
+                self._acronyms,
+                map(_word_offsets, all_marked),
+            )
+        ):
+            for char in set(acronym):
+                starts_word.setdefault(char, []).append(i)
+            for k, char in enumerate(folded[: self.PREFIX_DEPTH]):
+                prefixes[k].setdefault(char, []).append(i)
+            for k, char in enumerate(value[: self.PREFIX_DEPTH]):
+                case_prefixes[k].setdefault(char, []).append(i)
+            for k, char in enumerate(acronym[: self.PREFIX_DEPTH]):
+                acronym_prefixes[k].setdefault(char, []).append(i)
+            for char in set(folded):
+                if folded.count(char) > 1:
+                    repeats.setdefault(char, []).append(i)
+            starts: set[str] = set()
+            for offset in offsets:
+                # the first two characters from the start of a word, even if
+                # the second starts another
+                head = folded[offset : offset + 2]
+                if len(head) == 2:
+                    word_heads.setdefault(head, []).append(i)
+                start = folded[offset]
+                if start in starts:
+                    continue
+                # the characters after the first word that starts with start
+                starts.add(start)
+                for char in set(folded[offset + 1 :]):
+                    follows.setdefault(start + char, []).append(i)
+
+        size = len(self._items)
+
+        def bitsets(ids_by_char: dict[str, list[int]]) -> dict[str, int]:
+            return {char: _bitset(ids, size) for char, ids in ids_by_char.items()}
+
+        self._starts_word = bitsets(starts_word)
+        self._prefixes = [bitsets(p) for p in prefixes]
+        self._case_prefixes = [bitsets(p) for p in case_prefixes]
+        self._acronym_prefixes = [bitsets(p) for p in acronym_prefixes]
+        self._word_heads = bitsets(word_heads)
+        self._follows = bitsets(follows)
+        self._repeats = bitsets(repeats)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __call__(self, prefix: str) -> CompletionItems:
+        """
+        Returns the candidates that match prefix, best first.
+        """
+        return cast(CompletionItems, [self._items[i] for i in self.match_ids(prefix)])
+
+    def match_ids(self, prefix: str) -> list[int]:
+        """
+        Returns the indexes (in the catalog) of the candidates that match
+        prefix, best first.
+        """
+        limit = len(self._items) if self.limit is None else self.limit
+        if not prefix:
+            return list(range(min(limit, len(self._items))))
+        query = prefix.casefold()
+        # a match has a word that starts with the query's first character,
+        # each of the other characters after the first such word, and each
+        # character that repeats in the query more than once.
+        candidates = self._starts_word.get(query[0], 0)
+        for char in set(query[1:]):
+            if not candidates:
+                return []
+            candidates &= self._follows.get(query[0] + char, 0)
+            if query.count(char) > 1:
+                candidates &= self._repeats.get(char, 0)
+        if not candidates:
+            return []
+
+        prefixed = acronymed = candidates
+        for k, char in enumerate(query[: self.PREFIX_DEPTH]):
+            prefixed &= self._prefixes[k].get(char, 0)
+            acronymed &= self._acronym_prefixes[k].get(char, 0)
+        exact = prefixed
+        for k, char in enumerate(prefix[: self.PREFIX_DEPTH]):
+            exact &= self._case_prefixes[k].get(char, 0)
+        # the bitsets index only the first PREFIX_DEPTH characters, so the
+        # candidates they find for a longer query are checked one by one, and
+        # may turn out to be in a later tier.
+        check_exact = len(prefix) > self.PREFIX_DEPTH
+        check_folded = len(query) > self.PREFIX_DEPTH
+
+        values = self._values
+        folded, acronyms = self._folded, self._acronyms
+        matches: list[int] = []
+        for i in _iter_bits(exact):
+            if check_exact and not values[i].startswith(prefix):
+                continue
+            matches.append(i)
+            if len(matches) == limit:
+                return matches
+        seen = set(matches)
+        for i in _iter_bits(prefixed if check_exact else prefixed & ~exact):
+            if i in seen or (check_folded and not folded[i].startswith(query)):
+                continue
+            matches.append(i)
+            seen.add(i)
+            if len(matches) == limit:
+                return matches
+        for i in _iter_bits(acronymed):
+            if i in seen or (check_folded and not acronyms[i].startswith(query)):
+                continue
+            matches.append(i)
+            seen.add(i)
+            if len(matches) == limit:
+                return matches
+
+        # a candidate with the query at the start of a word (which may run on
+        # into the next words, e.g. `username` in `getUserName`) has a word
+        # that starts with its first two characters. These, and the rest, are
+        # found by searching strings of the candidates' records, a chunk at a
+        # time; each match ends with the candidate's id.
+        contiguous = candidates
+        if len(query) > 1:
+            contiguous &= self._word_heads.get(query[:2], 0)
+        pattern = re.compile(
+            re.escape(BOUNDARY + query[0])
+            + "".join(f"{BOUNDARY}?{re.escape(char)}" for char in query[1:])
+            + f"[^{STOPS}]*{ID_MARK}(\\d+)"
+        )
+        for found in self._search(pattern, _iter_bits(contiguous), seen):
+            matches.extend(found)
+            if len(matches) >= limit:
+                return matches[:limit]
+            seen.update(found)
+
+        # in the rest, each character is matched at its first occurrence after
+        # the last, without crossing into the candidate's id or the next
+        # candidate.
+        pattern = re.compile(
+            re.escape(BOUNDARY + query[0])
+            + "".join(
+                f"[^{STOPS}{re.escape(char)}]*{re.escape(char)}" for char in query[1:]
+            )
+            + f"[^{STOPS}]*{ID_MARK}(\\d+)"
+        )
+        for found in self._search(pattern, _iter_bits(candidates), seen):
+            matches.extend(found)
+            if len(matches) >= limit:
+                return matches[:limit]
+        return matches
+
+    def _search(
+        self, pattern: re.Pattern[str], ids: Iterator[int], skip: set[int]
+    ) -> Iterator[list[int]]:
+        """
+        Yields the ids (in order) of the candidates whose records match
+        pattern, except those in skip, by searching SEARCH_CHUNK_SIZE records
+        at a time; the ids found in each chunk are yielded together.
+        """
+        records = self._records
+        rest = filterfalse(skip.__contains__, ids)
+        while chunk := list(islice(rest, SEARCH_CHUNK_SIZE)):
+            found = pattern.findall(SEPARATOR.join([records[i] for i in chunk]))
+            if found:
+                yield list(map(int, found))
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from typing import Iterable, NamedTuple, Sequence
+
+from textual.widgets.text_area import Location
+
+from textual_textarea.line_edit import LineEdit, coalesce_line_edits
+
+
+class BufferChange(NamedTuple):
+    """
+    Records that the text of a buffer between start and old_end was replaced
+    by the text between start and new_end; the text before start and after
+    the end is unchanged (but the text after it has moved).
+    """
+
+    start: int
+    old_end: int
+    new_end: int
+
+
+class JoinedBuffer:
+    """
+    The lines of a document, joined by newlines into a single string, with a
+    table of the offset of the start of each line, so that queries that span
+    lines can be searched with a single pass over the buffer.
+
+    Edits are recorded with patch and applied lazily, the next time the buffer
+    is synced, by splicing only the edited lines into the buffer. The offsets
+    of the lines below an edit are shifted lazily, too: a single pending shift
+    applies to every line from a row on, and the next edit moves it (only
+    updating the lines between the two edits), so typing in one place doesn't
+    update the offset of every line. The buffer's text is replaced (not
+    mutated) by a sync, and a copy has its own offsets, so a copy can be used
+    by another thread.
+    """
+
+    def __init__(self, lines: Sequence[str]) -> None:
+        self.text = "\n".join(lines)
+        self._starts = self._get_line_starts(lines, start=0)
+        # the offset of each row from _shift_row on is _shift more than the
+        # one stored in _starts.
+        self._shift_row = len(self._starts)
+        self._shift = 0
+        self._pending_edits: list[LineEdit] = []
+
+    @property
+    def line_starts(self) -> list[int]:
+        """
+        The offset of the start of each line.
+        """
+        self._apply_shift(self._shift_row, len(self._starts), self._shift)
+        self._shift_row, self._shift = len(self._starts), 0
+        return self._starts
+
+    def patch(self, edits: Iterable[LineEdit]) -> None:
+        """
+        Record edits to the document; they will be applied by the next sync.
+        """
+        self._pending_edits.extend(edits)
+
+    def sync(self, lines: Sequence[str]) -> BufferChange | None:
+        """
+        Apply the edits recorded since the last sync.
+
+        Args:
+            lines (Sequence[str]): The lines of the document, after the edits.
+
+        Returns:
+            BufferChange | None: The part of the buffer that was replaced, or
+                None if no edits were recorded.
+        """
+        if not self._pending_edits:
+            return None
+        edits = coalesce_line_edits(self._pending_edits)
+        self._pending_edits = []
+        old_text = self.text
+        if not self._describe(edits, len(lines)):
+            # the edits don't describe this document; start over.
+            self.text = "\n".join(lines)
+            self._starts = self._get_line_starts(lines, start=0)
+            self._shift_row, self._shift = len(self._starts), 0
+            return BufferChange(0, len(old_text), len(self.text))
+
+        pieces: list[str] = []
+        # the end of the old text that has been copied to pieces, and the
+        # difference between the new and old offsets of the text after it
+        copied_to = 0
+        text_shift = 0
+        end = 0
+        for edit in edits:
+            # each edit is applied to the offsets left by the previous edits
+            start = self._offset_of_row(edit.first)
+            old_end = (
+                self._offset_of_row(edit.old_last + 1) - 1
+                if edit.old_last + 1 < len(self._starts)
+                else len(old_text) + text_shift
+            )
+            new_lines = lines[edit.first : edit.new_last + 1]
+            pieces.append(old_text[copied_to : start - text_shift])
+            pieces.append("\n".join(new_lines))
+            copied_to = old_end - text_shift
+            end = start + len(pieces[-1])
+            self._replace_rows(
+                edit, self._get_line_starts(new_lines, start), end - old_end
+            )
+            text_shift += end - old_end
+        pieces.append(old_text[copied_to:])
+        self.text = "".join(pieces)
+        # the text above the first edit is unchanged, and the last edit ends
+        # where the unchanged text below it starts.
+        return BufferChange(
+            start=self._offset_of_row(edits[0].first),
+            old_end=end - text_shift,
+            new_end=end,
+        )
+
+    def copy(self) -> JoinedBuffer:
+        buffer = JoinedBuffer(())
+        buffer.text = self.text
+        buffer._starts = self._starts.copy()
+        buffer._shift_row, buffer._shift = self._shift_row, self._shift
+        buffer._pending_edits = self._pending_edits.copy()
+        return buffer
+
+    def location(self, offset: int) -> Location:
+        """
+        Returns the (row, column) of the character at offset in the buffer.
+        """
+        starts, shift_row, shift = self._starts, self._shift_row, self._shift
+        if shift_row < len(starts) and offset >= starts[shift_row] + shift:
+            row = bisect_right(starts, offset - shift, lo=shift_row) - 1
+        else:
+            row = bisect_right(starts, offset, hi=shift_row) - 1
+        return (row, offset - self._offset_of_row(row))
+
+    def offset(self, location: Location) -> int:
+        """
+        Returns the offset in the buffer of the character at location.
+        """
+        row, col = location
+        if row >= len(self._starts):
+            return len(self.text)
+        row = max(row, 0)
+        line_end = (
+            self._offset_of_row(row + 1) - 1
+            if row + 1 < len(self._starts)
+            else len(self.text)
+        )
+        return min(self._offset_of_row(row) + max(col, 0), line_end)
+
+    def _describe(self, edits: Iterable[LineEdit], line_count: int) -> bool:
+        """
+        Returns True if edits (applied in order) only touch rows of the buffer,
+        and leave it with line_count lines.
+        """
+        rows = len(self._starts)
+        for edit in edits:
+            if edit.old_last >= rows:
+                return False
+            rows += edit.delta
+        return rows == line_count
+
+    def _offset_of_row(self, row: int) -> int:
+        return self._starts[row] + (self._shift if row >= self._shift_row else 0)
+
+    def _replace_rows(self, edit: LineEdit, starts: list[int], text_shift: int) -> None:
+        """
+        Replace the offsets of the rows touched by edit with starts, and shift
+        the rows below them by text_shift, by moving the pending shift to the
+        row after the edit.
+        """
+        shift_row, shift = self._shift_row, self._shift
+        below = edit.old_last + 1
+        if shift and shift_row < edit.first:
+            # the rows above the edit no longer have a pending shift
+            self._apply_shift(shift_row, edit.first, shift)
+        elif shift and shift_row > below:
+            # the rows between the edit and the pending shift now have one
+            self._apply_shift(below, shift_row, -shift)
+        self._starts[edit.first : below] = starts
+        self._shift_row = edit.new_last + 1
+        self._shift = shift + text_shift
+
+    def _apply_shift(self, first: int, stop: int, shift: int) -> None:
+        if shift and first < stop:
+            starts = self._starts
+            starts[first:stop] = [start + shift for start in starts[first:stop]]
+
+    @staticmethod
+    def _get_line_starts(lines: Iterable[str], start: int) -> list[int]:
+        starts = []
+        offset = start
+        for line in lines:
+            starts.append(offset)
+            offset += len(line) + 1
+        return starts
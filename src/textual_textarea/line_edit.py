@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from typing import NamedTuple
+
+
+class LineEdit(NamedTuple):
+    """
+    Records that lines first through old_last (inclusive) of a document were
+    replaced by lines first through new_last (inclusive).
+    """
+
+    first: int
+    old_last: int
+    new_last: int
+
+    @property
+    def delta(self) -> int:
+        """The change in the document's line count caused by this edit."""
+        return self.new_last - self.old_last
+
+
+def merge_line_edits(edits: list[LineEdit]) -> list[tuple[int, int]]:
+    """
+    Collapse a chronological sequence of LineEdits into the ranges of rows
+    (inclusive, in the coordinates of the final document) that were touched by
+    any of the edits.
+    """
+    return [(edit.first, edit.new_last) for edit in coalesce_line_edits(edits)]
+
+
+def coalesce_line_edits(edits: list[LineEdit]) -> list[LineEdit]:
+    """
+    Collapse a chronological sequence of LineEdits into an equivalent sequence
+    of disjoint LineEdits, sorted by first. Applying the result in order (each
+    in the coordinates of the document left by the previous edit) touches the
+    same rows as applying the original edits; since earlier edits are above
+    later ones, each edit's first and new_last are also rows of the final
+    document.
+    """
+    # each dirty range is (first, last, delta), where first and last are rows
+    # of the current document, and delta is the change in line count caused by
+    # the edits merged into the range.
+    dirty: list[tuple[int, int, int]] = []
+    for edit in edits:
+        merged_first, merged_last, merged_delta = edit.first, edit.new_last, edit.delta
+        shifted: list[tuple[int, int, int]] = []
+        for first, last, delta in dirty:
+            if last < edit.first:
+                shifted.append((first, last, delta))
+            elif first > edit.old_last:
+                shifted.append((first + edit.delta, last + edit.delta, delta))
+            else:
+                merged_first = min(merged_first, first)
+                if last > edit.old_last:
+                    merged_last = max(merged_last, last + edit.delta)
+                merged_delta += delta
+        shifted.append((merged_first, merged_last, merged_delta))
+        dirty = shifted
+    return [LineEdit(first, last - delta, last) for first, last, delta in sorted(dirty)]
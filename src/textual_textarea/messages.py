@@ -1,8 +1,12 @@
 from pathlib import Path
-from typing import Union
+from typing import TYPE_CHECKING, Union
 
 from textual.message import Message
 
+if TYPE_CHECKING:
+    from textual_textarea.find_index import FindIndex, FindQuery, MultilineFindIndex
+    from textual_textarea.text_editor import TextEditor
+
 
 class TextAreaClipboardError(Message, bubble=True):
     """
@@ -34,5 +38,32 @@ class TextAreaSaved(Message, bubble=True):
         super().__init__()
 
 
+class TextAreaFindAllResult(Message, bubble=True):
+    """
+    Posted by the editor that started a search of every editor (with
+    TextEditor.find_in_all_editors) as the search of each editor's document
+    completes. index holds the matches in a snapshot of editor's document,
+    taken when the search started.
+    """
+
+    def __init__(
+        self, editor: "TextEditor", index: "Union[FindIndex, MultilineFindIndex]"
+    ) -> None:
+        super().__init__()
+        self.editor = editor
+        self.index = index
+
+
+class TextAreaFindAllComplete(Message, bubble=True):
+    """
+    Posted after the last TextAreaFindAllResult of a search of every editor.
+    """
+
+    def __init__(self, query: "FindQuery", editor_count: int) -> None:
+        super().__init__()
+        self.query = query
+        self.editor_count = editor_count
+
+
 class TextAreaHideCompletionList(Message):
     pass
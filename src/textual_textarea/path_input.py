@@ -1,42 +1,155 @@
 from __future__ import annotations
 
+import asyncio
+import os
 import stat
+from collections import OrderedDict
 from pathlib import Path
+from threading import Lock
+from time import monotonic
 
 from rich.highlighter import Highlighter
+from textual import on, work
 from textual.binding import Binding
+from textual.message import Message
 from textual.suggester import Suggester
 from textual.validation import ValidationResult, Validator
+from textual.worker import get_current_worker
 
 from textual_textarea.cancellable_input import CancellableInput
+from textual_textarea.completion_cache import PartialCompletions
+from textual_textarea.directory_cache import DirectoryCache
+
+# the directory listings used by path_completer
+DIRECTORY_CACHE = DirectoryCache()
+# the number of seconds that a path's stat result is reused, so validating
+# each keystroke doesn't stat the same path (on a slow drive) again.
+STAT_CACHE_TTL = 1.0
+
+
+class StatCache:
+    """
+    The resolved paths and stat results of recently validated values, keyed
+    by value. Each is reused for ttl seconds, since (unlike a directory's
+    listing) a path's stat result can't be checked for changes without
+    another stat.
+
+    Args:
+        ttl (float): The number of seconds to reuse a result.
+        maxsize (int): The number of results to cache.
+    """
+
+    def __init__(self, ttl: float = STAT_CACHE_TTL, maxsize: int = 256) -> None:
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._results: OrderedDict[str, tuple[float, Path, os.stat_result | None]] = (
+            OrderedDict()
+        )
+        # paths are validated in thread workers, which may overlap.
+        self._lock = Lock()
+
+    def stat(self, value: str) -> tuple[Path, os.stat_result | None]:
+        """
+        Returns the path that value resolves to, and its stat result, or None
+        if it doesn't exist.
+
+        Raises:
+            Exception: If value can't be resolved, or its path can't be
+                stat'ed (other than for not existing).
+        """
+        now = monotonic()
+        with self._lock:
+            cached = self._results.get(value)
+            if cached is not None and now - cached[0] < self.ttl:
+                return cached[1], cached[2]
+
+        p = Path(value).expanduser().resolve()
+        st: os.stat_result | None
+        try:
+            st = p.stat()
+        except FileNotFoundError:
+            st = None
+
+        with self._lock:
+            self._results[value] = (now, p, st)
+            self._results.move_to_end(value)
+            while len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+        return p, st
+
+    def resolve(self, value: str) -> Path | None:
+        """
+        Returns the path that value resolves to, or None if it can't be
+        resolved.
+        """
+        try:
+            return self.stat(value)[0]
+        except Exception:
+            return None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+
+
+# the stat results used by PathValidator and PathInput
+STAT_CACHE = StatCache()
 
 
 def path_completer(prefix: str) -> list[tuple[str, str]]:
     try:
         original = Path(prefix)
         p = original.expanduser()
-        if p.is_dir():
-            matches = list(p.iterdir())
+        if prefix.endswith(("/", os.sep)) or DIRECTORY_CACHE.is_dir(str(p)):
+            directory, start, shown = p, "", original
         else:
-            matches = list(p.parent.glob(f"{p.name}*"))
+            directory, start, shown = p.parent, p.name, original.parent
+        listing = DIRECTORY_CACHE.listing(str(directory))
+        names = listing.startswith(start)
         if original != p and original.parts and original.parts[0] == "~":
-            prompts = [str(Path("~") / m.relative_to(Path.home())) for m in matches]
+            # e.g., ~/foo, not /home/user/foo
+            prompts = _join(shown, names)
         elif not original.is_absolute() and prefix.startswith("./"):
-            prompts = [f"./{m}" for m in matches]
+            prompts = [f"./{prompt}" for prompt in _join(directory, names)]
         else:
-            prompts = [str(m) for m in matches]
-        return [(p, p) for p in prompts]
+            prompts = _join(directory, names)
+        completions = [(p, p) for p in prompts]
+        if not listing.complete:
+            # the directory is still being listed, in the background.
+            return PartialCompletions(completions)
+        return completions
     except Exception:
         return []
 
 
+# once the prefix names a directory, path_completer lists its children, which
+# don't start with the prefix's siblings, so a cached result can't be narrowed
+# to a longer prefix.
+path_completer.narrowable = False  # type: ignore[attr-defined]
+
+
+def _join(directory: Path, names: list[str]) -> list[str]:
+    """
+    Returns str(directory / name) for each name, without creating a Path for
+    each (there may be thousands).
+    """
+    base = str(directory)
+    if base == ".":
+        return names
+    return [os.path.join(base, name) for name in names]
+
+
 class PathSuggester(Suggester):
     def __init__(self) -> None:
-        super().__init__(use_cache=True, case_sensitive=True)
+        # directory listings are cached (and invalidated when a directory
+        # changes) by path_completer, so suggestions aren't cached here.
+        super().__init__(use_cache=False, case_sensitive=True)
 
     async def get_suggestion(self, value: str) -> str | None:
-        matches = path_completer(value)
-        if len(matches) == 1:
+        # listing a directory may be slow (e.g., on a network drive), so it
+        # isn't done on the event loop.
+        matches = await asyncio.to_thread(path_completer, value)
+        if len(matches) == 1 and not isinstance(matches, PartialCompletions):
             return str(matches[0][0])
         else:
             return None
@@ -59,13 +172,11 @@ class PathValidator(Validator):
         if self.dir_okay and self.file_okay and not self.must_exist:
             return self.success()
         try:
-            p = Path(value).expanduser().resolve()
+            _, st = STAT_CACHE.stat(value)
         except Exception:
             return self.failure("Not a valid path.")
 
-        try:
-            st = p.stat()
-        except FileNotFoundError:
+        if st is None:
             if self.must_exist:
                 return self.failure("File or directory does not exist.")
             return self.success()
@@ -79,10 +190,44 @@ class PathValidator(Validator):
 
 
 class PathInput(CancellableInput):
+    """
+    An Input for a path, with completions and validation.
+
+    Validating a path resolves and stats it, which may block (e.g., on a
+    network drive), so the value isn't validated on the event loop as it
+    changes: the Changed message has no validation_result, and the value is
+    validated in a thread worker, which posts a Validated message. (The value
+    is still validated synchronously on blur and submit; by then, its stat
+    result is usually cached.)
+    """
+
     BINDINGS = [
         Binding("tab", "complete", "Accept Completion", show=False),
     ]
 
+    class Validated(Message):
+        """
+        Posted when the value has been validated, after it changes.
+        """
+
+        def __init__(
+            self,
+            input: PathInput,  # noqa: A002
+            value: str,
+            validation_result: ValidationResult | None,
+            path: Path | None,
+        ) -> None:
+            super().__init__()
+            self.input = input
+            self.value = value
+            self.validation_result = validation_result
+            # the path that value resolves to, or None if it can't be resolved
+            self.path = path
+
+        @property
+        def control(self) -> PathInput:
+            return self.input
+
     def __init__(
         self,
         value: str | None = None,
@@ -107,12 +252,44 @@ class PathInput(CancellableInput):
             password,
             suggester=PathSuggester(),
             validators=PathValidator(dir_okay, file_okay, must_exist),
+            validate_on=["blur", "submitted"],
             name=name,
             id=id,
             classes=classes,
             disabled=disabled,
         )
 
+    @on(CancellableInput.Changed)
+    def _validate_changed_value(self, message: CancellableInput.Changed) -> None:
+        if message.input is self:
+            self._validate_in_thread(message.value)
+
+    @work(thread=True, exclusive=True, group="validation")
+    def _validate_in_thread(self, value: str) -> None:
+        worker = get_current_worker()
+        if not self.validators or (self.valid_empty and not value):
+            validation_result = None
+        else:
+            validation_result = ValidationResult.merge(
+                [validator.validate(value) for validator in self.validators]
+            )
+        path = STAT_CACHE.resolve(value)
+        if not worker.is_cancelled:
+            self.post_message(self.Validated(self, value, validation_result, path))
+
+    @on(Validated)
+    def _apply_validation(self, message: Validated) -> None:
+        if message.value != self.value:
+            # the value changed while it was validated; the newer value's
+            # result is on its way.
+            message.stop()
+            return
+        self._valid = (
+            message.validation_result is None or message.validation_result.is_valid
+        )
+        self.set_class(not self._valid, "-invalid")
+        self.set_class(self._valid, "-valid")
+
     def action_complete(self) -> None:
         if self._suggestion and self._suggestion != self.value:
             self.action_cursor_right()
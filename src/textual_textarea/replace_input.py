@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from contextlib import suppress
+
+from textual.binding import Binding
+from textual.css.query import NoMatches
+from textual.message import Message
+
+from textual_textarea.cancellable_input import CancellableInput
+from textual_textarea.find_input import FindInput
+
+
+class ReplaceInput(CancellableInput):
+    BINDINGS = [
+        Binding("alt+a", "replace_all", "Replace All", show=False),
+        Binding("ctrl+f", "focus_find", "Focus Find", show=False),
+    ]
+
+    class ReplaceAllRequested(Message):
+        """
+        Posted when the user presses alt+a to replace every match.
+        """
+
+        def __init__(self, replacement: str) -> None:
+            super().__init__()
+            self.replacement = replacement
+
+    def __init__(
+        self,
+        value: str = "",
+        classes: str | None = None,
+    ) -> None:
+        super().__init__(
+            value=value,
+            placeholder="Replace; enter to replace and find next; alt+a for all",
+            password=False,
+            type="text",
+            id="textarea__replace_input",
+            classes=classes,
+        )
+
+    def action_replace_all(self) -> None:
+        self.post_message(self.ReplaceAllRequested(self.value))
+
+    def action_focus_find(self) -> None:
+        if self.parent is not None:
+            with suppress(NoMatches):
+                self.parent.query_one(FindInput).focus()
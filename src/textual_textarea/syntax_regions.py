@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from typing import TYPE_CHECKING, Iterable, Mapping, Sequence
+
+from textual_textarea.find_index import (
+    LINE_END,
+    NO_MATCHES,
+    Span,
+    SpanFilter,
+    SyntaxKind,
+)
+from textual_textarea.line_edit import LineEdit
+
+if TYPE_CHECKING:
+    from tree_sitter import Node
+
+
+class SyntaxRegions:
+    """
+    The comments and strings of a document, stored per line as sorted,
+    disjoint (start, end) columns.
+
+    Regions are computed once per parse of the document, from the nodes
+    captured by its language's highlight query (captures named comment* or
+    string*), so that find can keep only the matches in (or outside of) them
+    without querying the syntax tree for each match. After an edit, the
+    regions are patched, and only the rows whose regions may have changed
+    are queried again (see update).
+    """
+
+    def __init__(
+        self,
+        comments: Mapping[int, Sequence[Span]] | None = None,
+        strings: Mapping[int, Sequence[Span]] | None = None,
+    ) -> None:
+        self.comments = _merge_regions(comments or {})
+        self.strings = _merge_regions(strings or {})
+        self._any = _merge_regions(
+            {
+                row: [*self.comments.get(row, ()), *self.strings.get(row, ())]
+                for row in {*self.comments, *self.strings}
+            }
+        )
+
+    @classmethod
+    def from_captures(
+        cls, captures: Mapping[str, Iterable[Node]], lines: Sequence[str]
+    ) -> SyntaxRegions:
+        """
+        Build the regions from the result of querying the syntax tree with a
+        highlight query; the nodes' (byte) columns are converted to character
+        columns in lines.
+        """
+        return cls(*_regions_from_captures(captures, lines, range(len(lines))))
+
+    def patch(self, edits: Iterable[LineEdit]) -> None:
+        """
+        Drop the regions on the lines touched by edits, and shift the regions
+        below them. The dropped lines must be updated from the new parse.
+        """
+        for edit in edits:
+            for regions in (self.comments, self.strings, self._any):
+                if edit.delta:
+                    shifted = {
+                        row + edit.delta if row > edit.old_last else row: spans
+                        for row, spans in regions.items()
+                        if not edit.first <= row <= edit.old_last
+                    }
+                    regions.clear()
+                    regions.update(shifted)
+                else:
+                    for row in range(edit.first, edit.old_last + 1):
+                        regions.pop(row, None)
+
+    def update(
+        self,
+        captures: Mapping[str, Iterable[Node]],
+        lines: Sequence[str],
+        rows: range,
+    ) -> None:
+        """
+        Replace the regions on rows with those captured by a query of (at
+        least) those rows; nodes that extend beyond rows are clipped to them.
+        """
+        updated = SyntaxRegions(*_regions_from_captures(captures, lines, rows))
+        for regions, new_regions in (
+            (self.comments, updated.comments),
+            (self.strings, updated.strings),
+            (self._any, updated._any),
+        ):
+            for row in rows:
+                spans = new_regions.get(row)
+                if spans:
+                    regions[row] = spans
+                else:
+                    regions.pop(row, None)
+
+    def span_filter(self, syntax: SyntaxKind) -> SpanFilter | None:
+        """
+        Returns a function that keeps only the spans on a row that are
+        entirely within a comment (or string), or, for "code", that don't
+        overlap any comment or string. Returns None for "any".
+        """
+        if syntax == "comments":
+            return lambda row, spans: _contained(self.comments.get(row), spans)
+        elif syntax == "strings":
+            return lambda row, spans: _contained(self.strings.get(row), spans)
+        elif syntax == "code":
+            return lambda row, spans: _not_overlapping(self._any.get(row), spans)
+        return None
+
+
+def _regions_from_captures(
+    captures: Mapping[str, Iterable[Node]], lines: Sequence[str], rows: range
+) -> tuple[dict[int, list[Span]], dict[int, list[Span]]]:
+    """
+    Returns the (unmerged) comments and strings on rows, from the nodes
+    captured by a highlight query.
+    """
+    comments: dict[int, list[Span]] = {}
+    strings: dict[int, list[Span]] = {}
+    for name, nodes in captures.items():
+        if name.startswith("comment"):
+            regions = comments
+        elif name.startswith("string"):
+            regions = strings
+        else:
+            continue
+        for node in nodes:
+            (start_row, start_byte), (end_row, end_byte) = (
+                node.start_point,
+                node.end_point,
+            )
+            first = max(start_row, rows.start)
+            last = min(end_row + 1, rows.stop, len(lines))
+            for row in range(first, last):
+                start = _to_column(lines[row], start_byte) if row == start_row else 0
+                end = _to_column(lines[row], end_byte) if row == end_row else LINE_END
+                regions.setdefault(row, []).append((start, end))
+    return comments, strings
+
+
+def _merge_regions(regions: Mapping[int, Sequence[Span]]) -> dict[int, list[Span]]:
+    merged: dict[int, list[Span]] = {}
+    for row, spans in regions.items():
+        row_regions: list[Span] = []
+        for start, end in sorted(spans):
+            if row_regions and start <= row_regions[-1][1]:
+                row_regions[-1] = (row_regions[-1][0], max(row_regions[-1][1], end))
+            else:
+                row_regions.append((start, end))
+        if row_regions:
+            merged[row] = row_regions
+    return merged
+
+
+def _contained(
+    regions: Sequence[Span] | None, spans: Sequence[Span]
+) -> tuple[Span, ...]:
+    if not regions:
+        return NO_MATCHES
+    kept = []
+    for start, end in spans:
+        # the last region that starts at or before the span
+        i = bisect_right(regions, (start, LINE_END)) - 1
+        if i >= 0 and regions[i][1] >= end:
+            kept.append((start, end))
+    return tuple(kept)
+
+
+def _not_overlapping(
+    regions: Sequence[Span] | None, spans: Sequence[Span]
+) -> tuple[Span, ...]:
+    if not regions:
+        return tuple(spans)
+    kept = []
+    for start, end in spans:
+        i = bisect_right(regions, (start, LINE_END)) - 1
+        if i >= 0 and regions[i][1] > start:
+            continue
+        elif i + 1 < len(regions) and regions[i + 1][0] < end:
+            continue
+        kept.append((start, end))
+    return tuple(kept)
+
+
+def _to_column(line: str, byte_column: int) -> int:
+    """
+    Converts a tree-sitter (utf-8 byte) column in line to a character column.
+    """
+    if line.isascii():
+        return byte_column
+    return len(line.encode("utf-8")[:byte_column].decode("utf-8", errors="ignore"))
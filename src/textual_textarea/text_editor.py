@@ -4,37 +4,79 @@ import re
 from contextlib import suppress
 from math import ceil, floor
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Callable, Literal, Sequence
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterable,
+    Awaitable,
+    Callable,
+    Iterable,
+    Literal,
+    Sequence,
+)
 
 import pyperclip
 from rich.console import RenderableType
+from rich.text import Text
 from textual import events, on, work
-from textual._cells import cell_len
 from textual.app import ComposeResult
 from textual.binding import Binding
 from textual.events import Paste
 from textual.message import Message
 from textual.reactive import reactive
 from textual.timer import Timer
+from textual.validation import ValidationResult
 from textual.widget import Widget
 from textual.widgets import Input, Label, OptionList, TextArea
-from textual.widgets.text_area import Location, Selection, SyntaxAwareDocument
+from textual.widgets.text_area import (
+    DocumentBase,
+    Edit,
+    EditResult,
+    Location,
+    Selection,
+    SyntaxAwareDocument,
+)
+from textual.worker import get_current_worker
 
 from textual_textarea.autocomplete import CompletionList
 from textual_textarea.cancellable_input import CancellableInput
 from textual_textarea.colors import text_area_theme_from_app_theme
 from textual_textarea.comments import INLINE_MARKERS
 from textual_textarea.containers import FooterContainer, TextContainer
+from textual_textarea.document_words import DocumentWords
 from textual_textarea.error_modal import ErrorModal
+from textual_textarea.find_all import FindJob, build_concurrently
+from textual_textarea.find_in_files import FileResult, find_in_files
+from textual_textarea.find_index import (
+    FindIndex,
+    FindQuery,
+    FoldedLines,
+    LineMatcher,
+    MultilineFindIndex,
+    Scope,
+    Span,
+    SpanFilter,
+    SyntaxKind,
+    compile_pattern,
+)
 from textual_textarea.find_input import FindInput
+from textual_textarea.find_results import FileFindResults, FindResults
 from textual_textarea.goto_input import GotoLineInput
+from textual_textarea.joined_buffer import JoinedBuffer
+from textual_textarea.line_edit import LineEdit, merge_line_edits
 from textual_textarea.messages import (
     TextAreaClipboardError,
+    TextAreaFindAllComplete,
+    TextAreaFindAllResult,
     TextAreaHideCompletionList,
     TextAreaSaved,
     TextAreaThemeError,
 )
 from textual_textarea.path_input import PathInput, path_completer
+from textual_textarea.replace_input import ReplaceInput
+from textual_textarea.syntax_regions import SyntaxRegions
+from textual_textarea.trigram_index import TrigramIndex
+from textual_textarea.words import NON_WORD_CHAR_PROG, WORD_PROG
 
 if TYPE_CHECKING:
     from tree_sitter import Node, Parser, Query, Tree
@@ -55,11 +97,10 @@ MEMBER_PROG = re.compile(
     rf"\w*(`|'|\")?(\.|::?)(\w+|{SINGLE_QUOTED_EXPR}|{DOUBLE_QUOTED_EXPR}|{BACKTICK_EXPR})",
     flags=re.IGNORECASE,
 )
-WORD_PROG = re.compile(r"\w+")
-NON_WORD_CHAR_PROG = re.compile(r"\W")
 
 
 class TextAreaPlus(TextArea, inherit_bindings=False):
+    COMPONENT_CLASSES = TextArea.COMPONENT_CLASSES | {"text-area--find-match"}
     DEFAULT_CSS = """
     TextAreaPlus {
         width: 1fr;
@@ -70,8 +111,14 @@ class TextAreaPlus(TextArea, inherit_bindings=False):
         &:focus {
             border: none;
         }
+        & .text-area--find-match {
+            background: $warning 30%;
+        }
     }
     """
+    # find matches are highlighted for this many lines above and below the
+    # viewport, so that scrolling a few lines doesn't require a new search.
+    FIND_HIGHLIGHT_MARGIN = 20
     BINDINGS = [
         # Cursor movement
         Binding("up", "cursor_up", "cursor up", show=False),
@@ -213,6 +260,10 @@ class TextAreaPlus(TextArea, inherit_bindings=False):
         self.consecutive_clicks: int = 0
         self.system_copy: Callable[[Any], None] | None = None
         self.system_paste: Callable[[], str] | None = None
+        self._line_edits: list[LineEdit] = []
+        self._find_matcher: Callable[[int, str], Sequence[Span]] | None = None
+        self._find_highlights: dict[int, Sequence[Span]] = {}
+        self._find_highlight_rows = range(0)
 
     def on_mount(self) -> None:
         self._determine_clipboard()
@@ -327,6 +378,49 @@ class TextAreaPlus(TextArea, inherit_bindings=False):
             maintain_selection_offset=False,
         )
 
+    def edit(self, edit: Edit) -> EditResult:
+        first, old_last = edit.top[0], edit.bottom[0]
+        result = super().edit(edit)
+        self._record_line_edits([LineEdit(first, old_last, result.end_location[0])])
+        return result
+
+    def load_text(self, text: str) -> None:
+        old_last = self.document.line_count - 1
+        super().load_text(text)
+        self._record_line_edits([LineEdit(0, old_last, self.document.line_count - 1)])
+
+    def pop_line_edits(self) -> list[LineEdit]:
+        """
+        Returns the lines touched by each edit since the last call, in the
+        order the edits were made.
+        """
+        edits, self._line_edits = self._line_edits, []
+        return edits
+
+    def get_line(self, line_index: int) -> Text:
+        line = super().get_line(line_index)
+        spans = self._find_highlights.get(line_index)
+        if spans:
+            style = self.get_component_rich_style("text-area--find-match")
+            for start, end in spans:
+                line.stylize(style, start, end)
+        return line
+
+    def highlight_find_matches(
+        self, matcher: Callable[[int, str], Sequence[Span]] | None
+    ) -> None:
+        """
+        Highlight the matches found by matcher (which is called with the row
+        and text of each line) in the lines in (and near) the viewport, or
+        clear the highlights if matcher is None.
+        """
+        self._find_matcher = matcher
+        self._update_find_highlights()
+
+    def on_resize(self, event: events.Resize) -> None:
+        if self._find_matcher is not None:
+            self._update_find_highlights()
+
     @work(thread=True)
     def _determine_clipboard(self) -> None:
         if self.use_system_clipboard:
@@ -479,6 +573,68 @@ class TextAreaPlus(TextArea, inherit_bindings=False):
         self.double_click_location = None
         self.double_click_timer = None
 
+    def _undo_batch(self, edits: Sequence[Edit]) -> None:
+        line_edits = [
+            LineEdit(
+                edit.top[0],
+                edit._edit_result.end_location[0] if edit._edit_result else 0,
+                edit.bottom[0],
+            )
+            for edit in reversed(edits)
+        ]
+        super()._undo_batch(edits)
+        self._record_line_edits(line_edits)
+
+    def _redo_batch(self, edits: Sequence[Edit]) -> None:
+        super()._redo_batch(edits)
+        self._record_line_edits(
+            LineEdit(
+                edit.top[0],
+                edit.bottom[0],
+                edit._edit_result.end_location[0] if edit._edit_result else 0,
+            )
+            for edit in edits
+        )
+
+    def _watch_scroll_y(self) -> None:
+        super()._watch_scroll_y()
+        if self._find_matcher is None:
+            return
+        first, last = self._get_visible_rows()
+        rows = self._find_highlight_rows
+        if first < rows.start or min(last, self.document.line_count) > rows.stop:
+            self._update_find_highlights()
+
+    def _get_visible_rows(self) -> tuple[int, int]:
+        scroll_y = self.scroll_offset.y
+        return scroll_y, scroll_y + self.size.height
+
+    def _record_line_edits(self, line_edits: Iterable[LineEdit]) -> None:
+        self._line_edits.extend(line_edits)
+        if self._find_matcher is not None:
+            self._update_find_highlights()
+
+    def _update_find_highlights(self) -> None:
+        matcher = self._find_matcher
+        highlights: dict[int, Sequence[Span]] = {}
+        rows = range(0)
+        if matcher is not None:
+            first, last = self._get_visible_rows()
+            rows = range(
+                max(0, first - self.FIND_HIGHLIGHT_MARGIN),
+                min(self.document.line_count, last + self.FIND_HIGHLIGHT_MARGIN),
+            )
+            get_line = self.document.get_line
+            for row in rows:
+                spans = matcher(row, get_line(row))
+                if spans:
+                    highlights[row] = spans
+        if highlights or self._find_highlights:
+            self._line_cache.clear()
+            self.refresh()
+        self._find_highlights = highlights
+        self._find_highlight_rows = rows
+
     def _copy_selection(self) -> None:
         if self.selected_text:
             self.clipboard = self.selected_text
@@ -829,12 +985,45 @@ class TextEditor(Widget, can_focus=True, can_focus_children=False):
         Binding("ctrl+o", "load", "Open Query"),
         Binding("ctrl+f", "find", "Find"),
         Binding("f3", "find(True)", "Find Next"),
+        Binding("shift+f3", "find_previous", "Find Previous"),
+        Binding("ctrl+r", "replace", "Replace"),
         Binding("ctrl+g", "goto_line", "Go To Line"),
+        Binding("alt+e", "find_in_all_editors", "Find in All Editors", show=False),
+        Binding("alt+f", "find_in_files", "Find in Files", show=False),
         Binding("ctrl+q", "quit", "Quit"),
     ]
 
+    # documents with fewer lines are searched on the event loop, since
+    # starting a worker would cost more than the scan.
+    FIND_WORKER_MIN_LINES = 5_000
+    # in those larger documents, typing in the find input is debounced, so a
+    # burst of typing starts one search, not one per key.
+    FIND_DEBOUNCE_DELAY = 0.15
+    # the most threads used to search the documents of every editor at once.
+    FIND_ALL_MAX_WORKERS = 4
+    # find in files searches (at most) this many files at once, each in its
+    # own process, and skips files that are too large or too deep.
+    FIND_IN_FILES_MAX_WORKERS = 4
+    FIND_IN_FILES_MAX_FILE_SIZE = 2_000_000
+    FIND_IN_FILES_MAX_DEPTH = 10
+    FIND_IN_FILES_MAX_MATCHES_PER_FILE = 1_000
+
     theme: reactive[str] = reactive("monokai")
 
+    class FindIndexReady(Message, bubble=False):
+        def __init__(self, index: FindIndex | MultilineFindIndex) -> None:
+            super().__init__()
+            self.index = index
+
+    class FileResultsReady(Message, bubble=False):
+        def __init__(
+            self, searched: int, results: list[FileResult], is_complete: bool
+        ) -> None:
+            super().__init__()
+            self.searched = searched
+            self.results = results
+            self.is_complete = is_complete
+
     def __init__(
         self,
         *children: Widget,
@@ -850,27 +1039,67 @@ class TextEditor(Widget, can_focus=True, can_focus_children=False):
         path_completer: (
             Callable[
                 [str],
-                Sequence[tuple[RenderableType, str]]
-                | Sequence[tuple[tuple[str, str], str]],
+                Iterable[tuple[RenderableType, str]]
+                | Iterable[tuple[tuple[str, str], str]],
+            ]
+            | Callable[
+                [str],
+                Awaitable[
+                    Sequence[tuple[RenderableType, str]]
+                    | Sequence[tuple[tuple[str, str], str]]
+                ],
+            ]
+            | Callable[
+                [str],
+                AsyncIterable[tuple[RenderableType, str]]
+                | AsyncIterable[tuple[tuple[str, str], str]],
             ]
             | None
         ) = path_completer,
         member_completer: (
             Callable[
                 [str],
-                Sequence[tuple[RenderableType, str]]
-                | Sequence[tuple[tuple[str, str], str]],
+                Iterable[tuple[RenderableType, str]]
+                | Iterable[tuple[tuple[str, str], str]],
+            ]
+            | Callable[
+                [str],
+                Awaitable[
+                    Sequence[tuple[RenderableType, str]]
+                    | Sequence[tuple[tuple[str, str], str]]
+                ],
+            ]
+            | Callable[
+                [str],
+                AsyncIterable[tuple[RenderableType, str]]
+                | AsyncIterable[tuple[tuple[str, str], str]],
             ]
             | None
         ) = None,
         word_completer: (
             Callable[
                 [str],
-                Sequence[tuple[RenderableType, str]]
-                | Sequence[tuple[tuple[str, str], str]],
+                Iterable[tuple[RenderableType, str]]
+                | Iterable[tuple[tuple[str, str], str]],
+            ]
+            | Callable[
+                [str],
+                Awaitable[
+                    Sequence[tuple[RenderableType, str]]
+                    | Sequence[tuple[tuple[str, str], str]]
+                ],
+            ]
+            | Callable[
+                [str],
+                AsyncIterable[tuple[RenderableType, str]]
+                | AsyncIterable[tuple[tuple[str, str], str]],
             ]
+            | Literal["document"]
             | None
-        ) = None,
+        ) = "document",
+        find_match_limit: int | None = 10_000,
+        find_in_files_index_dir: Path | str | None = None,
+        completion_debounce_delay: float = 0.0,
     ) -> None:
         """
         Initializes an instance of a TextArea.
@@ -880,6 +1109,19 @@ class TextEditor(Widget, can_focus=True, can_focus_children=False):
             language (str): Must be the short name of a tree-sitter language,
                 e.g., "python", "sql"
             theme (str): Must be name of a Textual Theme.
+            word_completer: Completes the word before the cursor. "document"
+                (the default) completes the words in the document; None
+                disables word completion.
+            find_match_limit (int | None): Find stops counting matches after
+                this many have been found. None to always count every match.
+            find_in_files_index_dir (Path | str | None): If set, Find in Files
+                keeps a trigram index of each directory it searches in this
+                directory, so repeated searches read only the files that
+                could match.
+            completion_debounce_delay (float): Seconds to wait for the user to
+                stop typing before calling a completer, so that a burst of
+                typing calls it once, for the latest prefix. 0 (the default)
+                calls the completer for every key.
         """
         super().__init__(
             *children,
@@ -892,12 +1134,60 @@ class TextEditor(Widget, can_focus=True, can_focus_children=False):
         self._theme = theme
         self._initial_text = text
         self._find_history: list[str] = []
+        # the options (regex, case, whole word) last used to find
+        self._find_options = FindQuery("")
+        self._last_replacement = ""
+        self._find_index: FindIndex | MultilineFindIndex | None = None
+        self._folded_lines: FoldedLines | None = None
+        self._joined_buffer: JoinedBuffer | None = None
+        # the region of the document that find is restricted to, if the user
+        # enabled Find in Selection.
+        self._find_scope: Scope | None = None
+        # the comments and strings of the document, the syntax tree (i.e.,
+        # the parse) they were captured from, and the edits made since.
+        self._syntax_regions: SyntaxRegions | None = None
+        self._syntax_regions_tree: Tree | None = None
+        self._syntax_regions_edits: list[LineEdit] = []
+        # the query that captures comments and strings, and its document.
+        self._syntax_regions_query: Query | None = None
+        self._syntax_regions_document: DocumentBase | None = None
+        # the query and the edits made since the snapshot, while a find
+        # worker is indexing a snapshot of the document.
+        self._find_worker_query: FindQuery | None = None
+        self._find_worker_edits: list[LineEdit] = []
+        self._select_match_when_ready: Literal["next", "previous"] | None = None
+        self._find_debounce_timer: Timer | None = None
+        self._find_debounce_query: FindQuery | None = None
+        # the query for the find in files input, and the progress of the
+        # search.
+        self._find_in_files_query: FindQuery | None = None
+        self._find_in_files_searched = 0
+        self.find_in_files_index_dir = (
+            Path(find_in_files_index_dir).expanduser()
+            if find_in_files_index_dir is not None
+            else None
+        )
+        self.find_match_limit = find_match_limit
+        self.completion_debounce_delay = completion_debounce_delay
+        # the completion request waiting for the user to stop typing: the
+        # prefix, and the completer to call.
+        self._completion_debounce_timer: Timer | None = None
+        self._completion_debounce_request: (
+            tuple[str, Callable[[str], Any] | None] | None
+        ) = None
         self.use_system_clipboard = use_system_clipboard
         self.text_input: TextAreaPlus | None = None
         self.read_only = read_only
         self.path_completer = path_completer
         self.member_completer = member_completer
-        self.word_completer = word_completer
+        self.word_completer = (
+            self.complete_document_word
+            if word_completer == "document"
+            else word_completer
+        )
+        # the index of the words in the document, created the first time the
+        # default word completer is used.
+        self._document_words: DocumentWords | None = None
 
     @property
     def text(self) -> str:
@@ -1033,6 +1323,112 @@ class TextEditor(Widget, can_focus=True, can_focus_children=False):
             maintain_selection_offset=False,
         )
 
+    def replace_all(
+        self,
+        find: str,
+        replacement: str,
+        *,
+        regex: bool = False,
+        case_sensitive: bool = True,
+        whole_word: bool = False,
+        in_selection: bool = False,
+        syntax: SyntaxKind = "any",
+    ) -> int:
+        """
+        Replaces every match of find with replacement. All of the replacements
+        are applied as a single edit, so they are undone in one step.
+
+        Args:
+            find (str): The text (or regular expression, if regex is True) to
+                replace.
+            replacement (str): The text to replace each match with. If regex is
+                True, backreferences (e.g., \\1) are expanded.
+            regex (bool): Treat find as a regular expression.
+            case_sensitive (bool): Match case.
+            whole_word (bool): Only replace matches that are whole words.
+            in_selection (bool): Only replace matches within the selection.
+            syntax (str): Only replace matches in "code" (outside of comments
+                and strings), "comments", or "strings"; or "any" (the default).
+
+        Returns:
+            int: The number of matches replaced.
+
+        Raises:
+            re.error: If find or replacement is an invalid regular expression.
+        """
+        query = FindQuery(
+            find,
+            regex=regex,
+            case_sensitive=case_sensitive,
+            whole_word=whole_word,
+            syntax=syntax,
+        )
+        if self.text_input is None:
+            return 0
+        start, end = sorted(self.text_input.selection)
+        scope = Scope(start, end) if in_selection else None
+        return self._replace_all(query, replacement, scope)
+
+    def complete_document_word(self, prefix: str) -> list[tuple[str, str]]:
+        """
+        The default word completer: returns the words in the document that
+        start with prefix (ignoring case), from an index of the document's
+        words that is updated for only the lines touched by each edit.
+
+        Args:
+            prefix (str): The start of the word before the cursor.
+        """
+        document_words = self._document_words
+        if document_words is None:
+            return []
+        return document_words.complete(prefix)
+
+    # the word that equals the prefix isn't a completion of it, so it is
+    # dropped when the CompletionCache narrows a cached result, too.
+    complete_document_word.excludes_prefix = True  # type: ignore[attr-defined]
+
+    def find_in_all_editors(
+        self,
+        find: str,
+        *,
+        regex: bool = False,
+        case_sensitive: bool = True,
+        whole_word: bool = False,
+        syntax: SyntaxKind = "any",
+    ) -> None:
+        """
+        Searches the document of every TextEditor in the app (including this
+        one) for find. The documents are snapshotted, and then searched in a
+        pool of (at most) FIND_ALL_MAX_WORKERS threads.
+
+        This editor posts a TextAreaFindAllResult as the search of each
+        document completes, and then a TextAreaFindAllComplete. Starting a
+        new search cancels the previous one.
+
+        Args:
+            find (str): The text (or regular expression, if regex is True) to
+                find.
+            regex (bool): Treat find as a regular expression.
+            case_sensitive (bool): Match case.
+            whole_word (bool): Only find matches that are whole words.
+            syntax (str): Only find matches in "code" (outside of comments
+                and strings), "comments", or "strings"; or "any" (the default).
+
+        Raises:
+            re.error: If find is an invalid regular expression.
+        """
+        query = FindQuery(
+            find,
+            regex=regex,
+            case_sensitive=case_sensitive,
+            whole_word=whole_word,
+            syntax=syntax,
+        )
+        compiled = compile_pattern(query.text, query.flags) if query.regex else None
+        if isinstance(compiled, re.error):
+            raise compiled
+        self._start_find_in_all_editors(query)
+
     def copy_to_clipboard(self, text: str) -> None:
         """
         Sets the editor's internal clipboard, and the system clipboard if enabled, to
@@ -1156,6 +1552,7 @@ class TextEditor(Widget, can_focus=True, can_focus_children=False):
     def hide_completion_list(self, event: TextAreaHideCompletionList) -> None:
         event.stop()
         assert self.text_input is not None
+        self._cancel_completion_debounce()
         self.completion_list.is_open = False
         self.text_input.completer_active = None
 
@@ -1172,11 +1569,41 @@ class TextEditor(Widget, can_focus=True, can_focus_children=False):
 
     @on(TextAreaPlus.Changed)
     def check_for_find_updates(self, event: TextAreaPlus.Changed) -> None:
+        self._sync_line_edits()
         try:
             find_input = self.footer.query_one(FindInput)
         except Exception:
+            self._find_index = None
             return
-        self._update_find_label(value=find_input.value)
+        self._update_find_label(query=find_input.find_query)
+
+    @on(FindIndexReady)
+    def install_find_index(self, message: FindIndexReady) -> None:
+        message.stop()
+        assert self.text_input is not None
+        if message.index.query != self._find_worker_query:
+            return
+        self._sync_line_edits()
+        # adopt the worker's copies of the folded lines and joined buffer,
+        # which are now more complete than ours.
+        if isinstance(message.index, MultilineFindIndex):
+            if message.index.buffer is not None:
+                message.index.buffer.patch(self._find_worker_edits)
+                self._joined_buffer = message.index.buffer
+        elif message.index.folded_lines is not None:
+            message.index.folded_lines.patch(self._find_worker_edits)
+            self._folded_lines = message.index.folded_lines
+        message.index.patch(self.text_input.document.lines, self._find_worker_edits)
+        self._refilter_find_index(message.index)
+        self._find_index = message.index
+        self._find_worker_query = None
+        self._find_worker_edits = []
+        if self._select_match_when_ready == "next":
+            self._find_next_after_cursor(query=message.index.query)
+        elif self._select_match_when_ready == "previous":
+            self._find_previous_before_cursor(query=message.index.query)
+        self._select_match_when_ready = None
+        self._update_find_label(query=message.index.query)
 
     @on(TextAreaPlus.ShowCompletionList)
     def update_completers_and_completion_list_offset(
@@ -1190,11 +1617,30 @@ class TextEditor(Widget, can_focus=True, can_focus_children=False):
             region_y,
         )
         if self.text_input.completer_active == "path":
-            self.completion_list.show_completions(event.prefix, self.path_completer)
+            completer = self.path_completer
         elif self.text_input.completer_active == "member":
-            self.completion_list.show_completions(event.prefix, self.member_completer)
+            completer = self.member_completer
         elif self.text_input.completer_active == "word":
-            self.completion_list.show_completions(event.prefix, self.word_completer)
+            if (
+                self.word_completer == self.complete_document_word
+                and self._document_words is None
+            ):
+                self._sync_line_edits()
+                self._document_words = DocumentWords(self.text_input.document.lines)
+            completer = self.word_completer
+        else:
+            return
+        if self.completion_debounce_delay <= 0:
+            self.completion_list.show_completions(event.prefix, completer)
+            return
+        # the open list stays open, with its current items, until the
+        # completer is called for the last prefix in a burst of typing.
+        if self._completion_debounce_timer is not None:
+            self._completion_debounce_timer.stop()
+        self._completion_debounce_request = (event.prefix, completer)
+        self._completion_debounce_timer = self.set_timer(
+            self.completion_debounce_delay, self._flush_completion_debounce
+        )
 
     @on(TextAreaPlus.CompletionListKey)
     def forward_keypress_to_completion_list(
@@ -1207,6 +1653,7 @@ class TextEditor(Widget, can_focus=True, can_focus_children=False):
     def insert_completion(self, event: OptionList.OptionSelected) -> None:
         event.stop()
         assert self.text_input is not None
+        self._cancel_completion_debounce()
         value = getattr(event.option, "value", None) or str(event.option.prompt)
         self.text_input.replace_current_word(value)
         self.completion_list.is_open = False
@@ -1220,34 +1667,105 @@ class TextEditor(Widget, can_focus=True, can_focus_children=False):
     def update_validation_label(self, message: Input.Changed) -> None:
         if message.input.id is None:
             return
-        label = self.footer_label
         if message.input.id in (
             "textarea__save_input",
             "textarea__open_input",
             "textarea__gotoline_input",
+            "textarea__find_in_files_input",
         ):
             message.stop()
-            if message.validation_result and not message.validation_result.is_valid:
-                label.add_class("validation-error")
-                label.update(";".join(message.validation_result.failure_descriptions))
-            elif (
-                message.validation_result
-                and message.validation_result.is_valid
-                and message.input.id in ("textarea__save_input", "textarea__open_input")
-            ):
-                action = "Saving to" if "save" in message.input.id else "Opening"
-                p = Path(message.input.value).expanduser().resolve()
-                with suppress(ValueError):
-                    p = Path("~") / p.relative_to(Path.home())
-                label.remove_class("validation-error")
-                label.update(f"{action} {p}")
-            else:
-                label.remove_class("validation-error")
-                label.update("")
-        elif message.input.id in ("textarea__find_input"):
+            if isinstance(message.input, PathInput):
+                # the path is validated off the event loop; the label is
+                # updated by update_path_validation_label.
+                return
+            self._update_validation_label(
+                message.input.id, message.validation_result, path=None
+            )
+        elif isinstance(message.input, FindInput):
             message.stop()
-            self._update_find_label(value=message.value)
-            self._find_next_after_cursor(value=message.value)
+            assert self.text_input is not None
+            self._cancel_find_debounce()
+            query = message.input.find_query
+            if self.text_input.document.line_count < self.FIND_WORKER_MIN_LINES:
+                self._search_as_you_type(query=query)
+            else:
+                self._find_debounce_query = query
+                self._find_debounce_timer = self.set_timer(
+                    self.FIND_DEBOUNCE_DELAY, self._flush_find_debounce
+                )
+
+    @on(PathInput.Validated)
+    def update_path_validation_label(self, message: PathInput.Validated) -> None:
+        if message.input.id is None:
+            return
+        message.stop()
+        self._update_validation_label(
+            message.input.id, message.validation_result, path=message.path
+        )
+
+    def _update_validation_label(
+        self,
+        input_id: str,
+        validation_result: ValidationResult | None,
+        path: Path | None,
+    ) -> None:
+        """
+        Shows why the footer input's value isn't valid, or, for the Save and
+        Open inputs, the (resolved) path that will be saved or opened.
+        """
+        label = self.footer_label
+        if validation_result and not validation_result.is_valid:
+            label.add_class("validation-error")
+            label.update(";".join(validation_result.failure_descriptions))
+        elif (
+            validation_result
+            and validation_result.is_valid
+            and path is not None
+            and input_id in ("textarea__save_input", "textarea__open_input")
+        ):
+            action = "Saving to" if "save" in input_id else "Opening"
+            with suppress(ValueError):
+                path = Path("~") / path.relative_to(Path.home())
+            label.remove_class("validation-error")
+            label.update(f"{action} {path}")
+        else:
+            label.remove_class("validation-error")
+            label.update("")
+
+    @on(FindInput.OptionsChanged)
+    def update_find_options(self, message: FindInput.OptionsChanged) -> None:
+        message.stop()
+        self._cancel_find_debounce()
+        self._find_options = message.query._replace(text="")
+        if message.in_selection != (self._find_scope is not None):
+            self._set_find_scope(in_selection=message.in_selection)
+        self._highlight_find_matches(query=message.query)
+        self._find_next_after_cursor(query=message.query)
+        self._update_find_label(query=message.query)
+
+    @on(FindInput.ResultsToggled)
+    async def toggle_find_results(self, message: FindInput.ResultsToggled) -> None:
+        message.stop()
+        try:
+            results = self.footer.query_one(FindResults)
+        except Exception:
+            pass
+        else:
+            await results.remove()
+            return
+        results = FindResults(id="textarea__find_results")
+        await self.footer.mount(results)
+        self._update_find_label(query=message.query)
+        results.focus()
+
+    @on(FindResults.MatchSelected)
+    def select_find_result(self, message: FindResults.MatchSelected) -> None:
+        message.stop()
+        assert self.text_input is not None
+        self.selection = message.selection
+        self.text_input.scroll_cursor_visible(animate=True)
+        with suppress(Exception):
+            self._update_find_label(query=self.footer.query_one(FindInput).find_query)
 
     @on(Input.Submitted, "#textarea__save_input")
     async def save_file(self, message: Input.Submitted) -> None:
@@ -1275,22 +1793,53 @@ class TextEditor(Widget, can_focus=True, can_focus_children=False):
     @on(Input.Submitted, "#textarea__open_input")
     async def open_file(self, message: Input.Submitted) -> None:
         message.stop()
-        expanded_path = Path(message.input.value).expanduser()
-        try:
-            with open(expanded_path, "r") as f:
-                contents = f.read()
-        except OSError as e:
-            self.app.push_screen(
-                ErrorModal(
-                    title="Open File Error",
-                    header=("There was an error when attempting to open your file:"),
-                    error=e,
-                )
-            )
-        else:
-            self.text = contents
+        self._open_path(message.input.value)
         await self._clear_footer_input()
 
+    @on(Input.Submitted, "#textarea__find_in_files_input")
+    async def start_find_in_files(self, message: Input.Submitted) -> None:
+        message.stop()
+        query = self._find_in_files_query
+        if (
+            query is None
+            or message.validation_result is not None
+            and not message.validation_result.is_valid
+        ):
+            return
+        root = Path(message.input.value).expanduser()
+        with suppress(Exception):
+            await self.footer.query_one(FileFindResults).remove()
+        results = FileFindResults(root=str(root), id="textarea__file_results")
+        await self.footer.mount(results)
+        results.focus()
+        self._find_in_files_searched = 0
+        self.footer_label.remove_class("validation-error")
+        self.footer_label.update(f"Searching {root} for {query.text!r}...")
+        self._find_in_files(query, root)
+
+    @on(FileResultsReady)
+    def add_file_results(self, message: FileResultsReady) -> None:
+        message.stop()
+        try:
+            results = self.footer.query_one(FileFindResults)
+        except Exception:
+            return
+        results.add_results(message.results)
+        self._find_in_files_searched += message.searched
+        status = "" if message.is_complete else "; searching..."
+        self.footer_label.update(
+            f"{results.result_count:,} results in "
+            f"{self._find_in_files_searched:,} files{status}"
+        )
+
+    @on(FileFindResults.FileMatchSelected)
+    def open_file_result(self, message: FileFindResults.FileMatchSelected) -> None:
+        message.stop()
+        assert self.text_input is not None
+        if self._open_path(message.path):
+            self.selection = message.selection
+            self.text_input.scroll_cursor_visible(animate=True)
+
     @on(Input.Submitted, "#textarea__gotoline_input")
     async def goto_line(self, message: Input.Submitted) -> None:
         message.stop()
@@ -1306,8 +1855,53 @@ class TextEditor(Widget, can_focus=True, can_focus_children=False):
     def find_next(self, message: Input.Submitted) -> None:
         message.stop()
         message.input.checkpoint()  # type: ignore
+        self._flush_find_debounce()
         self.selection = Selection(start=self.selection.end, end=self.selection.end)
-        self._find_next_after_cursor(value=message.value)
+        assert isinstance(message.input, FindInput)
+        self._find_next_after_cursor(query=message.input.find_query)
+        self._update_find_label(query=message.input.find_query)
+
+    @on(FindInput.PreviousMatchRequested)
+    def find_previous(self, message: FindInput.PreviousMatchRequested) -> None:
+        message.stop()
+        self._flush_find_debounce()
+        self._find_previous_before_cursor(query=message.query)
+        self._update_find_label(query=message.query)
+
+    @on(Input.Submitted, "#textarea__replace_input")
+    def replace_next(self, message: Input.Submitted) -> None:
+        message.stop()
+        try:
+            find_input = self.footer.query_one(FindInput)
+        except Exception:
+            return
+        find_input.checkpoint()
+        query = find_input.find_query
+        try:
+            self._replace_selected_match(query=query, replacement=message.value)
+        except re.error as e:
+            self._show_replacement_error(e)
+            return
+        self._find_next_after_cursor(query=query)
+        self._update_find_label(query=query)
+
+    @on(ReplaceInput.ReplaceAllRequested)
+    def replace_all_matches(self, message: ReplaceInput.ReplaceAllRequested) -> None:
+        message.stop()
+        try:
+            find_input = self.footer.query_one(FindInput)
+        except Exception:
+            return
+        find_input.checkpoint()
+        try:
+            count = self._replace_all(
+                find_input.find_query, message.replacement, self._find_scope
+            )
+        except re.error as e:
+            self._show_replacement_error(e)
+            return
+        with suppress(Exception):
+            self.footer.query_one(ReplaceInput).border_title = f"replaced {count:,}"
 
     def watch_theme(self, theme: str) -> None:
         if self.text_input is None:
@@ -1353,10 +1947,84 @@ class TextEditor(Widget, can_focus=True, can_focus_children=False):
         find_input = FindInput(
             value=value,
             history=self._find_history,
+            regex=self._find_options.regex,
+            case_sensitive=self._find_options.case_sensitive,
+            whole_word=self._find_options.whole_word,
+            syntax=self._find_options.syntax,
             classes="textarea--footer-input",
         )
         await self._mount_footer_input(input_widget=find_input)
 
+    async def action_find_previous(self) -> None:
+        try:
+            find_input = self.footer.query_one(FindInput)
+        except Exception:
+            await self.action_find(prepopulate_from_history=True)
+            return
+        find_input.focus()
+        find_input.checkpoint()
+        self._find_previous_before_cursor(query=find_input.find_query)
+        self._update_find_label(query=find_input.find_query)
+
+    async def action_replace(self) -> None:
+        try:
+            replace_input = self.footer.query_one(ReplaceInput)
+        except Exception:
+            pass
+        else:
+            replace_input.focus()
+            return
+        await self.action_find()
+        find_input = self.footer.query_one(FindInput)
+        replace_input = ReplaceInput(
+            value=self._last_replacement, classes="textarea--footer-input"
+        )
+        await self.footer.mount(replace_input)
+        if find_input.value:
+            replace_input.focus()
+
+    def action_find_in_all_editors(self) -> None:
+        """
+        Search every editor for the query in the Find input (or, if it is
+        closed, the last query).
+        """
+        try:
+            query = self.footer.query_one(FindInput).find_query
+        except Exception:
+            if not self._find_history:
+                return
+            query = self._find_options._replace(text=self._find_history[-1])
+        if query.text and query.error is None:
+            self._start_find_in_all_editors(query)
+
+    async def action_find_in_files(self) -> None:
+        """
+        Search the files in a directory for the query in the Find input (or,
+        if it is closed, the last query).
+        """
+        try:
+            query = self.footer.query_one(FindInput).find_query
+        except Exception:
+            if not self._find_history:
+                await self.action_find()
+                return
+            query = self._find_options._replace(text=self._find_history[-1])
+        if not query.text or query.error is not None:
+            return
+        self._find_in_files_query = query
+        path_input = PathInput(
+            id="textarea__find_in_files_input",
+            placeholder=(
+                f"Find {query.text!r} in files: Enter a directory OR press ESC to "
+                "cancel"
+            ),
+            file_okay=False,
+            dir_okay=True,
+            must_exist=True,
+            classes="textarea--footer-input",
+        )
+        await self._mount_footer_input(input_widget=path_input)
+
     async def action_goto_line(self) -> None:
         try:
             goto_input = self.footer.query_one(GotoLineInput)
@@ -1380,9 +2048,28 @@ class TextEditor(Widget, can_focus=True, can_focus_children=False):
         if self.footer.has_focus or self.footer.has_focus_within:
             # move focus to the main text area
             self.focus()
+        with suppress(Exception):
+            self._last_replacement = self.footer.query_one(ReplaceInput).value
         await self.footer.remove_children(Input)
+        await self.footer.remove_children(FindResults)
         self.footer_label.update("")
         self.footer.add_class("hide")
+        self.workers.cancel_group(self, "find")
+        self.workers.cancel_group(self, "find_in_files")
+        if self.text_input is not None:
+            self.text_input.highlight_find_matches(None)
+        self._find_index = None
+        self._folded_lines = None
+        self._joined_buffer = None
+        self._find_scope = None
+        self._syntax_regions = None
+        self._syntax_regions_tree = None
+        self._syntax_regions_edits = []
+        self._find_worker_query = None
+        self._find_worker_edits = []
+        self._select_match_when_ready = None
+        self._cancel_find_debounce()
+        self._find_in_files_query = None
 
     async def _mount_footer_input(self, input_widget: Input) -> None:
         """
@@ -1396,6 +2083,7 @@ class TextEditor(Widget, can_focus=True, can_focus_children=False):
             else:
                 self.footer_label.update("")
                 await self.footer.remove_children(Input)
+                await self.footer.remove_children(FindResults)
         self.footer.remove_class("hide")
         await self.footer.mount(input_widget)
         input_widget.focus()
@@ -1416,46 +2104,589 @@ class TextEditor(Widget, can_focus=True, can_focus_children=False):
         )
         await self._mount_footer_input(input_widget=path_input)
 
-    def _find_next_after_cursor(self, value: str) -> None:
+    def _sync_line_edits(self) -> None:
+        """
+        Apply the edits made to the document since the last sync to the
+        find index, the casefolded lines, the joined buffer, and the index of
+        the document's words.
+        """
         assert self.text_input is not None
-        if not value:
+        line_edits = self.text_input.pop_line_edits()
+        if not line_edits:
             return
-        cursor = self.selection.start
+        if self._syntax_regions is not None:
+            self._syntax_regions_edits.extend(line_edits)
+        if self._document_words is not None:
+            if self.word_completer == self.complete_document_word:
+                self._document_words.patch(self.text_input.document.lines, line_edits)
+            else:
+                self._document_words = None
+        if self._folded_lines is not None:
+            self._folded_lines.patch(line_edits)
+            if len(self._folded_lines) != self.text_input.document.line_count:
+                # the edits don't describe this document; start over.
+                self._folded_lines = None
+                if isinstance(self._find_index, FindIndex):
+                    self._find_index.folded_lines = None
+        if self._joined_buffer is not None:
+            self._joined_buffer.patch(line_edits)
+        if self._find_scope is not None:
+            self._find_scope = self._find_scope.patch(line_edits)
+        if self._find_worker_query is not None:
+            self._find_worker_edits.extend(line_edits)
+        elif self._find_index is not None:
+            self._find_index.patch(self.text_input.document.lines, line_edits)
+            self._refilter_find_index(self._find_index)
+
+    def _get_find_index(
+        self, query: FindQuery
+    ) -> FindIndex | MultilineFindIndex | None:
+        """
+        Returns the index of matches for query. If the find query has changed
+        since the index was last built, builds a new index; large documents are
+        indexed by a worker, in which case this returns None and the worker
+        posts FindIndexReady when it completes.
+        """
+        assert self.text_input is not None
+        find_index = self._get_built_find_index(query)
+        if find_index is not None:
+            return find_index
+        elif self._find_worker_query == query:
+            return None
+        previous_index, self._find_index = self._find_index, None
+        self._select_match_when_ready = None
         lines = self.text_input.document.lines
-        # first search text after the cursor
-        for i, line in enumerate(lines[cursor[0] :]):
-            pos = line.find(value, cursor[1] if i == 0 else None)
-            if pos >= 0:
-                self.selection = Selection(
-                    start=(cursor[0] + i, pos),
-                    end=(cursor[0] + i, pos + cell_len(value)),
+        if self._folded_lines is None and LineMatcher(query).uses_folded_lines:
+            self._folded_lines = FoldedLines(len(lines))
+        if (
+            isinstance(previous_index, FindIndex)
+            and previous_index.is_complete
+            and query.extends(previous_index.query)
+        ):
+            # the only lines that can match are those that matched the
+            # previous query, so there's no need for a worker.
+            self._find_index = previous_index.narrow(
+                query, lines, folded_lines=self._folded_lines
+            )
+            return self._find_index
+        if len(lines) < self.FIND_WORKER_MIN_LINES:
+            self.workers.cancel_group(self, "find")
+            self._find_worker_query = None
+            self._find_worker_edits = []
+            self._find_index = self._new_find_index(
+                query,
+                max_matches=self.find_match_limit,
+                folded_lines=self._folded_lines,
+                buffer=self._joined_buffer,
+                scope=self._find_scope,
+                span_filter=self._get_span_filter(query),
+            )
+            self._find_index.build(lines)
+            if isinstance(self._find_index, MultilineFindIndex):
+                self._joined_buffer = self._find_index.buffer
+            return self._find_index
+        self._find_worker_query = query
+        self._find_worker_edits = []
+        # the worker gets its own copy of the folded lines and joined buffer,
+        # since the document (and so the copies) may be edited while it runs.
+        self._build_find_index(
+            query,
+            list(lines),
+            None if self._folded_lines is None else self._folded_lines.copy(),
+            None if self._joined_buffer is None else self._joined_buffer.copy(),
+            self._find_scope,
+            self._get_span_filter(query),
+        )
+        return None
+
+    def _get_built_find_index(
+        self, query: FindQuery
+    ) -> FindIndex | MultilineFindIndex | None:
+        """
+        Returns the index of matches for query, if one has been built (and
+        updated for the edits since), without building one or starting a
+        worker to build one.
+        """
+        self._sync_line_edits()
+        if self._find_index is not None and self._find_index.query == query:
+            return self._find_index
+        return None
+
+    @work(thread=True, exclusive=True, group="find")
+    def _build_find_index(
+        self,
+        query: FindQuery,
+        lines: list[str],
+        folded_lines: FoldedLines | None,
+        buffer: JoinedBuffer | None,
+        scope: Scope | None,
+        span_filter: SpanFilter | None,
+    ) -> None:
+        worker = get_current_worker()
+        index = self._new_find_index(
+            query,
+            max_matches=self.find_match_limit,
+            folded_lines=folded_lines,
+            buffer=buffer,
+            scope=scope,
+            span_filter=span_filter,
+        )
+        if index.build(lines, is_cancelled=lambda: worker.is_cancelled):
+            self.post_message(self.FindIndexReady(index))
+
+    @staticmethod
+    def _new_find_index(
+        query: FindQuery,
+        max_matches: int | None,
+        folded_lines: FoldedLines | None,
+        buffer: JoinedBuffer | None,
+        scope: Scope | None,
+        span_filter: SpanFilter | None = None,
+    ) -> FindIndex | MultilineFindIndex:
+        """
+        Queries that can span lines are searched in a buffer of the joined
+        lines; all others are searched line by line.
+        """
+        if query.multiline:
+            return MultilineFindIndex(
+                query, max_matches=max_matches, buffer=buffer, scope=scope
+            )
+        return FindIndex(
+            query,
+            max_matches=max_matches,
+            folded_lines=folded_lines,
+            scope=scope,
+            span_filter=span_filter,
+        )
+
+    def _start_find_in_all_editors(self, query: FindQuery) -> None:
+        """
+        Snapshot the lines of every editor's document, and search them in a
+        worker.
+        """
+        editors: list[TextEditor] = []
+        jobs: list[FindJob] = []
+        for editor in self.app.query(TextEditor):
+            if editor.text_input is None:
+                continue
+            editors.append(editor)
+            jobs.append(
+                FindJob(
+                    lines=tuple(editor.text_input.document.lines),
+                    find_index=self._new_find_index(
+                        query,
+                        max_matches=editor.find_match_limit,
+                        folded_lines=None,
+                        buffer=None,
+                        scope=None,
+                        span_filter=editor._get_span_filter(query),
+                    ),
                 )
-                break
-        # search text from beginning, including line with cursor
+            )
+        self._find_in_all_editors(query, editors, jobs)
+
+    @work(thread=True, exclusive=True, group="find_all")
+    def _find_in_all_editors(
+        self, query: FindQuery, editors: list[TextEditor], jobs: list[FindJob]
+    ) -> None:
+        worker = get_current_worker()
+        for i in build_concurrently(
+            jobs, self.FIND_ALL_MAX_WORKERS, is_cancelled=lambda: worker.is_cancelled
+        ):
+            self.post_message(TextAreaFindAllResult(editors[i], jobs[i].find_index))
+        if not worker.is_cancelled:
+            self.post_message(TextAreaFindAllComplete(query, len(jobs)))
+
+    @work(thread=True, exclusive=True, group="find_in_files")
+    def _find_in_files(self, query: FindQuery, root: Path) -> None:
+        worker = get_current_worker()
+        index = (
+            TrigramIndex.for_directory(self.find_in_files_index_dir, root)
+            if self.find_in_files_index_dir is not None
+            else None
+        )
+        for searched, results in find_in_files(
+            root,
+            query,
+            max_depth=self.FIND_IN_FILES_MAX_DEPTH,
+            max_file_size=self.FIND_IN_FILES_MAX_FILE_SIZE,
+            max_matches_per_file=self.FIND_IN_FILES_MAX_MATCHES_PER_FILE,
+            max_workers=self.FIND_IN_FILES_MAX_WORKERS,
+            is_cancelled=lambda: worker.is_cancelled,
+            index=index,
+        ):
+            self.post_message(self.FileResultsReady(searched, results, False))
+        if not worker.is_cancelled:
+            self.post_message(self.FileResultsReady(0, [], True))
+
+    def _open_path(self, path: str | Path) -> bool:
+        """
+        Replace the document with the contents of the file at path. Shows an
+        error, and returns False, if the file can't be read.
+        """
+        expanded_path = Path(path).expanduser()
+        try:
+            with open(expanded_path, "r") as f:
+                contents = f.read()
+        except OSError as e:
+            self.app.push_screen(
+                ErrorModal(
+                    title="Open File Error",
+                    header=("There was an error when attempting to open your file:"),
+                    error=e,
+                )
+            )
+            return False
+        self.text = contents
+        return True
+
+    def _get_syntax_regions(self) -> SyntaxRegions:
+        """
+        Returns the comments and strings of the document. The syntax tree is
+        queried at most once per parse (i.e., once per edit), and after an
+        edit, only for the rows that the edit touched or that the parse
+        changed (e.g., after opening a string).
+        """
+        assert self.text_input is not None
+        tree = self.syntax_tree
+        if self._syntax_regions is not None and tree is not self._syntax_regions_tree:
+            # collect the edits made since the regions were captured (this may
+            # update the regions, if it refilters the find index).
+            self._sync_line_edits()
+        regions, old_tree = self._syntax_regions, self._syntax_regions_tree
+        if regions is not None and tree is old_tree:
+            return regions
+        document = self.text_input.document
+        query = self._get_syntax_regions_query()
+        edits, self._syntax_regions_edits = self._syntax_regions_edits, []
+        if tree is None or query is None:
+            regions = SyntaxRegions()
+        elif (
+            regions is None
+            or old_tree is None
+            or document is not self._syntax_regions_document
+            # the old tree is only edited by the first edit, so its changes
+            # can only be compared with the new tree after a single edit.
+            or len(edits) != 1
+        ):
+            regions = SyntaxRegions.from_captures(
+                self.query_syntax_tree(query), document.lines
+            )
         else:
-            for i, line in enumerate(lines[: cursor[0] + 1]):
-                pos = line.find(value)
-                if pos >= 0:
-                    self.selection = Selection(
-                        start=(i, pos), end=(i, pos + cell_len(value))
-                    )
-                    break
+            regions.patch(edits)
+            changed = [
+                (changed_range.start_point[0], changed_range.end_point[0])
+                for changed_range in old_tree.changed_ranges(tree)
+            ]
+            changed.extend(merge_line_edits(edits))
+            first = max(0, min(first for first, _ in changed))
+            last = min(document.line_count - 1, max(last for _, last in changed))
+            captures = self.query_syntax_tree(
+                query, start_point=(first, 0), end_point=(last + 1, 0)
+            )
+            regions.update(captures, document.lines, range(first, last + 1))
+        self._syntax_regions = regions
+        self._syntax_regions_tree = tree
+        self._syntax_regions_document = document
+        return regions
+
+    def _get_syntax_regions_query(self) -> Query | None:
+        """
+        Returns the query that captures the document's comments and strings:
+        the TextArea's highlight query, or, if the TextArea doesn't expose
+        one, a query for the node types that most grammars name comment and
+        string.
+        """
+        assert self.text_input is not None
+        if hasattr(self.text_input, "_highlight_query"):
+            return self.text_input._highlight_query
+        document = self.text_input.document
+        if document is not self._syntax_regions_document:
+            patterns = []
+            for pattern in ("(comment) @comment", "(string) @string"):
+                # grammars without a node type reject a pattern for it
+                with suppress(Exception):
+                    if self.prepare_query(pattern) is not None:
+                        patterns.append(pattern)
+            self._syntax_regions_query = (
+                self.prepare_query("\n".join(patterns)) if patterns else None
+            )
+        return self._syntax_regions_query
+
+    def _get_span_filter(self, query: FindQuery) -> SpanFilter | None:
+        """
+        Returns the filter that limits the matches of query to its syntax
+        regions, for the current parse of the document.
+        """
+        if query.syntax == "any" or query.multiline:
+            return None
+        return self._get_syntax_regions().span_filter(query.syntax)
+
+    def _refilter_find_index(self, find_index: FindIndex | MultilineFindIndex) -> None:
+        """
+        After an edit, the document has been reparsed, and any of its syntax
+        regions may have changed (e.g., by opening a string), so the
+        candidate matches are filtered again.
+        """
+        if isinstance(find_index, FindIndex) and find_index.span_filter is not None:
+            span_filter = self._get_span_filter(find_index.query)
+            assert span_filter is not None
+            find_index.refilter(span_filter)
+
+    def _set_find_scope(self, in_selection: bool) -> None:
+        """
+        Restrict find to the current selection, or remove the restriction.
+        """
+        scope = None
+        if in_selection:
+            start, end = sorted(self.selection)
+            if start == end:
+                # there is no selection to find in.
+                with suppress(Exception):
+                    self.footer.query_one(FindInput).set_in_selection(False)
+                return
+            scope = Scope(start, end)
+        self._find_scope = scope
+        # any index (or worker building one) is for the old scope.
+        self.workers.cancel_group(self, "find")
+        self._find_index = None
+        self._find_worker_query = None
+        self._find_worker_edits = []
+        self._select_match_when_ready = None
+
+    def _replace_all(
+        self, query: FindQuery, replacement: str, scope: Scope | None
+    ) -> int:
+        assert self.text_input is not None
+        if self.text_input.read_only or not query.text:
+            return 0
+        compiled = compile_pattern(query.text, query.flags) if query.regex else None
+        if isinstance(compiled, re.error):
+            raise compiled
+        document = self.text_input.document
+        # replacing needs every match, so unless the index has already been
+        # built, the document is scanned here, once (without starting a worker
+        # to build the index, too); if the index is incomplete, replace_all
+        # scans the rest of the document.
+        find_index = (
+            self._get_built_find_index(query) if scope == self._find_scope else None
+        )
+        if find_index is None:
+            find_index = self._new_find_index(
+                query,
+                max_matches=None,
+                folded_lines=self._folded_lines,
+                buffer=self._joined_buffer,
+                scope=scope,
+                span_filter=self._get_span_filter(query),
+            )
+            find_index.build(document.lines)
+        replacement_edit = find_index.replace_all(
+            document.lines, replacement, newline=document.newline
+        )
+        if replacement_edit is None:
+            return 0
+        self.text_input.history.checkpoint()
+        self.text_input.replace(
+            replacement_edit.text, replacement_edit.start, replacement_edit.end
+        )
+        self.text_input.history.checkpoint()
+        return replacement_edit.replaced
+
+    def _replace_selected_match(self, query: FindQuery, replacement: str) -> None:
+        """
+        If the selection is exactly a match for query, replaces it with
+        replacement and moves the cursor to the end of the replacement.
+        """
+        assert self.text_input is not None
+        if self.text_input.read_only or not query.text or query.error is not None:
+            return
+        start, end = sorted(self.selection)
+        if start == end:
+            return
+        elif query.multiline:
+            find_index = self._get_find_index(query)
+            if not isinstance(find_index, MultilineFindIndex):
+                return
+            new_text = find_index.expand(self.selection, replacement)
+            if new_text is None:
+                return
+            self.text_input.history.checkpoint()
+            self.text_input.replace(
+                new_text, start, end, maintain_selection_offset=False
+            )
+            return
+        elif start[0] != end[0]:
+            return
+        line = self.text_input.document.get_line(start[0])
+        matcher = LineMatcher(query)
+        span = (start[1], end[1])
+        if span not in matcher(line):
+            return
+        elif self._find_scope is not None and not self._find_scope.clip(
+            start[0], (span,)
+        ):
+            return
+        span_filter = self._get_span_filter(query)
+        if span_filter is not None and not span_filter(start[0], (span,)):
+            return
+        text = matcher.expand(line, span, replacement)
+        self.text_input.history.checkpoint()
+        self.text_input.replace(text, start, end, maintain_selection_offset=False)
+
+    def _show_replacement_error(self, error: re.error) -> None:
+        self.footer_label.add_class("validation-error")
+        self.footer_label.update(f"Invalid replacement: {error}")
+
+    def _search_as_you_type(self, query: FindQuery) -> None:
+        self._highlight_find_matches(query=query)
+        self._find_next_after_cursor(query=query)
+        self._update_find_label(query=query)
+
+    def _flush_find_debounce(self) -> None:
+        """
+        Run the search that is waiting for the user to stop typing, if any.
+        """
+        query = self._find_debounce_query
+        self._cancel_find_debounce()
+        if query is not None:
+            self._search_as_you_type(query=query)
+
+    def _cancel_find_debounce(self) -> None:
+        if self._find_debounce_timer is not None:
+            self._find_debounce_timer.stop()
+        self._find_debounce_timer = None
+        self._find_debounce_query = None
+
+    def _flush_completion_debounce(self) -> None:
+        """
+        Call the completer for the prefix that was waiting for the user to
+        stop typing, if any.
+        """
+        request = self._completion_debounce_request
+        self._cancel_completion_debounce()
+        if (
+            request is not None
+            and self.text_input is not None
+            and self.text_input.completer_active is not None
+        ):
+            self.completion_list.show_completions(*request)
+
+    def _cancel_completion_debounce(self) -> None:
+        if self._completion_debounce_timer is not None:
+            self._completion_debounce_timer.stop()
+        self._completion_debounce_timer = None
+        self._completion_debounce_request = None
+
+    def _highlight_find_matches(self, query: FindQuery) -> None:
+        assert self.text_input is not None
+        if not query.text or query.error is not None or query.multiline:
+            # matches that span lines are not highlighted.
+            self.text_input.highlight_find_matches(None)
+            return
+        matcher = LineMatcher(query)
+        scope = self._find_scope
+        if scope is None and query.syntax == "any":
+            self.text_input.highlight_find_matches(lambda _, line: matcher(line))
+            return
+
+        def match_in_scope(row: int, line: str) -> tuple[Span, ...]:
+            spans = matcher(line)
+            if scope is not None and spans:
+                spans = scope.clip(row, spans)
+            # the filter is looked up for each line, since highlights are
+            # updated after edits, which may have changed the syntax regions.
+            span_filter = self._get_span_filter(query)
+            if span_filter is not None and spans:
+                spans = span_filter(row, spans)
+            return spans
+
+        self.text_input.highlight_find_matches(match_in_scope)
+
+    def _find_next_after_cursor(self, query: FindQuery) -> None:
+        assert self.text_input is not None
+        if not query.text or query.error is not None:
+            return
+        find_index = self._get_find_index(query)
+        if find_index is None:
+            self._select_match_when_ready = "next"
+            return
+        match = find_index.next_match(
+            self.selection.start, self.text_input.document.lines
+        )
+        if match is not None:
+            self.selection = match
         self.text_input.scroll_cursor_visible(animate=True)
 
-    def _update_find_label(self, value: str) -> None:
+    def _find_previous_before_cursor(self, query: FindQuery) -> None:
+        assert self.text_input is not None
+        if not query.text or query.error is not None:
+            return
+        find_index = self._get_find_index(query)
+        if find_index is None:
+            self._select_match_when_ready = "previous"
+            return
+        match = find_index.previous_match(
+            min(self.selection), self.text_input.document.lines
+        )
+        if match is not None:
+            self.selection = match
+        self.text_input.scroll_cursor_visible(animate=True)
+
+    def _update_find_label(self, query: FindQuery) -> None:
         label = self.footer_label
-        if not value:
+        if not query.text:
             label.remove_class("validation-error")
             label.update("")
+            self._update_find_results(None)
+            return
+        elif query.error is not None:
+            label.add_class("validation-error")
+            label.update(f"Invalid regex: {query.error}")
+            self._update_find_results(None)
             return
 
-        n_matches = self.text.count(value)
-        if n_matches > 1:
+        find_index = self._get_find_index(query)
+        if find_index is None:
+            label.remove_class("validation-error")
+            label.update("Searching...")
+            self._update_find_results(None)
+            return
+
+        n_matches = find_index.total
+        count = f"{n_matches:,}" if find_index.is_complete else f"{n_matches:,}+"
+        match_number = find_index.match_number(self.selection)
+        self._update_find_results(find_index, match_number)
+        if n_matches > 1 and match_number is not None:
+            label.remove_class("validation-error")
+            label.update(
+                f"Match {match_number:,} of {count}; Enter for next; ESC to close"
+            )
+        elif n_matches > 1:
             label.remove_class("validation-error")
-            label.update(f"{n_matches} found; Enter for next; ESC to close")
+            label.update(f"{count} found; Enter for next; ESC to close")
         elif n_matches > 0:
             label.remove_class("validation-error")
-            label.update(f"{n_matches} found")
+            label.update(f"{count} found")
         else:
             label.add_class("validation-error")
             label.update("No results.")
+
+    def _update_find_results(
+        self,
+        find_index: FindIndex | MultilineFindIndex | None,
+        match_number: int | None = None,
+    ) -> None:
+        """
+        If the find results panel is open, show the matches in find_index, and
+        highlight the selected match.
+        """
+        assert self.text_input is not None
+        try:
+            results = self.footer.query_one(FindResults)
+        except Exception:
+            return
+        document = self.text_input.document
+        results.set_matches(find_index, document.get_line, document.line_count)
+        if match_number is not None:
+            results.move_cursor(match_number - 1)
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from textual_textarea.find_in_files import document_lines, read_text
+from textual_textarea.find_index import FindQuery
+
+try:  # Python 3.11+
+    from re import _parser as sre_parse  # type: ignore[attr-defined]
+except ImportError:  # pragma: no cover
+    import sre_parse  # type: ignore[no-redef,unused-ignore]
+
+# bumped when the schema changes, so old indexes are rebuilt.
+SCHEMA_VERSION = 1
+# the number of files indexed between commits.
+COMMIT_INTERVAL = 256
+
+
+class TrigramIndex:
+    """
+    An on-disk index of the trigrams (three-character substrings) of each
+    text file under a directory, used to narrow the files that must be
+    searched for a query to those that contain every trigram of the query's
+    literal text.
+
+    The index is a sqlite database. Files are re-indexed only when their
+    mtime or size changes, so repeated searches of a large directory read only
+    the files that changed. Trigrams are casefolded, so an index can narrow
+    both case-sensitive and case-insensitive queries.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    @classmethod
+    def for_directory(cls, index_dir: Path, root: Path) -> TrigramIndex:
+        """
+        Returns the index for the files under root, stored in index_dir.
+        """
+        digest = hashlib.sha1(str(root.resolve()).encode()).hexdigest()[:16]
+        return cls(index_dir / f"{digest}.sqlite")
+
+    def update(
+        self,
+        paths: Iterable[str],
+        max_file_size: int,
+        is_cancelled: Callable[[], bool] | None = None,
+    ) -> int:
+        """
+        Index the files in paths that are new or have changed since they were
+        last indexed, and forget the files that are no longer in paths.
+
+        Returns:
+            int: The number of files that were (re)indexed.
+        """
+        indexed = 0
+        with closing(self._connect()) as db:
+            known: dict[str, tuple[int, int, int]] = {
+                path: (file_id, mtime_ns, size)
+                for file_id, path, mtime_ns, size in db.execute(
+                    "select id, path, mtime_ns, size from files"
+                )
+            }
+            for path in paths:
+                if is_cancelled is not None and is_cancelled():
+                    db.commit()
+                    return indexed
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                previous = known.pop(path, None)
+                if previous is not None:
+                    file_id, mtime_ns, size = previous
+                    if (mtime_ns, size) == (st.st_mtime_ns, st.st_size):
+                        continue
+                    self._forget(db, file_id)
+                text = read_text(path, max_file_size)
+                # files that aren't text are recorded (with no trigrams), so
+                # they aren't read again until they change.
+                new_id = db.execute(
+                    "insert into files (path, mtime_ns, size) values (?, ?, ?)",
+                    (path, st.st_mtime_ns, st.st_size),
+                ).lastrowid
+                if text is not None:
+                    db.executemany(
+                        "insert into trigrams (trigram, file_id) values (?, ?)",
+                        ((trigram, new_id) for trigram in trigrams(text)),
+                    )
+                indexed += 1
+                if indexed % COMMIT_INTERVAL == 0:
+                    db.commit()
+            for file_id, _, _ in known.values():
+                self._forget(db, file_id)
+            db.commit()
+        return indexed
+
+    def candidates(self, query: FindQuery) -> set[str] | None:
+        """
+        Returns the paths of the indexed files that could match query, or None
+        if the index can't narrow the query (e.g., because it is too short),
+        in which case any file could match.
+        """
+        required = query_trigrams(query)
+        if not required:
+            return None
+        placeholders = ", ".join("?" * len(required))
+        with closing(self._connect()) as db:
+            rows = db.execute(
+                "select path from files where id in ("
+                "select file_id from trigrams "
+                f"where trigram in ({placeholders}) "
+                "group by file_id having count(*) = ?)",
+                (*required, len(required)),
+            )
+            return {path for (path,) in rows}
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(self.path)
+        (version,) = db.execute("pragma user_version").fetchone()
+        if version != SCHEMA_VERSION:
+            db.executescript(
+                f"""
+                drop table if exists trigrams;
+                drop table if exists files;
+                create table files (
+                    id integer primary key,
+                    path text unique not null,
+                    mtime_ns integer not null,
+                    size integer not null
+                );
+                create table trigrams (
+                    trigram text not null,
+                    file_id integer not null,
+                    primary key (trigram, file_id)
+                ) without rowid;
+                create index trigrams_by_file on trigrams (file_id);
+                pragma user_version = {SCHEMA_VERSION};
+                """
+            )
+        return db
+
+    @staticmethod
+    def _forget(db: sqlite3.Connection, file_id: int) -> None:
+        db.execute("delete from trigrams where file_id = ?", (file_id,))
+        db.execute("delete from files where id = ?", (file_id,))
+
+
+def trigrams(text: str) -> set[str]:
+    """
+    Returns the casefolded trigrams of text, with its lines split and joined
+    by newlines, as they are when a file is searched.
+    """
+    folded = "\n".join(document_lines(text)).casefold()
+    return {folded[i : i + 3] for i in range(len(folded) - 2)}
+
+
+def query_trigrams(query: FindQuery) -> set[str]:
+    """
+    Returns trigrams that every match of query must contain: those of a
+    literal query's text, or of the runs of literal characters that a regex
+    requires. May be empty, if nothing is required.
+    """
+    if not query.regex:
+        return trigrams(query.text)
+    try:
+        parsed = sre_parse.parse(query.text, query.flags)
+    except Exception:
+        return set()
+    runs: list[str] = []
+    runs.append(_collect_literal_runs(parsed, runs, ""))
+    return set().union(*(trigrams(run) for run in runs))
+
+
+def _collect_literal_runs(
+    items: Iterable[tuple[Any, Any]], runs: list[str], run: str
+) -> str:
+    """
+    Walks a parsed regex, appending to runs each sequence of literal
+    characters that every match must contain. Returns the run in progress at
+    the end of items. Anything other than a literal, a group, or a repeat
+    that must match at least once ends a run, since it could match anything.
+    """
+    for op, arg in items:
+        if op is sre_parse.LITERAL:
+            run += chr(arg)
+        elif op is sre_parse.SUBPATTERN:
+            # a group's contents must match, between what precedes and follows it
+            run = _collect_literal_runs(arg[-1], runs, run)
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and arg[0] >= 1:
+            runs.append(run)
+            runs.append(_collect_literal_runs(arg[2], runs, ""))
+            run = ""
+        else:
+            runs.append(run)
+            run = ""
+    return run
@@ -0,0 +1,14 @@
+import re
+
+WORD_PROG = re.compile(r"\w+")
+NON_WORD_CHAR_PROG = re.compile(r"\W")
+
+
+def splits_word(line: str, pos: int) -> bool:
+    """
+    Returns True if pos falls between two word characters of line.
+    """
+    if pos <= 0 or pos >= len(line):
+        return False
+    match = WORD_PROG.match(line, pos - 1)
+    return match is not None and match.end() > pos
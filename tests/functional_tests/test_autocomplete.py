@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import asyncio
 from pathlib import Path
 from time import monotonic
-from typing import Callable
+from typing import AsyncIterator, Callable, Iterator
 from unittest.mock import MagicMock
 
 import pytest
@@ -11,6 +12,7 @@ from textual.message import Message
 from textual.widgets.text_area import Selection
 
 from textual_textarea import TextEditor
+from textual_textarea.autocomplete import Completion, CompletionList
 
 
 @pytest.fixture
@@ -278,3 +280,129 @@ async def test_autocomplete_members(
         assert ta.text_input is not None
         assert ta.text_input.completer_active == "member"
         assert ta.completion_list.is_open is True
+
+
+@pytest.mark.asyncio
+async def test_autocomplete_debounce(
+    app: App, word_completer: Callable[[str], list[tuple[str, str]]]
+) -> None:
+    completer = MagicMock(side_effect=word_completer)
+    async with app.run_test() as pilot:
+        ta = app.query_one("#ta", expect_type=TextEditor)
+        ta.word_completer = completer
+        ta.completion_debounce_delay = 0.1
+        ta.focus()
+        ta.text = "foo "
+        ta.selection = Selection((0, 4), (0, 4))
+        await pilot.pause()
+
+        await pilot.press("s", "e", "l")
+        await pilot.pause(0.3)
+        await app.workers.wait_for_complete()
+        await pilot.pause()
+        # the burst of typing calls the completer once, for the last prefix
+        completer.assert_called_once_with("sel")
+        assert ta.completion_list.is_open is True
+        assert ta.completion_list.option_count == 3
+
+
+@pytest.mark.asyncio
+async def test_autocomplete_async_completer(app: App) -> None:
+    async def member_completer(prefix: str) -> list[tuple[str, str]]:
+        await asyncio.sleep(0)
+        return [(f"{prefix}baz", f"{prefix}baz")]
+
+    async with app.run_test() as pilot:
+        ta = app.query_one("#ta", expect_type=TextEditor)
+        ta.member_completer = member_completer
+        ta.focus()
+        ta.text = "foo bar"
+        ta.selection = Selection((0, 7), (0, 7))
+        await pilot.pause()
+
+        await pilot.press("full_stop")
+        await app.workers.wait_for_complete()
+        await pilot.pause()
+        assert ta.completion_list.is_open is True
+        assert ta.completion_list.option_count == 1
+
+        await pilot.press("enter")
+        await pilot.pause()
+        assert ta.text == "foo bar.baz"
+
+
+@pytest.mark.parametrize("is_async", [False, True])
+@pytest.mark.asyncio
+async def test_autocomplete_streaming_completer(app: App, is_async: bool) -> None:
+    words = [f"bar.col_{i}" for i in range(1_234)]
+
+    def member_completer(prefix: str) -> Iterator[tuple[str, str]]:
+        for word in words:
+            yield word, word
+
+    async def async_member_completer(prefix: str) -> AsyncIterator[tuple[str, str]]:
+        for word in words:
+            await asyncio.sleep(0)
+            yield word, word
+
+    async with app.run_test() as pilot:
+        ta = app.query_one("#ta", expect_type=TextEditor)
+        ta.member_completer = async_member_completer if is_async else member_completer
+        ta.focus()
+        ta.text = "foo bar"
+        ta.selection = Selection((0, 7), (0, 7))
+        await pilot.pause()
+
+        await pilot.press("full_stop")
+        await app.workers.wait_for_complete()
+        await pilot.pause()
+        assert ta.completion_list.is_open is True
+        assert ta.completion_list.completion_count == len(words)
+        assert ta.completion_list.option_count == CompletionList.MAX_RENDERED_OPTIONS
+        assert ta.completion_list.highlighted == 0
+
+
+@pytest.mark.asyncio
+async def test_autocomplete_renders_options_lazily(app: App) -> None:
+    words = [f"bar.col_{i:04}" for i in range(1_234)]
+
+    def member_completer(prefix: str) -> list[tuple[str, str]]:
+        return [(w, w) for w in words if w.startswith(prefix)]
+
+    async with app.run_test() as pilot:
+        ta = app.query_one("#ta", expect_type=TextEditor)
+        ta.member_completer = member_completer
+        ta.focus()
+        ta.text = "foo bar"
+        ta.selection = Selection((0, 7), (0, 7))
+        await pilot.pause()
+
+        await pilot.press("full_stop")
+        await app.workers.wait_for_complete()
+        await pilot.pause()
+        cl = ta.completion_list
+        assert cl.completion_count == len(words)
+        assert cl.option_count == CompletionList.MAX_RENDERED_OPTIONS
+
+        # paging toward the end of the options creates more of them
+        for _ in range(CompletionList.MAX_RENDERED_OPTIONS // 5):
+            await pilot.press("pagedown")
+        await pilot.pause()
+        assert cl.option_count > CompletionList.MAX_RENDERED_OPTIONS
+        assert cl.highlighted is not None
+        assert cl.highlighted < cl.option_count - 1
+
+        # narrowing the list reuses the options that still apply
+        await pilot.press(*"col_00")
+        await app.workers.wait_for_complete()
+        await pilot.pause()
+        assert cl.completion_count == 100
+        assert cl.option_count == 100
+        assert cl.highlighted == 0
+        option = cl.get_option_at_index(0)
+        assert isinstance(option, Completion)
+        assert option.value == "bar.col_0000"
+
+        await pilot.press("enter")
+        await pilot.pause()
+        assert ta.text == "foo bar.col_0000"
@@ -1,8 +1,19 @@
+import re
+from pathlib import Path
+
 import pytest
-from textual.app import App
+from textual.app import App, ComposeResult
+from textual.widgets.text_area import Selection
 
-from textual_textarea import TextEditor
+from textual_textarea import (
+    TextAreaFindAllComplete,
+    TextAreaFindAllResult,
+    TextEditor,
+)
 from textual_textarea.find_input import FindInput
+from textual_textarea.find_results import FileFindResults, FindResults
+from textual_textarea.path_input import PathInput
+from textual_textarea.replace_input import ReplaceInput
 
 
 @pytest.mark.asyncio
@@ -142,3 +153,498 @@ async def test_find_with_f3(app: App) -> None:
         await pilot.press("f3")
         assert ta.selection.start == (2, 4)
         assert ta.selection.end == (2, 5)
+
+
+@pytest.mark.asyncio
+async def test_find_label_follows_edits(app: App) -> None:
+    async with app.run_test() as pilot:
+        ta = app.query_one("#ta", expect_type=TextEditor)
+        ta.text = "foo bar\n" * 50
+        await pilot.pause()
+
+        await pilot.press("ctrl+f")
+        await pilot.press("b", "a")
+        assert "Match 1 of 50" in str(ta.footer_label.render())
+        await pilot.press("enter")
+        assert "Match 2 of 50" in str(ta.footer_label.render())
+
+        # edits to the document patch the index of matches
+        assert ta.text_input is not None
+        ta.text_input.insert("bar\nbar bar\n", location=(0, 0))
+        await pilot.pause()
+        assert "Match 5 of 53" in str(ta.footer_label.render())
+        ta.text_input.undo()
+        await pilot.pause()
+        assert "Match 2 of 50" in str(ta.footer_label.render())
+        ta.text_input.redo()
+        await pilot.pause()
+        assert "of 53" in str(ta.footer_label.render())
+        ta.text = "foo"
+        await pilot.pause()
+        assert "No results" in str(ta.footer_label.render())
+
+
+@pytest.mark.asyncio
+async def test_find_in_worker(app: App) -> None:
+    async with app.run_test() as pilot:
+        ta = app.query_one("#ta", expect_type=TextEditor)
+        ta.find_match_limit = 10_000
+        ta.text = "foo bar\n" * 20_000
+        await pilot.pause()
+        await pilot.press("ctrl+f")
+        await pilot.press("b")
+        await pilot.pause(ta.FIND_DEBOUNCE_DELAY)
+        await app.workers.wait_for_complete()
+        await pilot.pause()
+        assert ta.selection.start == (0, 4)
+        assert ta.selection.end == (0, 5)
+        assert "Match 1 of 10,000+" in str(ta.footer_label.render())
+
+        await pilot.press("enter")
+        assert ta.selection.start == (1, 4)
+
+        await pilot.press("q")
+        await pilot.pause(ta.FIND_DEBOUNCE_DELAY)
+        await app.workers.wait_for_complete()
+        await pilot.pause()
+        assert "No results" in str(ta.footer_label.render())
+
+
+@pytest.mark.asyncio
+async def test_find_debounce_and_narrowing(app: App) -> None:
+    async with app.run_test() as pilot:
+        ta = app.query_one("#ta", expect_type=TextEditor)
+        ta.find_match_limit = None
+        ta.text = "foo bar\nfoo baz\n" * 10_000
+        await pilot.pause()
+        await pilot.press("ctrl+f")
+        await pilot.press("b", "a")
+        # the search waits for a pause in typing
+        assert ta.selection.start == ta.selection.end == (0, 0)
+        await pilot.pause(ta.FIND_DEBOUNCE_DELAY)
+        await app.workers.wait_for_complete()
+        await pilot.pause()
+        assert "Match 1 of 20,000" in str(ta.footer_label.render())
+
+        # extending the query narrows the previous matches, without a worker
+        await pilot.press("z")
+        await pilot.pause(ta.FIND_DEBOUNCE_DELAY)
+        assert ta.selection == Selection((1, 4), (1, 7))
+        assert "Match 1 of 10,000" in str(ta.footer_label.render())
+
+        # enter runs a pending search before moving to the next match
+        await pilot.press("backspace", "r", "enter")
+        assert ta.selection == Selection((2, 4), (2, 7))
+
+
+@pytest.mark.asyncio
+async def test_find_regex(app: App) -> None:
+    async with app.run_test() as pilot:
+        ta = app.query_one("#ta", expect_type=TextEditor)
+        ta.text = "foo bar\nfoo baz\n"
+        await pilot.pause()
+        await pilot.press("ctrl+f")
+        find_input = app.query_one(FindInput)
+        await pilot.press("alt+r")
+        assert find_input.regex
+        assert find_input.border_title == "regex"
+
+        await pilot.press("b", "a", "(")
+        assert "Invalid regex" in str(ta.footer_label.render())
+        assert ta.footer_label.has_class("validation-error")
+
+        await pilot.press("backspace", "[", "z", "]")
+        assert ta.selection.start == (1, 4)
+        assert ta.selection.end == (1, 7)
+        assert "1 found" in str(ta.footer_label.render())
+
+        # toggling regex off searches for the literal text
+        await pilot.press("alt+r")
+        assert "No results" in str(ta.footer_label.render())
+
+        # the regex option is remembered when the find input is reopened
+        await pilot.press("alt+r")
+        await pilot.press("escape")
+        await pilot.press("ctrl+f")
+        find_input = app.query_one(FindInput)
+        assert find_input.regex
+
+
+@pytest.mark.asyncio
+async def test_find_case_and_whole_word(app: App) -> None:
+    async with app.run_test() as pilot:
+        ta = app.query_one("#ta", expect_type=TextEditor)
+        ta.text = "foobar\nFoo bar\nfoo\n"
+        await pilot.pause()
+        await pilot.press("ctrl+f")
+        find_input = app.query_one(FindInput)
+        await pilot.press("f", "o", "o")
+        assert ta.selection.start == (0, 0)
+        assert "of 2;" in str(ta.footer_label.render())
+
+        await pilot.press("alt+c")
+        assert not find_input.case_sensitive
+        assert find_input.border_title == "ignore case"
+        assert "of 3;" in str(ta.footer_label.render())
+
+        await pilot.press("alt+w")
+        assert find_input.border_title == "ignore case, whole word"
+        assert ta.selection.start == (1, 0)
+        assert ta.selection.end == (1, 3)
+        assert "of 2;" in str(ta.footer_label.render())
+
+        # edits are reflected in the count
+        ta.text_input.insert("FOO ", location=(0, 0))  # type: ignore[union-attr]
+        await pilot.pause()
+        assert "of 3;" in str(ta.footer_label.render())
+
+        # the options are remembered when the find input is reopened
+        await pilot.press("escape")
+        await pilot.press("ctrl+f")
+        find_input = app.query_one(FindInput)
+        assert not find_input.case_sensitive
+        assert find_input.whole_word
+
+
+@pytest.mark.asyncio
+async def test_find_multiline(app: App) -> None:
+    async with app.run_test() as pilot:
+        ta = app.query_one("#ta", expect_type=TextEditor)
+        ta.text = "foo bar\nbaz\nfoo\nbar\nbaz\n"
+        await pilot.pause()
+        await pilot.press("ctrl+f")
+        await pilot.press("alt+r")
+        for key in "bar\\n":
+            await pilot.press(key if key != "\\" else "backslash")
+        await pilot.press("b")
+        assert ta.selection == Selection((0, 4), (1, 1))
+        assert "Match 1 of 2" in str(ta.footer_label.render())
+
+        await pilot.press("enter")
+        assert ta.selection == Selection((3, 0), (4, 1))
+        assert "Match 2 of 2" in str(ta.footer_label.render())
+        await pilot.press("shift+f3")
+        assert ta.selection == Selection((0, 4), (1, 1))
+
+        # the joined buffer is updated by edits
+        ta.text_input.insert("bar\nbaz", location=(2, 0))  # type: ignore[union-attr]
+        await pilot.pause()
+        assert "of 3" in str(ta.footer_label.render())
+
+        assert ta.replace_all("bar\nbaz", "qux") == 3
+        assert ta.text == "foo qux\nquxfoo\nqux\n"
+
+
+@pytest.mark.asyncio
+async def test_find_in_selection(app: App) -> None:
+    async with app.run_test() as pilot:
+        ta = app.query_one("#ta", expect_type=TextEditor)
+        ta.text = "foo bar\n" * 6
+        await pilot.pause()
+        ta.selection = Selection((2, 0), (4, 0))
+        await pilot.press("ctrl+f")
+        find_input = app.query_one(FindInput)
+        await pilot.press("alt+s")
+        assert find_input.border_title == "in selection"
+        await pilot.press("f", "o", "o")
+        assert ta.selection == Selection((2, 0), (2, 3))
+        assert "Match 1 of 2" in str(ta.footer_label.render())
+        await pilot.press("enter")
+        assert ta.selection == Selection((3, 0), (3, 3))
+        # find wraps around within the selection
+        await pilot.press("enter")
+        assert ta.selection == Selection((2, 0), (2, 3))
+
+        await pilot.press("ctrl+r", "b", "a", "z", "alt+a")
+        await pilot.pause()
+        assert ta.text == "foo bar\n" * 2 + "baz bar\n" * 2 + "foo bar\n" * 2
+
+        # toggling the option off searches the whole document
+        await pilot.press("ctrl+f")
+        assert find_input.has_focus
+        await pilot.press("alt+s")
+        assert find_input.border_title is None
+        assert "of 4;" in str(ta.footer_label.render())
+
+        # with no selection, the option can't be enabled
+        ta.selection = Selection((0, 0), (0, 0))
+        await pilot.press("alt+s")
+        assert not find_input.in_selection
+
+
+@pytest.mark.asyncio
+async def test_find_in_syntax_regions(app: App) -> None:
+    async with app.run_test() as pilot:
+        ta = app.query_one("#ta", expect_type=TextEditor)
+        ta.text = 'foo = "foo"  # foo\nfoo()\n'
+        await pilot.pause()
+        await pilot.press("ctrl+f")
+        find_input = app.query_one(FindInput)
+        await pilot.press("alt+t")
+        assert find_input.border_title == "code only"
+        await pilot.press("f", "o", "o")
+        assert ta.selection == Selection((0, 0), (0, 3))
+        assert "Match 1 of 2" in str(ta.footer_label.render())
+        await pilot.press("enter")
+        assert ta.selection == Selection((1, 0), (1, 3))
+
+        await pilot.press("alt+t")
+        assert find_input.border_title == "comments only"
+        assert ta.selection == Selection((0, 15), (0, 18))
+        assert "1 found" in str(ta.footer_label.render())
+
+        await pilot.press("alt+t")
+        assert find_input.border_title == "strings only"
+        assert ta.selection == Selection((0, 7), (0, 10))
+
+        # the regions are updated after each edit
+        assert ta.text_input is not None
+        ta.text_input.replace('"foo"', (1, 0), (1, 3))
+        await pilot.pause()
+        assert "of 2;" in str(ta.footer_label.render())
+
+        await pilot.press("alt+t")
+        assert find_input.border_title is None
+        assert "of 4" in str(ta.footer_label.render())
+
+        assert ta.replace_all("foo", "bar", syntax="comments") == 1
+        assert ta.text == 'foo = "foo"  # bar\n"foo"()\n'
+
+
+@pytest.mark.asyncio
+async def test_find_results(app: App) -> None:
+    async with app.run_test() as pilot:
+        ta = app.query_one("#ta", expect_type=TextEditor)
+        ta.text = "foo bar\n" * 3000
+        await pilot.pause()
+        await pilot.press("ctrl+f", "b", "a", "r", "alt+l")
+        await pilot.pause()
+        results = app.query_one(FindResults)
+        assert results.has_focus
+        assert results.border_title == "3,000 results"
+        assert results.virtual_size.height == 3000
+        # only the rows in view are rendered
+        assert len(results._strips) <= results.size.height
+        assert results.cursor == 0
+        assert "   1  foo bar" in results.render_line(0).text
+
+        await pilot.press("down", "down", "enter")
+        assert ta.selection == Selection((2, 4), (2, 7))
+        assert "Match 3 of" in str(ta.footer_label.render())
+        await pilot.press("end", "enter")
+        assert ta.selection == Selection((2999, 4), (2999, 7))
+        assert results.scroll_offset.y > 0
+
+        # the results follow find next, and are updated after edits
+        await pilot.press("escape")
+        find_input = app.query_one(FindInput)
+        assert find_input.has_focus
+        await pilot.press("enter")
+        assert results.cursor == 0
+        assert ta.text_input is not None
+        ta.text_input.insert("bar\n", (0, 0))
+        await pilot.pause()
+        assert results.border_title == "3,001 results"
+
+        await pilot.press("alt+l")
+        await pilot.pause()
+        assert not app.query(FindResults)
+
+
+@pytest.mark.asyncio
+async def test_replace(app: App) -> None:
+    async with app.run_test() as pilot:
+        ta = app.query_one("#ta", expect_type=TextEditor)
+        ta.text = "foo bar\nfoo baz\nfoo\n"
+        await pilot.pause()
+        await pilot.press("ctrl+r")
+        find_input = app.query_one(FindInput)
+        replace_input = app.query_one(ReplaceInput)
+        assert find_input.has_focus
+        await pilot.press("f", "o", "o")
+        assert ta.selection == Selection((0, 0), (0, 3))
+
+        await pilot.press("ctrl+r")
+        assert replace_input.has_focus
+        await pilot.press("q", "u", "x", "enter")
+        assert ta.text == "qux bar\nfoo baz\nfoo\n"
+        assert ta.selection == Selection((1, 0), (1, 3))
+
+        await pilot.press("alt+a")
+        await pilot.pause()
+        assert ta.text == "qux bar\nqux baz\nqux\n"
+        assert replace_input.border_title == "replaced 2"
+        assert "No results" in str(ta.footer_label.render())
+
+        # replace all is undone in a single step
+        await pilot.press("escape")
+        await pilot.press("ctrl+z")
+        assert ta.text == "qux bar\nfoo baz\nfoo\n"
+
+        # the replacement is remembered when the input is reopened
+        await pilot.press("ctrl+r")
+        assert app.query_one(ReplaceInput).value == "qux"
+
+
+@pytest.mark.asyncio
+async def test_replace_all(app: App) -> None:
+    async with app.run_test() as pilot:
+        ta = app.query_one("#ta", expect_type=TextEditor)
+        ta.text = "foo bar\n" * 20_000
+        await pilot.pause()
+        assert ta.replace_all("FOO", "baz", case_sensitive=False) == 20_000
+        assert ta.text == "baz bar\n" * 20_000
+        # the document was scanned once, without a worker
+        assert not [worker for worker in app.workers if worker.group == "find"]
+        assert ta.replace_all(r"(\w+) (\w+)", r"\2 \1", regex=True) == 20_000
+        assert ta.get_line(19_999) == "bar baz"
+        assert ta.replace_all("xyz", "abc") == 0
+        await pilot.press("ctrl+z")
+        assert ta.text == "baz bar\n" * 20_000
+
+
+@pytest.mark.asyncio
+async def test_find_highlights_visible_matches(app: App) -> None:
+    async with app.run_test() as pilot:
+        ta = app.query_one("#ta", expect_type=TextEditor)
+        ta.text = "foo bar\n" * 1000
+        await pilot.pause()
+        text_area = ta.text_input
+        assert text_area is not None
+        assert not text_area.get_line(0).spans
+
+        await pilot.press("ctrl+f")
+        await pilot.press("b")
+        highlight_style = text_area.get_component_rich_style("text-area--find-match")
+        assert [(s.start, s.end, s.style) for s in text_area.get_line(1).spans] == [
+            (4, 5, highlight_style)
+        ]
+        # lines far outside the viewport are not searched
+        assert not text_area.get_line(500).spans
+
+        # edits update the highlights
+        text_area.insert("b", location=(1, 0))
+        assert len(text_area.get_line(1).spans) == 2
+
+        text_area.scroll_to(y=490, animate=False)
+        await pilot.pause()
+        assert text_area.get_line(500).spans
+        assert not text_area.get_line(1).spans
+
+        await pilot.press("escape")
+        assert not text_area.get_line(500).spans
+
+
+@pytest.mark.asyncio
+async def test_find_previous(app: App) -> None:
+    async with app.run_test() as pilot:
+        ta = app.query_one("#ta", expect_type=TextEditor)
+        ta.text = "foo bar\n" * 50
+        await pilot.pause()
+        await pilot.press("ctrl+f")
+        await pilot.press("b")
+        assert ta.selection == Selection((0, 4), (0, 5))
+
+        # shift+f3 wraps to the end of the document
+        await pilot.press("shift+f3")
+        assert ta.selection == Selection((49, 4), (49, 5))
+        assert "Match 50 of 50" in str(ta.footer_label.render())
+        await pilot.press("shift+f3")
+        assert ta.selection == Selection((48, 4), (48, 5))
+        await pilot.press("f3")
+        assert ta.selection == Selection((49, 4), (49, 5))
+
+        # shift+f3 also works with focus on the text area
+        assert ta.text_input is not None
+        ta.text_input.focus()
+        await pilot.press("shift+f3")
+        assert ta.selection == Selection((48, 4), (48, 5))
+        assert app.query_one(FindInput).has_focus
+
+
+class ManyEditorsApp(App):
+    def __init__(self) -> None:
+        super().__init__()
+        self.results: list[TextAreaFindAllResult] = []
+        self.completed: list[TextAreaFindAllComplete] = []
+
+    def compose(self) -> ComposeResult:
+        yield TextEditor(id="first", text="foo bar\n" * 3)
+        yield TextEditor(id="second", text="bar\n" * 6_000)
+        yield TextEditor(id="third", text="baz")
+
+    def on_text_area_find_all_result(self, message: TextAreaFindAllResult) -> None:
+        self.results.append(message)
+
+    def on_text_area_find_all_complete(self, message: TextAreaFindAllComplete) -> None:
+        self.completed.append(message)
+
+
+@pytest.mark.asyncio
+async def test_find_in_all_editors() -> None:
+    app = ManyEditorsApp()
+    async with app.run_test() as pilot:
+        first = app.query_one("#first", expect_type=TextEditor)
+        first.find_in_all_editors("bar")
+        await app.workers.wait_for_complete()
+        await pilot.pause()
+        totals = {message.editor.id: message.index.total for message in app.results}
+        assert totals == {"first": 3, "second": 6_000, "third": 0}
+        assert len(app.completed) == 1
+        assert app.completed[0].editor_count == 3
+        (second_result,) = (m for m in app.results if m.editor.id == "second")
+        assert second_result.index.match_at(5_999) == Selection((5_999, 0), (5_999, 3))
+
+        with pytest.raises(re.error):
+            first.find_in_all_editors("ba(", regex=True)
+
+        # the action searches for the last query
+        app.results.clear()
+        first.focus()
+        await pilot.press("ctrl+f", "f", "o", "o", "alt+e")
+        await app.workers.wait_for_complete()
+        await pilot.pause()
+        assert {m.editor.id: m.index.total for m in app.results} == {
+            "first": 3,
+            "second": 0,
+            "third": 0,
+        }
+
+
+@pytest.mark.asyncio
+async def test_find_in_files(app: App, tmp_path: Path) -> None:
+    (tmp_path / "a.txt").write_text("foo\nbar foo\n")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "b.txt").write_text("foo")
+    (tmp_path / "c.bin").write_bytes(b"foo\0")
+    async with app.run_test() as pilot:
+        ta = app.query_one("#ta", expect_type=TextEditor)
+        await pilot.press("ctrl+f", "f", "o", "o", "alt+f")
+        path_input = app.query_one("#textarea__find_in_files_input", PathInput)
+        assert path_input.has_focus
+        assert "'foo'" in path_input.placeholder
+        path_input.value = str(tmp_path)
+        await pilot.press("enter")
+        results = app.query_one(FileFindResults)
+        assert results.has_focus
+        await app.workers.wait_for_complete()
+        await pilot.pause()
+        assert results.result_count == 3
+        assert "3 results in 3 files" in str(ta.footer_label.render())
+        previews = {results.render_line(i).text.strip() for i in range(3)}
+        assert previews == {"a.txt:1  foo", "a.txt:2  bar foo", "sub/b.txt:1  foo"}
+
+        # opening a result opens the file, and selects the match
+        for i in range(3):
+            if results.render_line(i).text.startswith("a.txt:2"):
+                results.move_cursor(i)
+        await pilot.press("enter")
+        await pilot.pause()
+        assert ta.text == "foo\nbar foo\n"
+        assert ta.selection == Selection((1, 4), (1, 7))
+
+        await pilot.press("escape")
+        assert path_input.has_focus
+        await pilot.press("escape")
+        await pilot.pause()
+        assert not app.query(FileFindResults)
@@ -7,6 +7,7 @@ from textual.message import Message
 from textual.widgets import Input
 
 from textual_textarea import TextAreaSaved, TextEditor
+from textual_textarea.path_input import PathInput
 
 
 @pytest.mark.parametrize("filename", ["foo.py", "empty.py"])
@@ -71,6 +72,34 @@ async def test_save(app: App, tmp_path: Path) -> None:
         assert saved_text == TEXT
 
 
+@pytest.mark.asyncio
+async def test_path_is_validated_off_the_event_loop(app: App, tmp_path: Path) -> None:
+    (tmp_path / "foo.txt").touch()
+    messages: List[Message] = []
+    async with app.run_test(message_hook=messages.append) as pilot:
+        ta = app.query_one("#ta", expect_type=TextEditor)
+        await pilot.press("ctrl+o")
+        open_input = ta.query_one(PathInput)
+
+        open_input.value = str(tmp_path)
+        open_input.value = str(tmp_path / "foo.txt")
+        await app.workers.wait_for_complete()
+        await pilot.pause()
+        changed = [msg for msg in messages if isinstance(msg, Input.Changed)]
+        assert changed and all(msg.validation_result is None for msg in changed)
+        assert f"Opening {(tmp_path / 'foo.txt').resolve()}" in str(
+            ta.footer_label.render()
+        )
+        assert open_input.has_class("-valid")
+
+        open_input.value = str(tmp_path / "bar.txt")
+        await app.workers.wait_for_complete()
+        await pilot.pause()
+        assert "does not exist" in str(ta.footer_label.render())
+        assert ta.footer_label.has_class("validation-error")
+        assert open_input.has_class("-invalid")
+
+
 @pytest.mark.asyncio
 async def test_multiple_footer_inputs(app: App) -> None:
     async with app.run_test() as pilot:
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from textual_textarea.completion_cache import (
+    CompletionCache,
+    PartialCompletions,
+    is_async_completer,
+)
+from textual_textarea.document_words import DocumentWords
+from textual_textarea.path_input import path_completer
+from textual_textarea.text_editor import TextEditor
+
+WORDS = ["satisfy", "Season", "second", "select", "self", "set", "space"]
+
+
+def word_completer(prefix: str) -> list[tuple[str, str]]:
+    return [(w, w) for w in WORDS if w.casefold().startswith(prefix.casefold())]
+
+
+def test_narrows_cached_result() -> None:
+    completer = MagicMock(side_effect=word_completer)
+    cache = CompletionCache()
+    assert cache.get(completer, "s") is None
+    cache.put(completer, "s", completer("s"))
+
+    # values that differ from the prefix only in case are kept
+    assert cache.get(completer, "se") == word_completer("se")
+    assert cache.get(completer, "sel") == word_completer("sel")
+    assert cache.get(completer, "sez") == []
+    assert completer.call_count == 1
+
+    # a shorter prefix isn't cached
+    assert cache.get(completer, "") is None
+    # nor is another completer's prefix
+    assert cache.get(MagicMock(), "se") is None
+
+
+def test_exact_narrowing() -> None:
+    cache = CompletionCache()
+    cache.put(word_completer, "S", [("Season", "Season"), ("Set", "Set")])
+    assert cache.get(word_completer, "Se") == [("Season", "Season"), ("Set", "Set")]
+    assert cache.get(word_completer, "SE") == []
+
+
+def test_does_not_narrow_other_completers() -> None:
+    cache = CompletionCache()
+    # these values don't start with the prefix, so a longer prefix could match
+    # items that aren't in this result.
+    cache.put(word_completer, "bar.", [(("baz", "column"), "baz")])
+    assert cache.get(word_completer, "bar.") == [(("baz", "column"), "baz")]
+    assert cache.get(word_completer, "bar.b") is None
+
+
+def test_evicts_least_recently_used() -> None:
+    cache = CompletionCache(maxsize=2)
+    cache.put(word_completer, "a", [])
+    cache.put(word_completer, "b", [])
+    assert cache.get(word_completer, "a") == []
+    cache.put(word_completer, "c", [])
+    assert cache.get(word_completer, "b") is None
+    assert cache.get(word_completer, "a") == []
+    cache.clear()
+    assert cache.get(word_completer, "a") is None
+
+
+def test_partial_completions_are_not_cached() -> None:
+    cache = CompletionCache()
+    cache.put(word_completer, "s", PartialCompletions(word_completer("s")))
+    assert cache.get(word_completer, "s") is None
+    assert cache.get(word_completer, "se") is None
+
+
+def test_does_not_narrow_path_completions(tmp_path: Path) -> None:
+    (tmp_path / "foo").mkdir()
+    (tmp_path / "foo" / "child.txt").touch()
+    (tmp_path / "foobar.txt").touch()
+    cache = CompletionCache()
+    prefix = str(tmp_path / "fo")
+    cache.put(path_completer, prefix, path_completer(prefix))
+    # the prefix now names a directory, so its children are completed.
+    assert cache.get(path_completer, prefix + "o") is None
+    child = str(tmp_path / "foo" / "child.txt")
+    assert path_completer(prefix + "o") == [(child, child)]
+
+
+def test_narrowed_document_words_exclude_the_prefix() -> None:
+    document_words = DocumentWords(["sel select selection", "Sel"])
+
+    def completer(prefix: str) -> list[tuple[str, str]]:
+        return document_words.complete(prefix)
+
+    completer.excludes_prefix = True  # type: ignore[attr-defined]
+    cache = CompletionCache()
+    cache.put(completer, "se", completer("se"))
+    assert cache.get(completer, "sel") == completer("sel")
+    assert ("sel", "sel") not in completer("sel")
+    assert getattr(TextEditor.complete_document_word, "excludes_prefix", False)
+
+
+def test_is_async_completer() -> None:
+    async def async_completer(prefix: str) -> list[tuple[str, str]]:
+        return []
+
+    class AsyncCompleterObject:
+        async def __call__(self, prefix: str) -> list[tuple[str, str]]:
+            return []
+
+    assert is_async_completer(async_completer)
+    assert is_async_completer(AsyncCompleterObject())
+    assert not is_async_completer(word_completer)
+    assert not is_async_completer(MagicMock())
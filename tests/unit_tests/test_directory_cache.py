@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from time import monotonic, sleep
+from unittest.mock import MagicMock
+
+import pytest
+
+from textual_textarea import path_input
+from textual_textarea.completion_cache import PartialCompletions
+from textual_textarea.directory_cache import RACY_MTIME_NS, DirectoryCache
+from textual_textarea.path_input import path_completer
+
+
+@pytest.fixture
+def scandir(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+    mock = MagicMock(side_effect=os.scandir)
+    monkeypatch.setattr(os, "scandir", mock)
+    return mock
+
+
+def set_mtime(path: Path, mtime_ns: int) -> None:
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_listing_is_cached_until_mtime_changes(
+    tmp_path: Path, scandir: MagicMock
+) -> None:
+    (tmp_path / "foo").mkdir()
+    (tmp_path / "foo.txt").touch()
+    (tmp_path / "bar[1].txt").touch()
+    old = os.stat(tmp_path).st_mtime_ns - 2 * RACY_MTIME_NS
+    set_mtime(tmp_path, old)
+
+    cache = DirectoryCache()
+    assert sorted(cache.complete(str(tmp_path), "foo")) == ["foo", "foo.txt"]
+    # glob characters are matched literally
+    assert cache.complete(str(tmp_path), "bar[") == ["bar[1].txt"]
+    assert cache.is_dir(str(tmp_path / "foo"))
+    assert not cache.is_dir(str(tmp_path / "foo.txt"))
+    assert not cache.is_dir(str(tmp_path / "baz"))
+    assert scandir.call_count == 1
+
+    (tmp_path / "foo2").touch()
+    set_mtime(tmp_path, old + 1)
+    assert sorted(cache.complete(str(tmp_path), "foo")) == ["foo", "foo.txt", "foo2"]
+    assert scandir.call_count == 2
+
+    cache.clear()
+    cache.complete(str(tmp_path), "")
+    assert scandir.call_count == 3
+
+
+def test_recently_modified_directory_is_listed_again(
+    tmp_path: Path, scandir: MagicMock
+) -> None:
+    cache = DirectoryCache()
+    assert cache.complete(str(tmp_path), "") == []
+    # a file created within the mtime's resolution may not change it
+    mtime_ns = os.stat(tmp_path).st_mtime_ns
+    (tmp_path / "foo").touch()
+    set_mtime(tmp_path, mtime_ns)
+    assert cache.complete(str(tmp_path), "") == ["foo"]
+    assert scandir.call_count == 2
+
+
+def test_evicts_least_recently_used(tmp_path: Path, scandir: MagicMock) -> None:
+    cache = DirectoryCache(maxsize=1)
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    for name in ("a", "b"):
+        set_mtime(tmp_path / name, 0)
+    cache.listing(str(tmp_path / "a"))
+    cache.listing(str(tmp_path / "b"))
+    cache.listing(str(tmp_path / "b"))
+    assert scandir.call_count == 2
+    cache.listing(str(tmp_path / "a"))
+    assert scandir.call_count == 3
+
+
+def test_missing_directory(tmp_path: Path) -> None:
+    cache = DirectoryCache()
+    with pytest.raises(OSError):
+        cache.complete(str(tmp_path / "missing"), "")
+
+
+def wait_for_complete_listing(cache: DirectoryCache, directory: Path) -> None:
+    deadline = monotonic() + 5
+    while not cache.listing(str(directory)).complete:
+        assert monotonic() < deadline
+        sleep(0.01)
+
+
+@pytest.mark.parametrize(
+    "time_budget,max_entries",
+    [(None, 3), (0, None)],
+)
+def test_listing_over_budget_is_finished_in_background(
+    tmp_path: Path,
+    scandir: MagicMock,
+    time_budget: float | None,
+    max_entries: int | None,
+) -> None:
+    names = [f"file_{i:02}" for i in range(25)]
+    for name in names:
+        (tmp_path / name).touch()
+    set_mtime(tmp_path, 0)
+
+    cache = DirectoryCache(time_budget=time_budget, max_entries=max_entries)
+    listing = cache.listing(str(tmp_path))
+    assert not listing.complete
+    assert 0 < len(listing.names) < len(names)
+
+    wait_for_complete_listing(cache, tmp_path)
+    assert sorted(cache.complete(str(tmp_path), "file_")) == names
+    # the directory was listed once, by the foreground and background together
+    assert scandir.call_count == 1
+
+
+class SlowEntry:
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def is_dir(self) -> bool:
+        # e.g., a stat on a network drive
+        sleep(0.01)
+        return False
+
+
+class SlowEntries:
+    def __init__(self, names: list[str]) -> None:
+        self._entries = iter([SlowEntry(name) for name in names])
+
+    def __iter__(self) -> SlowEntries:
+        return self
+
+    def __next__(self) -> SlowEntry:
+        return next(self._entries)
+
+    def __enter__(self) -> SlowEntries:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        pass
+
+
+def test_classifying_entries_counts_against_budget(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    names = [f"file_{i:03}" for i in range(100)]
+    monkeypatch.setattr(os, "scandir", lambda _: SlowEntries(names))
+    set_mtime(tmp_path, 0)
+
+    cache = DirectoryCache(time_budget=0.05, max_entries=None)
+    start = monotonic()
+    listing = cache.listing(str(tmp_path))
+    assert monotonic() - start < 0.5
+    assert not listing.complete
+
+    wait_for_complete_listing(cache, tmp_path)
+    assert sorted(cache.complete(str(tmp_path), "")) == names
+
+
+def test_path_completer_returns_partial_completions(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    for i in range(10):
+        (tmp_path / f"file_{i}").touch()
+    cache = DirectoryCache(max_entries=2)
+    monkeypatch.setattr(path_input, "DIRECTORY_CACHE", cache)
+
+    matches = path_completer(f"{tmp_path}/")
+    assert isinstance(matches, PartialCompletions)
+    assert len(matches) == 2
+
+    wait_for_complete_listing(cache, tmp_path)
+    matches = path_completer(f"{tmp_path}/file_1")
+    assert not isinstance(matches, PartialCompletions)
+    assert matches == [(str(tmp_path / "file_1"), str(tmp_path / "file_1"))]
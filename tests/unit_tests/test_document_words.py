@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import random
+
+from textual_textarea.document_words import DocumentWords, WordTrie
+from textual_textarea.line_edit import LineEdit
+
+
+def test_word_trie() -> None:
+    trie = WordTrie()
+    for word in ["select", "Self", "SELECT", "set", "space"]:
+        trie.add(word)
+    assert sorted(trie.startswith("sel")) == ["SELECT", "Self", "select"]
+    assert sorted(trie.startswith("S")) == ["SELECT", "Self", "select", "set", "space"]
+    assert trie.startswith("x") == []
+    trie.remove("select")
+    trie.remove("SELECT")
+    trie.remove("missing")
+    assert trie.startswith("sel") == ["Self"]
+    trie.remove("Self")
+    assert trie.startswith("sel") == []
+    assert trie._root.children["s"].children.keys() == {"e", "p"}
+
+
+def test_complete() -> None:
+    words = DocumentWords(["select foo, Foobar", "from foo_bar"])
+    assert words.complete("foo") == [("Foobar", "Foobar"), ("foo_bar", "foo_bar")]
+    assert words.complete("FOO") == [
+        ("Foobar", "Foobar"),
+        ("foo", "foo"),
+        ("foo_bar", "foo_bar"),
+    ]
+    assert words.complete("x") == []
+
+
+def test_patch() -> None:
+    lines = ["select foo", "from bar"]
+    words = DocumentWords(lines)
+    # edits before the document is tokenized update the snapshot
+    lines = ["select foo, baz", "from bar"]
+    words.patch(lines, [LineEdit(0, 0, 0)])
+    assert words.complete("ba") == [("bar", "bar"), ("baz", "baz")]
+
+    lines = ["select foo, baz", "from bar", "where bar = 1"]
+    words.patch(lines, [LineEdit(1, 1, 2)])
+    lines = ["select foo", "where bar = 1"]
+    words.patch(lines, [LineEdit(0, 1, 0)])
+    # bar is still on the last line
+    assert words.complete("ba") == [("bar", "bar")]
+    assert words.complete("fr") == []
+
+    # edits that don't describe the document reset the index
+    lines = ["qux"]
+    words.patch(lines, [LineEdit(0, 0, 0)])
+    assert words.complete("") == [("qux", "qux")]
+
+
+def test_random_patches_match_a_rebuild() -> None:
+    rng = random.Random(0)
+    vocabulary = ["alpha", "beta", "gamma", "Alpha", "delta", "a", "b"]
+
+    def random_line() -> str:
+        return " ".join(rng.choices(vocabulary, k=rng.randint(0, 4)))
+
+    lines = [random_line() for _ in range(50)]
+    words = DocumentWords(lines)
+    words.complete("")
+    for _ in range(200):
+        first = rng.randrange(len(lines))
+        old_last = min(len(lines) - 1, first + rng.randint(0, 3))
+        new_lines = [random_line() for _ in range(rng.randint(1, 4))]
+        lines[first : old_last + 1] = new_lines
+        words.patch(lines, [LineEdit(first, old_last, first + len(new_lines) - 1)])
+        assert words.complete("") == DocumentWords(lines).complete("")
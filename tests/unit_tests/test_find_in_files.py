@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from textual.widgets.text_area import Document
+
+from textual_textarea.find_in_files import (
+    PREVIEW_CONTEXT,
+    FileMatch,
+    find_in_files,
+    iter_files,
+    search_file,
+)
+from textual_textarea.find_index import FindQuery
+
+BAR = FindQuery("bar")
+
+
+@pytest.fixture
+def root(tmp_path: Path) -> Path:
+    (tmp_path / "a.txt").write_text("foo bar\nbaz\nbar bar\n")
+    (tmp_path / "binary.bin").write_bytes(b"bar\0bar")
+    (tmp_path / "latin1.txt").write_bytes("bar café".encode("latin-1"))
+    (tmp_path / "big.txt").write_text("bar\n" * 1000)
+    nested = tmp_path / "one" / "two"
+    nested.mkdir(parents=True)
+    (tmp_path / "one" / "b.txt").write_text("bar")
+    (nested / "c.txt").write_text("bar")
+    return tmp_path
+
+
+def test_iter_files(root: Path) -> None:
+    names = {Path(p).name for p in iter_files(root, max_depth=1, max_file_size=100)}
+    # big.txt is too large, and c.txt is too deep
+    assert names == {"a.txt", "binary.bin", "latin1.txt", "b.txt"}
+    names = {Path(p).name for p in iter_files(root, max_depth=0, max_file_size=100)}
+    assert names == {"a.txt", "binary.bin", "latin1.txt"}
+    assert list(iter_files(root / "missing", max_depth=1, max_file_size=100)) == []
+
+
+def test_search_file(root: Path) -> None:
+    result = search_file(str(root / "a.txt"), BAR, 100, max_matches=None)
+    assert result is not None
+    assert result.matches == (
+        FileMatch(0, 4, 7, "foo bar", 0),
+        FileMatch(2, 0, 3, "bar bar", 0),
+        FileMatch(2, 4, 7, "bar bar", 0),
+    )
+    assert result.is_complete
+    capped = search_file(str(root / "a.txt"), BAR, 100, max_matches=1)
+    assert capped is not None and not capped.is_complete
+
+    # binary, non-utf-8, and oversized files are skipped
+    assert search_file(str(root / "binary.bin"), BAR, 100, None) is None
+    assert search_file(str(root / "latin1.txt"), BAR, 100, None) is None
+    assert search_file(str(root / "big.txt"), BAR, 100, None) is None
+    assert search_file(str(root / "missing.txt"), BAR, 100, None) is None
+
+    # previews of long lines start shortly before the match
+    (root / "long.txt").write_text("x" * 1000 + "bar")
+    result = search_file(str(root / "long.txt"), BAR, 10_000, None)
+    assert result is not None
+    (match,) = result.matches
+    assert match.preview_column == 1000 - PREVIEW_CONTEXT
+    assert match.preview[match.start - match.preview_column :] == "bar"
+
+    multiline = search_file(str(root / "a.txt"), FindQuery("baz\nbar"), 100, None)
+    assert multiline is not None
+    assert multiline.matches == (FileMatch(1, 0, 3, "baz", 0),)
+
+
+def test_search_file_splits_lines_like_the_editor(tmp_path: Path) -> None:
+    # a line separator and a form feed, which str.splitlines() splits on, and
+    # Windows and old Mac line endings
+    text = "foo\u2028bar\x0cbar\r\nbaz\rbar\n"
+    (tmp_path / "separators.txt").write_bytes(text.encode("utf-8"))
+    result = search_file(str(tmp_path / "separators.txt"), BAR, 100, None)
+    assert result is not None
+    lines = Document(text).lines
+    assert len(result.matches) == 3
+    for match in result.matches:
+        assert lines[match.row][match.start : match.end] == "bar"
+
+
+def test_find_in_files(root: Path) -> None:
+    batches = list(
+        find_in_files(
+            root,
+            BAR,
+            max_depth=2,
+            max_file_size=100,
+            max_matches_per_file=None,
+            max_workers=2,
+        )
+    )
+    assert sum(searched for searched, _ in batches) == 5
+    results = {
+        Path(result.path).name: len(result.matches)
+        for _, batch in batches
+        for result in batch
+    }
+    assert results == {"a.txt": 3, "b.txt": 1, "c.txt": 1}
+
+    cancelled = find_in_files(
+        root,
+        BAR,
+        max_depth=2,
+        max_file_size=100,
+        max_matches_per_file=None,
+        max_workers=2,
+        is_cancelled=lambda: True,
+    )
+    assert list(cancelled) == []
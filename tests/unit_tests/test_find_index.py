@@ -0,0 +1,677 @@
+from __future__ import annotations
+
+import re
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from textual.widgets.text_area import Selection
+
+from textual_textarea.find_all import FindJob, build_concurrently
+from textual_textarea.find_index import (
+    LINE_END,
+    FindIndex,
+    FindQuery,
+    FoldedLines,
+    LineMatcher,
+    MultilineFindIndex,
+    Replacement,
+    Scope,
+    compile_pattern,
+)
+from textual_textarea.joined_buffer import JoinedBuffer
+from textual_textarea.line_edit import LineEdit, coalesce_line_edits, merge_line_edits
+from textual_textarea.syntax_regions import SyntaxRegions
+
+BAR = FindQuery("bar")
+
+
+@pytest.fixture
+def lines() -> list[str]:
+    return ["foo bar", "", "bar bar baz", "foo", "qux bar"]
+
+
+def test_build(lines: list[str]) -> None:
+    index = FindIndex(BAR)
+    index.build(lines)
+    assert index.total == 4
+    assert index.matches_on_line(0) == ((4, 7),)
+    assert index.matches_on_line(1) == ()
+    assert index.matches_on_line(2) == ((0, 3), (4, 7))
+    assert index.matches_on_line(99) == ()
+
+
+@pytest.mark.parametrize(
+    "location,expected",
+    [
+        ((0, 0), Selection((0, 4), (0, 7))),
+        ((0, 4), Selection((0, 4), (0, 7))),
+        ((0, 5), Selection((2, 0), (2, 3))),
+        ((2, 1), Selection((2, 4), (2, 7))),
+        ((4, 5), Selection((0, 4), (0, 7))),
+    ],
+)
+def test_next_match(
+    lines: list[str], location: tuple[int, int], expected: Selection
+) -> None:
+    index = FindIndex(BAR)
+    index.build(lines)
+    assert index.next_match(location, lines) == expected
+
+
+@pytest.mark.parametrize(
+    "location,expected",
+    [
+        ((0, 0), Selection((4, 4), (4, 7))),
+        ((0, 5), Selection((0, 4), (0, 7))),
+        ((2, 4), Selection((2, 0), (2, 3))),
+        ((3, 0), Selection((2, 4), (2, 7))),
+        ((99, 0), Selection((4, 4), (4, 7))),
+    ],
+)
+def test_previous_match(
+    lines: list[str], location: tuple[int, int], expected: Selection
+) -> None:
+    index = FindIndex(BAR)
+    index.build(lines)
+    assert index.previous_match(location, lines) == expected
+
+
+def test_no_matches(lines: list[str]) -> None:
+    index = FindIndex(FindQuery("xyz"))
+    index.build(lines)
+    assert index.next_match((2, 2), lines) is None
+    assert index.previous_match((2, 2), lines) is None
+
+
+def test_match_number(lines: list[str]) -> None:
+    index = FindIndex(BAR)
+    index.build(lines)
+    assert index.match_number(Selection((0, 4), (0, 7))) == 1
+    assert index.match_number(Selection((2, 4), (2, 7))) == 3
+    assert index.match_number(Selection((4, 7), (4, 4))) == 4
+    assert index.match_number(Selection((4, 4), (4, 6))) is None
+    assert index.match_number(Selection((3, 0), (3, 0))) is None
+    assert index.match_at(0) == Selection((0, 4), (0, 7))
+    assert index.match_at(3) == Selection((4, 4), (4, 7))
+
+
+PATCH_CASES = [
+    # edit within a single line
+    (
+        ["foo bar", "", "bar baz", "foo", "qux bar"],
+        [LineEdit(2, 2, 2)],
+    ),
+    # insert lines
+    (
+        ["foo bar", "bar", "bar", "", "bar bar baz", "foo", "qux bar"],
+        [LineEdit(0, 0, 2)],
+    ),
+    # delete lines
+    (
+        ["foo bar", "qux bar"],
+        [LineEdit(0, 3, 0), LineEdit(0, 0, 0)],
+    ),
+    # many edits, each in the coordinates of the previous document
+    (
+        ["bar", "foo bar", "", "bar bar baz", "foo bar", "qux bar", "bar"],
+        [LineEdit(0, 0, 1), LineEdit(4, 4, 4), LineEdit(5, 5, 6)],
+    ),
+]
+
+
+@pytest.mark.parametrize("new_lines,edits", PATCH_CASES)
+def test_patch(lines: list[str], new_lines: list[str], edits: list[LineEdit]) -> None:
+    index = FindIndex(BAR)
+    index.build(lines)
+    index.patch(new_lines, edits)
+    expected = FindIndex(BAR)
+    expected.build(new_lines)
+    assert index.total == expected.total
+    assert [index.matches_on_line(i) for i in range(len(new_lines))] == [
+        expected.matches_on_line(i) for i in range(len(new_lines))
+    ]
+
+
+def test_max_matches(lines: list[str]) -> None:
+    index = FindIndex(BAR, max_matches=2)
+    index.build(lines)
+    assert index.total == 3
+    assert index.scanned_rows == 3
+    assert not index.is_complete
+    assert index.match_number(Selection((2, 0), (2, 3))) == 2
+    assert index.match_number(Selection((4, 4), (4, 7))) is None
+    # unindexed lines are still searched by next_match and previous_match
+    assert index.next_match((2, 5), lines) == Selection((4, 4), (4, 7))
+    assert index.next_match((4, 5), lines) == Selection((0, 4), (0, 7))
+    assert index.previous_match((4, 5), lines) == Selection((4, 4), (4, 7))
+    assert index.previous_match((0, 2), lines) == Selection((4, 4), (4, 7))
+    assert index.previous_match((2, 2), lines) == Selection((2, 0), (2, 3))
+
+    # edits after the scanned lines leave the index alone
+    index.patch(lines, [LineEdit(4, 4, 4)])
+    assert index.total == 3
+    assert index.scanned_rows == 3
+    # edits before shift the scanned lines
+    new_lines = ["bar", *lines]
+    index.patch(new_lines, [LineEdit(0, 0, 1)])
+    assert index.total == 4
+    assert index.scanned_rows == 4
+
+    complete = FindIndex(BAR, max_matches=100)
+    complete.build(lines)
+    assert complete.is_complete
+
+
+def test_max_matches_wraps_to_unscanned_lines() -> None:
+    lines = ["bar", "foo", "baz bar", "foo", "foo"]
+    index = FindIndex(BAR, max_matches=1, span_filter=lambda row, spans: spans)
+    index.build(lines)
+    assert index.scanned_rows == 1
+    # the only indexed match is filtered out, so every match is on a line
+    # that was not scanned, before (or on) the cursor's row
+    index.refilter(lambda row, spans: () if row == 0 else spans)
+    assert index.total == 0
+    assert not index.is_complete
+    assert index.next_match((4, 0), lines) == Selection((2, 4), (2, 7))
+    assert index.next_match((2, 5), lines) == Selection((2, 4), (2, 7))
+    assert index.previous_match((2, 4), lines) == Selection((2, 4), (2, 7))
+    assert index.previous_match((1, 0), lines) == Selection((2, 4), (2, 7))
+
+
+def test_max_matches_rescans_after_edit() -> None:
+    index = FindIndex(FindQuery("foo"), max_matches=5)
+    index.build(["foo"] * 20)
+    assert index.total == 5
+    # replacing the scanned lines (and more) scans the new ones, up to the cap
+    new_lines = ["x foo"] * 30
+    index.patch(new_lines, [LineEdit(0, 19, 29)])
+    assert index.total == 5
+    assert index.scanned_rows == 5
+    assert not index.is_complete
+    assert index.match_number(Selection((4, 2), (4, 5))) == 5
+    # and an edit that removes matches from the scanned lines finds more
+    new_lines = ["x", "x", *new_lines[2:]]
+    index.patch(new_lines, [LineEdit(0, 1, 1)])
+    assert index.total == 5
+    assert index.scanned_rows == 7
+    index.patch(new_lines[:3], [LineEdit(3, 29, 2)])
+    assert index.total == 1
+    assert index.is_complete
+
+
+def test_build_cancelled(lines: list[str]) -> None:
+    index = FindIndex(BAR)
+    assert index.build(lines, is_cancelled=lambda: True) is False
+    assert index.total == 0
+
+
+@pytest.mark.parametrize(
+    "pattern,expected_total,expected_first",
+    [
+        (r"ba\w", 5, ((4, 7),)),
+        (r"b.r$", 2, ((4, 7),)),
+        (r"^foo", 2, ((0, 3),)),
+        # empty matches are skipped
+        (r"x*", 1, ()),
+        # invalid patterns match nothing
+        (r"ba(", 0, ()),
+    ],
+)
+def test_regex(
+    lines: list[str],
+    pattern: str,
+    expected_total: int,
+    expected_first: tuple[tuple[int, int], ...],
+) -> None:
+    index = FindIndex(FindQuery(pattern, regex=True))
+    index.build(lines)
+    assert index.total == expected_total
+    assert index.matches_on_line(0) == expected_first
+
+
+def test_regex_error() -> None:
+    assert FindQuery("ba(").error is None
+    assert FindQuery("ba(", regex=True).error is not None
+    assert FindQuery("ba[r]", regex=True).error is None
+    compile_pattern.cache_clear()
+    first = compile_pattern("ba(")
+    assert compile_pattern("ba(") is first
+    assert compile_pattern.cache_info().hits == 1
+
+
+def test_merge_line_edits() -> None:
+    assert merge_line_edits([]) == []
+    assert merge_line_edits([LineEdit(3, 3, 5)]) == [(3, 5)]
+    assert merge_line_edits([LineEdit(3, 3, 5), LineEdit(0, 0, 1)]) == [
+        (0, 1),
+        (4, 6),
+    ]
+    assert merge_line_edits([LineEdit(3, 3, 5), LineEdit(4, 8, 4)]) == [(3, 4)]
+
+
+@pytest.mark.parametrize(
+    "query,line,expected",
+    [
+        (
+            FindQuery("bar", case_sensitive=False),
+            "Bar BAR bar",
+            ((0, 3), (4, 7), (8, 11)),
+        ),
+        (FindQuery("bar", whole_word=True), "bar bars foobar bar", ((0, 3), (16, 19))),
+        (FindQuery("bar", whole_word=True), "barbar bar", ((7, 10),)),
+        (FindQuery("ba.", regex=True, whole_word=True), "bar baz_ bax1", ((0, 3),)),
+        (
+            FindQuery("BAR", case_sensitive=False, whole_word=True),
+            "bar.Bar xbar",
+            ((0, 3), (4, 7)),
+        ),
+        # casefolding changes the length of this line, so columns come from
+        # the original line
+        (FindQuery("bar", case_sensitive=False), "Straße BAR", ((7, 10),)),
+    ],
+)
+def test_line_matcher_options(
+    query: FindQuery, line: str, expected: tuple[tuple[int, int], ...]
+) -> None:
+    assert LineMatcher(query)(line) == expected
+
+
+def test_folded_lines(lines: list[str]) -> None:
+    query = FindQuery("BAR", case_sensitive=False)
+    folded_lines = FoldedLines(len(lines))
+    index = FindIndex(query, folded_lines=folded_lines)
+    index.build(lines)
+    assert index.total == 4
+    assert folded_lines.get(2, "ignored") == "bar bar baz"
+
+    new_lines = ["BAR", *lines[:2], "Bar", *lines[3:]]
+    edits = [LineEdit(0, 0, 1), LineEdit(3, 3, 3)]
+    folded_lines.patch(edits)
+    assert len(folded_lines) == len(new_lines)
+    assert folded_lines.get(3, new_lines[3]) == "bar"
+    index.patch(new_lines, edits)
+    assert index.total == 4
+    assert index.matches_on_line(0) == ((0, 3),)
+    assert index.matches_on_line(3) == ((0, 3),)
+
+    # case-sensitive queries don't need folded lines
+    assert FindIndex(BAR, folded_lines=folded_lines).folded_lines is None
+
+
+def test_replace_all(lines: list[str]) -> None:
+    index = FindIndex(BAR)
+    index.build(lines)
+    assert index.replace_all(lines, "x") == Replacement(
+        start=(0, 0), end=(4, 7), text="foo x\n\nx x baz\nfoo\nqux x", replaced=4
+    )
+    # matches in lines that have not been indexed are also replaced
+    capped = FindIndex(BAR, max_matches=1)
+    capped.build(lines)
+    assert capped.replace_all(lines, "x") == index.replace_all(lines, "x")
+
+    assert FindIndex(FindQuery("foo")).replace_all(lines, "f", newline="\r\n") == (
+        Replacement(
+            start=(0, 0), end=(3, 3), text="f bar\r\n\r\nbar bar baz\r\nf", replaced=2
+        )
+    )
+    assert FindIndex(FindQuery("xyz")).replace_all(lines, "x") is None
+
+    regex = FindIndex(FindQuery(r"(\w+) (ba\w)$", regex=True))
+    regex.build(lines)
+    replacement = regex.replace_all(lines, r"\2 \1")
+    assert replacement is not None
+    assert replacement.text == "bar foo\n\nbar baz bar\nfoo\nbar qux"
+    with pytest.raises(re.error):
+        regex.replace_all(lines, r"\3")
+
+
+def test_coalesce_line_edits() -> None:
+    assert coalesce_line_edits([]) == []
+    assert coalesce_line_edits([LineEdit(0, 3, 0), LineEdit(0, 0, 0)]) == [
+        LineEdit(0, 3, 0)
+    ]
+    assert coalesce_line_edits([LineEdit(3, 3, 5), LineEdit(0, 0, 1)]) == [
+        LineEdit(0, 0, 1),
+        LineEdit(4, 4, 6),
+    ]
+    assert coalesce_line_edits([LineEdit(3, 3, 5), LineEdit(4, 8, 4)]) == [
+        LineEdit(3, 6, 4)
+    ]
+
+
+@pytest.mark.parametrize("new_lines,edits", PATCH_CASES)
+def test_joined_buffer(
+    lines: list[str], new_lines: list[str], edits: list[LineEdit]
+) -> None:
+    buffer = JoinedBuffer(lines)
+    assert buffer.text == "\n".join(lines)
+    assert buffer.location(0) == (0, 0)
+    assert buffer.location(9) == (2, 0)
+    assert buffer.offset((2, 4)) == 13
+    assert buffer.offset((0, 99)) == 7
+    assert buffer.offset((99, 0)) == len(buffer.text)
+
+    copy = buffer.copy()
+    buffer.patch(edits)
+    # edits are applied lazily
+    assert buffer.text == "\n".join(lines)
+    change = buffer.sync(new_lines)
+    assert buffer.text == "\n".join(new_lines)
+    assert change is not None
+    # only the text between the start and end of the change was replaced
+    old_text, new_text = "\n".join(lines), buffer.text
+    assert old_text[: change.start] == new_text[: change.start]
+    assert old_text[change.old_end :] == new_text[change.new_end :]
+    expected = JoinedBuffer(new_lines)
+    for row, start in enumerate(expected.line_starts):
+        assert buffer.location(start) == (row, 0)
+        assert buffer.offset((row, 1)) == expected.offset((row, 1))
+    assert buffer.line_starts == expected.line_starts
+    assert buffer.sync(new_lines) is None
+    assert copy.text == "\n".join(lines)
+    assert copy.line_starts == JoinedBuffer(lines).line_starts
+
+
+@pytest.fixture
+def multiline_index(lines: list[str]) -> MultilineFindIndex:
+    index = MultilineFindIndex(FindQuery("bar\n"))
+    index.build(lines)
+    return index
+
+
+def test_multiline_find(lines: list[str], multiline_index: MultilineFindIndex) -> None:
+    index = multiline_index
+    assert index.total == 1
+    assert index.next_match((0, 0), lines) == Selection((0, 4), (1, 0))
+    assert index.next_match((0, 5), lines) == Selection((0, 4), (1, 0))
+    assert index.previous_match((0, 4), lines) == Selection((0, 4), (1, 0))
+    assert index.match_number(Selection((1, 0), (0, 4))) == 1
+    assert index.match_number(Selection((0, 4), (0, 7))) is None
+    assert index.match_at(0) == Selection((0, 4), (1, 0))
+
+    regex = MultilineFindIndex(FindQuery(r"\w\n^\w", regex=True))
+    regex.build(lines)
+    assert regex.total == 2
+    assert regex.next_match((0, 0), lines) == Selection((2, 10), (3, 1))
+    assert regex.previous_match((3, 2), lines) == Selection((2, 10), (3, 1))
+    assert regex.previous_match((3, 3), lines) == Selection((3, 2), (4, 1))
+
+    whole_word = MultilineFindIndex(FindQuery("a\nf", whole_word=True))
+    whole_word.build(["a", "f", "ba", "f"])
+    assert whole_word.total == 1
+
+    capped = MultilineFindIndex(FindQuery(r"\n", regex=True), max_matches=2)
+    capped.build(lines)
+    assert capped.total == 2
+    assert not capped.is_complete
+    assert capped.next_match((3, 0), lines) == Selection((3, 3), (4, 0))
+    assert capped.previous_match((4, 0), lines) == Selection((3, 3), (4, 0))
+    assert capped.previous_match((3, 0), lines) == Selection((2, 11), (3, 0))
+
+
+def test_multiline_patch(lines: list[str], multiline_index: MultilineFindIndex) -> None:
+    index = multiline_index
+    assert index.buffer is not None
+    new_lines = ["foo bar", "", "bar bar", "qux bar", ""]
+    edits = [LineEdit(2, 3, 2), LineEdit(4, 4, 5)]
+    index.buffer.patch(edits)
+    index.patch(new_lines, edits)
+    assert index.total == 3
+    assert index.next_match((1, 0), new_lines) == Selection((2, 4), (3, 0))
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        FindQuery("bar\n"),
+        FindQuery(r"\w\n^\w", regex=True),
+        FindQuery("r\nb", whole_word=True),
+        # matches of any width are scanned again in full
+        FindQuery(r"\w+\n", regex=True),
+    ],
+)
+@pytest.mark.parametrize("max_matches", [None, 1])
+@pytest.mark.parametrize("new_lines,edits", PATCH_CASES)
+def test_multiline_patch_rescans_changed_text(
+    lines: list[str],
+    new_lines: list[str],
+    edits: list[LineEdit],
+    query: FindQuery,
+    max_matches: int | None,
+) -> None:
+    index = MultilineFindIndex(query, max_matches=max_matches)
+    index.build(lines)
+    assert index.buffer is not None
+    index.buffer.patch(edits)
+    index.patch(new_lines, edits)
+    expected = MultilineFindIndex(query, max_matches=max_matches)
+    expected.build(new_lines)
+    assert index.total == expected.total
+    assert index.is_complete == expected.is_complete
+    assert [index.match_at(i) for i in range(index.total)] == [
+        expected.match_at(i) for i in range(expected.total)
+    ]
+
+
+def test_multiline_replace_all(
+    lines: list[str], multiline_index: MultilineFindIndex
+) -> None:
+    assert multiline_index.replace_all(lines, "x") == Replacement(
+        start=(0, 4), end=(1, 0), text="x", replaced=1
+    )
+    regex = MultilineFindIndex(FindQuery(r"(\w+)\n(\w+)", regex=True))
+    assert regex.replace_all(lines, r"\2\n\1") == Replacement(
+        start=(2, 8), end=(3, 3), text="foo\nbaz", replaced=1
+    )
+    assert MultilineFindIndex(FindQuery("xyz\n")).replace_all(lines, "") is None
+
+
+@pytest.mark.parametrize(
+    "query,previous,expected",
+    [
+        (FindQuery("bar"), FindQuery("ba"), True),
+        (FindQuery("ba"), FindQuery("bar"), False),
+        (FindQuery("bar", whole_word=True), FindQuery("ba"), True),
+        (FindQuery("bar"), FindQuery("ba", whole_word=True), False),
+        (FindQuery("bar", case_sensitive=False), FindQuery("ba"), False),
+        (FindQuery("bar"), FindQuery("ba", case_sensitive=False), True),
+        (FindQuery("ba|r", regex=True), FindQuery("ba", regex=True), False),
+        (FindQuery("ba\n"), FindQuery("ba"), False),
+    ],
+)
+def test_extends(query: FindQuery, previous: FindQuery, expected: bool) -> None:
+    assert query.extends(previous) is expected
+
+
+@pytest.mark.parametrize(
+    "query,max_matches",
+    [
+        (FindQuery("bar"), None),
+        (FindQuery("bar "), None),
+        (FindQuery("bar"), 100),
+        (FindQuery("bar", whole_word=True), None),
+    ],
+)
+def test_narrow(lines: list[str], query: FindQuery, max_matches: int | None) -> None:
+    previous = FindIndex(FindQuery("ba"), max_matches=max_matches)
+    previous.build(lines)
+    narrowed = previous.narrow(query, lines)
+    expected = FindIndex(query, max_matches=max_matches)
+    expected.build(lines)
+    assert narrowed.total == expected.total
+    assert narrowed.scanned_rows == expected.scanned_rows
+    assert [narrowed.matches_on_line(i) for i in range(len(lines))] == [
+        expected.matches_on_line(i) for i in range(len(lines))
+    ]
+
+
+def test_scope_clip() -> None:
+    scope = Scope((1, 4), (3, 3))
+    spans = ((0, 3), (4, 7))
+    assert scope.clip(0, spans) == ()
+    assert scope.clip(1, spans) == ((4, 7),)
+    assert scope.clip(2, spans) == spans
+    assert scope.clip(3, spans) == ((0, 3),)
+    assert scope.clip(4, spans) == ()
+
+
+@pytest.mark.parametrize(
+    "edits,expected",
+    [
+        ([LineEdit(0, 0, 2)], Scope((3, 4), (5, 3))),
+        ([LineEdit(5, 6, 5)], Scope((1, 4), (3, 3))),
+        ([LineEdit(2, 2, 4)], Scope((1, 4), (5, 3))),
+        ([LineEdit(3, 3, 3)], Scope((1, 4), (3, LINE_END))),
+        ([LineEdit(0, 1, 0)], Scope((0, 0), (2, 3))),
+        ([LineEdit(2, 4, 2)], Scope((1, 4), (2, LINE_END))),
+    ],
+)
+def test_scope_patch(edits: list[LineEdit], expected: Scope) -> None:
+    assert Scope((1, 4), (3, 3)).patch(edits) == expected
+
+
+def test_find_in_scope(lines: list[str]) -> None:
+    scope = Scope((0, 5), (2, 6))
+    index = FindIndex(BAR, scope=scope)
+    index.build(lines)
+    assert index.total == 1
+    assert index.is_complete
+    assert index.next_match((0, 0), lines) == Selection((2, 0), (2, 3))
+    assert index.next_match((2, 1), lines) == Selection((2, 0), (2, 3))
+    assert index.previous_match((0, 0), lines) == Selection((2, 0), (2, 3))
+
+    # edits inside the scope grow it
+    new_lines = [*lines[:1], "bar", *lines[1:]]
+    index.patch(new_lines, [LineEdit(1, 1, 2)])
+    assert index.scope == Scope((0, 5), (3, 6))
+    assert index.total == 2
+    replacement = index.replace_all(new_lines, "x")
+    assert replacement is not None
+    assert replacement.replaced == 2
+    assert replacement.text == "x\n\nx bar baz"
+
+    multiline = MultilineFindIndex(FindQuery("bar\n"), scope=Scope((0, 0), (2, 3)))
+    multiline.build(lines)
+    assert multiline.total == 1
+    multiline = MultilineFindIndex(FindQuery("bar\n"), scope=Scope((0, 5), (2, 3)))
+    multiline.build(lines)
+    assert multiline.total == 0
+
+
+def _node(start: tuple[int, int], end: tuple[int, int]) -> SimpleNamespace:
+    return SimpleNamespace(start_point=start, end_point=end)
+
+
+def test_syntax_regions() -> None:
+    lines = ['x = "bar"  # bar', '"""bar', 'bar"""', "bar", 'é = "bar"']
+    captures: dict[str, list[Any]] = {
+        "string": [
+            _node((0, 4), (0, 9)),
+            _node((1, 0), (2, 6)),
+            _node((4, 5), (4, 10)),
+        ],
+        "string.escape": [_node((0, 5), (0, 6))],
+        "comment": [_node((0, 11), (0, 16))],
+        "keyword": [_node((3, 0), (3, 3))],
+    }
+    regions = SyntaxRegions.from_captures(captures, lines)
+    # byte columns are converted to character columns
+    assert regions.strings == {
+        0: [(4, 9)],
+        1: [(0, LINE_END)],
+        2: [(0, 6)],
+        4: [(4, 9)],
+    }
+    assert regions.comments == {0: [(11, 16)]}
+    assert regions.span_filter("any") is None
+
+    spans = ((5, 8), (13, 16), (8, 12))
+    comments = regions.span_filter("comments")
+    strings = regions.span_filter("strings")
+    code = regions.span_filter("code")
+    assert comments is not None and strings is not None and code is not None
+    assert comments(0, spans) == ((13, 16),)
+    assert strings(0, spans) == ((5, 8),)
+    # matches that overlap a string or comment are not code
+    assert code(0, ((0, 1), *spans)) == ((0, 1),)
+    assert strings(2, ((0, 3),)) == ((0, 3),)
+    assert code(3, ((0, 3),)) == ((0, 3),)
+    assert comments(3, ((0, 3),)) == ()
+
+
+def test_syntax_regions_patch_and_update() -> None:
+    lines = ["# bar", '"""bar', 'bar"""', "bar", "# bar"]
+    captures: dict[str, list[Any]] = {
+        "comment": [_node((0, 0), (0, 5)), _node((4, 0), (4, 5))],
+        "string": [_node((1, 0), (2, 6))],
+    }
+    regions = SyntaxRegions.from_captures(captures, lines)
+
+    # a line is inserted after the first line, and the (new) third is edited
+    new_lines = ["# bar", "bar", 'x"""bar', 'bar"""', "bar", "# bar"]
+    regions.patch([LineEdit(0, 0, 1), LineEdit(2, 2, 2)])
+    assert regions.comments == {5: [(0, 5)]}
+    assert regions.strings == {3: [(0, 6)]}
+
+    # the query of the touched rows may capture nodes that extend beyond them
+    captures = {
+        "comment": [_node((0, 0), (0, 5))],
+        "string": [_node((2, 1), (3, 6))],
+        "keyword": [_node((1, 0), (1, 3))],
+    }
+    regions.update(captures, new_lines, range(0, 3))
+    assert regions.comments == {0: [(0, 5)], 5: [(0, 5)]}
+    assert regions.strings == {2: [(1, LINE_END)], 3: [(0, 6)]}
+    code = regions.span_filter("code")
+    assert code is not None
+    assert code(1, ((0, 3),)) == ((0, 3),)
+    assert code(2, ((4, 7),)) == ()
+
+
+def test_refilter(lines: list[str]) -> None:
+    in_strings = SyntaxRegions(strings={2: [(0, 5)], 4: [(0, 7)]}).span_filter(
+        "strings"
+    )
+    assert in_strings is not None
+    index = FindIndex(BAR, span_filter=in_strings)
+    index.build(lines)
+    assert index.total == 2
+    assert index.matches_on_line(2) == ((0, 3),)
+    assert index.next_match((0, 0), lines) == Selection((2, 0), (2, 3))
+
+    # edits rescan the candidates on the edited lines only; a new filter
+    # is applied to every candidate, without rescanning.
+    new_lines = ["bar bar", *lines[1:]]
+    index.patch(new_lines, [LineEdit(0, 0, 0)])
+    in_first_line = SyntaxRegions(strings={0: [(0, LINE_END)]}).span_filter("strings")
+    assert in_first_line is not None
+    index.refilter(in_first_line)
+    assert index.total == 2
+    assert index.matches_on_line(0) == ((0, 3), (4, 7))
+    assert index.matches_on_line(4) == ()
+    replacement = index.replace_all(new_lines, "x")
+    assert replacement is not None
+    assert replacement.text == "x x"
+
+    capped = FindIndex(BAR, max_matches=1, span_filter=in_strings)
+    capped.build(lines)
+    assert capped.total == 1
+    assert capped.scanned_rows == 3
+    # matches after the scanned lines are still filtered
+    assert capped.next_match((2, 1), lines) == Selection((4, 4), (4, 7))
+    assert capped.previous_match((0, 0), lines) == Selection((4, 4), (4, 7))
+
+
+def test_build_concurrently(lines: list[str]) -> None:
+    jobs = [
+        FindJob(tuple(lines), FindIndex(BAR)),
+        FindJob(("bar",) * 10_000, FindIndex(BAR)),
+        FindJob(tuple(lines), MultilineFindIndex(FindQuery("bar\n"))),
+    ]
+    assert sorted(build_concurrently(jobs, max_workers=2)) == [0, 1, 2]
+    assert [job.find_index.total for job in jobs] == [4, 10_000, 1]
+
+    cancelled = [FindJob(tuple(lines), FindIndex(BAR))]
+    assert list(build_concurrently(cancelled, 2, is_cancelled=lambda: True)) == []
+    assert list(build_concurrently([], max_workers=2)) == []
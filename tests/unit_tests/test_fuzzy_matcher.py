@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import random
+import re
+
+import pytest
+
+from textual_textarea.completion_cache import CompletionCache
+from textual_textarea.fuzzy_matcher import BOUNDARY, WORD_START_PROG, FuzzyMatcher
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        ("getUserName", "get|User|Name"),
+        ("get_user_name", "get_|user_|name"),
+        ("HTTPServer", "HTTP|Server"),
+        ("item2Count", "item|2|Count"),
+        ("foo.bar-baz", "foo.|bar-|baz"),
+        ("_private", "_|private"),
+        ("", ""),
+    ],
+)
+def test_word_starts(value: str, expected: str) -> None:
+    assert (
+        WORD_START_PROG.sub(BOUNDARY, value).lstrip(BOUNDARY).replace(BOUNDARY, "|")
+        == expected
+    )
+
+
+def test_match_and_rank() -> None:
+    matcher = FuzzyMatcher(
+        [
+            "get_user_name",
+            "UserName",
+            "setUser",
+            "username",
+            "userName",
+            "Users",
+            "resume",
+            "u_s_e",
+            "guess",
+        ]
+    )
+    assert [value for _, value in matcher("user")] == [
+        # prefix
+        "username",
+        "userName",
+        # prefix, ignoring case
+        "UserName",
+        "Users",
+        # at the start of a word
+        "get_user_name",
+        "setUser",
+    ]
+    assert [value for _, value in matcher("use")] == [
+        "username",
+        "userName",
+        "UserName",
+        "Users",
+        # acronym
+        "u_s_e",
+        "get_user_name",
+        "setUser",
+    ]
+    # the first character must start a word
+    assert [value for _, value in matcher("gun")] == ["get_user_name"]
+    assert matcher("sume") == []
+    assert matcher("xyz") == []
+    assert len(matcher("")) == len(matcher)
+
+
+def test_query_at_a_word_start_may_span_words() -> None:
+    matcher = FuzzyMatcher(["uxsxexrxnxaxmxe", "get_user_name", "getUserName"])
+    assert [value for _, value in matcher("username")] == [
+        # at the start of a word, running on into the next
+        "getUserName",
+        "uxsxexrxnxaxmxe",
+        "get_user_name",
+    ]
+    # even if the first word is a single character
+    matcher = FuzzyMatcher(["x_a_n", "xAName"])
+    assert [value for _, value in matcher("an")] == ["xAName", "x_a_n"]
+
+
+def test_catalog_items_and_limit() -> None:
+    matcher = FuzzyMatcher(
+        [(("foo_bar", "column"), "foo_bar"), ("FooBaz", "FooBaz"), "fb"], limit=2
+    )
+    assert matcher("fb") == [("fb", "fb"), (("foo_bar", "column"), "foo_bar")]
+    matcher.limit = None
+    assert matcher("fb") == [
+        ("fb", "fb"),
+        (("foo_bar", "column"), "foo_bar"),
+        ("FooBaz", "FooBaz"),
+    ]
+
+
+def test_results_are_not_narrowed_by_the_cache() -> None:
+    matcher = FuzzyMatcher(["abc", "abXc"])
+    cache = CompletionCache()
+    # every value starts with ab, but abXc matches abc without starting with
+    # it, so this can't be narrowed to abc.
+    cache.put(matcher, "ab", matcher("ab"))
+    assert cache.get(matcher, "abc") is None
+    assert matcher("abc") == [("abc", "abc"), ("abXc", "abXc")]
+
+
+def test_random_catalog_matches_a_scan() -> None:
+    rng = random.Random(0)
+    words = ["get", "Set", "user", "ID", "http", "Server", "item", "2", "x"]
+
+    def identifier() -> str:
+        parts = rng.choices(words, k=rng.randint(1, 4))
+        return rng.choice(["_", "", "."]).join(parts)
+
+    catalog = [identifier() for _ in range(2_000)]
+    matcher = FuzzyMatcher(catalog, limit=None)
+    marked = [WORD_START_PROG.sub(BOUNDARY, v).casefold() for v in catalog]
+    for _ in range(200):
+        query = "".join(rng.choices("getusridhpvx2_", k=rng.randint(1, 6)))
+        pattern = re.compile(
+            re.escape(BOUNDARY + query[0]) + "".join(f".*?{c}" for c in query[1:])
+        )
+        expected = {i for i, m in enumerate(marked) if pattern.search(m)}
+        result = matcher.match_ids(query)
+        assert len(result) == len(set(result))
+        assert set(result) == expected
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 from pathlib import Path
+from unittest.mock import MagicMock
 
 import pytest
 
-from textual_textarea.path_input import PathValidator, path_completer
+from textual_textarea import path_input
+from textual_textarea.path_input import PathValidator, StatCache, path_completer
 
 
 @pytest.mark.parametrize(
@@ -83,3 +85,34 @@ def test_path_validator(
     validator = PathValidator(dir_okay, file_okay, must_exist)
     result = validator.validate(str(p))
     assert result.is_valid == expected_result
+
+
+def test_stat_results_are_cached_for_ttl(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    clock = MagicMock(return_value=100.0)
+    monkeypatch.setattr(path_input, "monotonic", clock)
+    cache = StatCache(ttl=1.0)
+    monkeypatch.setattr(path_input, "STAT_CACHE", cache)
+    p = tmp_path / "foo.txt"
+    validator = PathValidator(dir_okay=False, file_okay=True, must_exist=True)
+
+    assert not validator.validate(str(p)).is_valid
+    p.touch()
+    clock.return_value = 100.5
+    # the path was stat'ed less than ttl seconds ago
+    assert not validator.validate(str(p)).is_valid
+    assert cache.resolve(str(p)) == p.resolve()
+    clock.return_value = 101.5
+    assert validator.validate(str(p)).is_valid
+
+    p.unlink()
+    cache.clear()
+    assert not validator.validate(str(p)).is_valid
+
+
+def test_stat_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    cache = StatCache(maxsize=2)
+    for name in ("a", "b", "c"):
+        cache.stat(str(tmp_path / name))
+    assert list(cache._results) == [str(tmp_path / "b"), str(tmp_path / "c")]
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from textual_textarea.find_in_files import find_in_files, iter_files
+from textual_textarea.find_index import FindQuery
+from textual_textarea.trigram_index import TrigramIndex, query_trigrams, trigrams
+
+
+@pytest.fixture
+def root(tmp_path: Path) -> Path:
+    root = tmp_path / "root"
+    root.mkdir()
+    (root / "a.txt").write_text("foo bar\nbaz\n")
+    (root / "b.txt").write_text("Hello World")
+    (root / "binary.bin").write_bytes(b"foo\0bar")
+    return root
+
+
+@pytest.fixture
+def index(tmp_path: Path, root: Path) -> TrigramIndex:
+    return TrigramIndex.for_directory(tmp_path / "index", root)
+
+
+def paths(root: Path) -> list[str]:
+    return list(iter_files(root, max_depth=1, max_file_size=1000))
+
+
+def names(candidates: set[str] | None) -> set[str] | None:
+    if candidates is None:
+        return None
+    return {Path(p).name for p in candidates}
+
+
+def test_trigrams() -> None:
+    assert trigrams("ab") == set()
+    assert trigrams("Abcd") == {"abc", "bcd"}
+    assert trigrams("ab\r\ncd") == {"ab\n", "b\nc", "\ncd"}
+    # lines are split like the editor splits them
+    assert query_trigrams(FindQuery("b\nc")) <= trigrams("a\u2028b\r\ncd")
+
+
+@pytest.mark.parametrize(
+    "query,expected",
+    [
+        (FindQuery("bar"), {"bar"}),
+        (FindQuery("ba"), set()),
+        (FindQuery("foo|bar", regex=True), set()),
+        (FindQuery("fo+bar", regex=True), {"bar"}),
+        (
+            FindQuery(r"hello\s+(wor)ld", regex=True),
+            {"hel", "ell", "llo", "wor", "orl", "rld"},
+        ),
+        (FindQuery("a(?!bcd)", regex=True), set()),
+        (FindQuery("(abc", regex=True), set()),
+    ],
+)
+def test_query_trigrams(query: FindQuery, expected: set[str]) -> None:
+    assert query_trigrams(query) == expected
+
+
+def test_candidates(root: Path, index: TrigramIndex) -> None:
+    assert index.update(paths(root), 1000) == 3
+    assert names(index.candidates(FindQuery("bar"))) == {"a.txt"}
+    assert names(index.candidates(FindQuery("hello", case_sensitive=False))) == {
+        "b.txt"
+    }
+    assert names(index.candidates(FindQuery("bar\nbaz"))) == {"a.txt"}
+    assert names(index.candidates(FindQuery("bar\nfoo"))) == set()
+    assert names(index.candidates(FindQuery("W[aeiou]rld", regex=True))) == {"b.txt"}
+    assert index.candidates(FindQuery("o", regex=True)) is None
+
+
+def test_incremental_update(root: Path, index: TrigramIndex) -> None:
+    assert index.update(paths(root), 1000) == 3
+    # nothing changed, so nothing is read again
+    assert index.update(paths(root), 1000) == 0
+
+    (root / "c.txt").write_text("more bar")
+    b = root / "b.txt"
+    b.write_text("Goodbye bar")
+    # make sure the change is seen, even on file systems with coarse mtimes
+    st = b.stat()
+    os.utime(b, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    (root / "a.txt").unlink()
+    assert index.update(paths(root), 1000) == 2
+    assert names(index.candidates(FindQuery("bar"))) == {"b.txt", "c.txt"}
+    assert names(index.candidates(FindQuery("hello"))) == set()
+
+
+def test_update_is_cancellable(root: Path, index: TrigramIndex) -> None:
+    assert index.update(paths(root), 1000, is_cancelled=lambda: True) == 0
+    assert index.update(paths(root), 1000) == 3
+
+
+def test_find_in_files_with_index(root: Path, index: TrigramIndex) -> None:
+    batches = list(
+        find_in_files(
+            root,
+            FindQuery("bar"),
+            max_depth=1,
+            max_file_size=1000,
+            max_matches_per_file=None,
+            max_workers=1,
+            index=index,
+        )
+    )
+    # only a.txt could match, so it is the only file searched
+    assert sum(searched for searched, _ in batches) == 1
+    results = [result for _, batch in batches for result in batch]
+    assert [Path(result.path).name for result in results] == ["a.txt"]